@@ -0,0 +1,82 @@
+# alteracoes.py
+# Sequência de alterações para o app instalado (PWA) sincronizar só o que
+# mudou (GET /api/changes?since=N).
+#
+# Toda escrita em pedidos ou servicos pega o próximo número de uma sequência
+# única (a versão 'alteracoes' em versoes_cache) e grava na coluna alteracao
+# da linha. O incremento é feito na transação da escrita; como o SQLite só
+# tem um escritor por vez, quem pegou o número N faz o commit antes de
+# alguém pegar N + 1 — quem já leu até N nunca perde uma alteração menor.
+#
+# A leitura usa os índices (alteracao) e (usuario_id, alteracao): o custo é
+# proporcional ao número de alterações desde o cursor, não ao tamanho da
+# tabela. Pedidos e serviços não são apagados, então não há "lápides".
+from models import db, Pedido, Servico
+from consultas import data_iso
+from versoes import incrementar_versao
+
+CHAVE = 'alteracoes'
+LIMITE_PADRAO = 500
+LIMITE_MAXIMO = 2000
+
+
+def marcar(objeto):
+    """Dá ao pedido ou serviço o próximo número da sequência. Chamar antes do commit."""
+    # Sem autoflush: um objeto novo seria inserido antes e atualizado depois
+    with db.session.no_autoflush:
+        objeto.alteracao = incrementar_versao(CHAVE)
+
+
+def reservar(quantidade):
+    """Reserva quantidade números seguidos da sequência e devolve o primeiro."""
+    return incrementar_versao(CHAVE, quantidade) - quantidade + 1
+
+
+def _pedido(linha):
+    return {
+        'id': linha.id,
+        'usuario_id': linha.usuario_id,
+        'servico_id': linha.servico_id,
+        'nome': linha.nome,
+        'descricao': linha.descricao,
+        'status': linha.status,
+        'observacao': linha.observacao,
+        'data': data_iso(linha.data),
+        'alteracao': linha.alteracao,
+    }
+
+
+def _servico(linha):
+    return {'id': linha.id, 'nome': linha.nome, 'alteracao': linha.alteracao}
+
+
+def listar(desde, usuario_id=None, limite=LIMITE_PADRAO):
+    """Pedidos e serviços alterados depois de desde, em ordem de alteração.
+
+    usuario_id restringe os pedidos aos do morador. Devolve um dict com
+    'pedidos', 'servicos', 'cursor' (o since da próxima chamada) e 'mais'
+    (há mais alterações depois do cursor: chamar de novo em seguida).
+    """
+    pedidos = db.session.query(
+        Pedido.id, Pedido.usuario_id, Pedido.servico_id, Pedido.nome, Pedido.descricao,
+        Pedido.status, Pedido.observacao, Pedido.data, Pedido.alteracao
+    ).filter(Pedido.alteracao > desde)
+    if usuario_id is not None:
+        pedidos = pedidos.filter(Pedido.usuario_id == usuario_id)
+    pedidos = pedidos.order_by(Pedido.alteracao).limit(limite + 1).all()
+
+    servicos = db.session.query(Servico.id, Servico.nome, Servico.alteracao)\
+        .filter(Servico.alteracao > desde)\
+        .order_by(Servico.alteracao).limit(limite + 1).all()
+
+    # As duas listas juntas, cortadas em limite: tudo até o cursor vai na resposta
+    alteracoes = sorted([a.alteracao for a in pedidos] + [a.alteracao for a in servicos])
+    mais = len(alteracoes) > limite
+    cursor = alteracoes[:limite][-1] if alteracoes else desde
+
+    return {
+        'pedidos': [_pedido(linha) for linha in pedidos if linha.alteracao <= cursor],
+        'servicos': [_servico(linha) for linha in servicos if linha.alteracao <= cursor],
+        'cursor': cursor,
+        'mais': mais,
+    }
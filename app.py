@@ -1,39 +1,81 @@
 # app.py
 
 import os
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+import time
+import uuid
+import click
+from flask import Flask, render_template, request, redirect, url_for, flash, Response, stream_with_context, jsonify
 from flask_bcrypt import Bcrypt
 from flask_migrate import Migrate
-from datetime import datetime
-from zoneinfo import ZoneInfo
-from models import db, Usuario, Morador, Apartamento, Servico, Pedido
+from datetime import date
+from models import db, Usuario, Morador, Apartamento, Servico, Pedido, STATUS_PEDIDO
+from consultas import listar_pedidos, ler_filtros, FILTROS, data_iso
+import exportacao
+import contadores
+from catalogo import catalogo
+from identidade import identidades
+import senhas
+import banco
+import escritas
+from metricas import metricas
+import tempo_real
+import alteracoes
+import periodos
+import atendimento
+from eventos import eventos_do_pedido
+from orcamentos import orcamento
 from functools import wraps
-from flask_login import LoginManager, UserMixin, login_user, logout_user, current_user, login_required
+from flask_login import LoginManager, login_user, logout_user, current_user, login_required
 
 
 # -------------------------------
 # Configuração do app
 # -------------------------------
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///condominio.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///condominio.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Perfil do SQLite: 'producao' (WAL, busy_timeout...) ou 'padrao' (ver banco.py)
+app.config['SQLITE_PERFIL'] = os.environ.get('SQLITE_PERFIL', 'producao')
+
+# Escritor único (opcional): socket do processo "flask escritor" (ver escritas.py)
+app.config['ESCRITOR_ENDERECO'] = os.environ.get('ESCRITOR_ENDERECO')
+app.config['ESCRITOR_ESPERA'] = float(os.environ.get('ESCRITOR_ESPERA', 10))
+
 # Chave secreta aleatória
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'uma_chave_super_secreta_fixa_123')
 
+# Custo do bcrypt: pelo ambiente (no gunicorn, calibrado uma vez pelo mestre; ver senhas.py)
+if os.environ.get('BCRYPT_LOG_ROUNDS'):
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ['BCRYPT_LOG_ROUNDS'])
+app.config['BCRYPT_ALVO_MS'] = int(os.environ.get('BCRYPT_ALVO_MS', 250))
+
+# Tempo real (/eventos): máximo de conexões abertas por worker (ver tempo_real.py)
+if os.environ.get('EVENTOS_CONEXOES'):
+    app.config['EVENTOS_CONEXOES'] = int(os.environ['EVENTOS_CONEXOES'])
+
+# Métricas (/metrics): pasta compartilhada pelos workers e token opcional de acesso
+app.config['METRICAS_DIR'] = os.environ.get('METRICAS_DIR')
+app.config['METRICAS_TOKEN'] = os.environ.get('METRICAS_TOKEN')
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
 @login_manager.user_loader
 def load_user(user_id):
-    return Usuario.query.get(int(user_id))
+    # Identidade em cache (id, email, tipo, nome do morador): sem consulta no caso comum
+    return identidades.obter(int(user_id))
 
 # -------------------------------
 # Inicialização das extensões
 # -------------------------------
 db.init_app(app)
+banco.init_app(app, db)
 bcrypt = Bcrypt(app)
+senhas.init_app(app, bcrypt)
+metricas.init_app(app, db)
+tempo_real.central.init_app(app)
 migrate = Migrate(app, db)
 
 # -------------------------------
@@ -43,29 +85,31 @@ UPLOAD_FOLDER = os.path.join('static', 'uploads')
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
-# -------------------------------
-# Fusos horários
-# -------------------------------
-brasil = ZoneInfo("America/Sao_Paulo")
-
+# Os selects de status dos templates usam a mesma lista gravada e filtrada
+app.jinja_env.globals['STATUS_PEDIDO'] = STATUS_PEDIDO
 
 # -------------------------------
 # Funções auxiliares
 # -------------------------------
-def login_requerido(tipo=None):
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            if 'usuario_id' not in session:
-                flash('Você precisa estar logado.', 'warning')
-                return redirect(url_for('login'))
-            if tipo and session.get('perfil') != tipo:
-                flash('Acesso não autorizado.', 'danger')
-                return redirect(url_for('login'))
-            return f(*args, **kwargs)
-        return decorated_function
-    return decorator
-
+# Máximo de pedidos por alteração em lote
+LOTE_STATUS = 1000
+
+# Escritor fora do ar ou sem resposta (escritas.FalhaEscritor)
+FALHA_GRAVACAO = 'Não foi possível salvar agora. Tente novamente em instantes.'
+
+def ler_chave(dados):
+    """Chave de idempotência enviada pelo navegador (None se ausente)."""
+    chave = (dados.get('chave') or '').strip()
+    return chave[:64] or None
+
+def ler_data(valor):
+    """Data AAAA-MM-DD da query string (None se ausente); ValueError se inválida."""
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f'Data inválida: {valor} (use AAAA-MM-DD).')
 
 # -------------------------------
 # Decorador para restringir por tipo de usuário
@@ -80,19 +124,35 @@ from flask_login import current_user, login_required
 # ROTAS DE AUTENTICAÇÃO
 # -------------------------------
 @app.route('/')
+@orcamento(sql=0, ms=20)
 def index():
     return redirect(url_for('login'))
 
 from flask_login import login_user, logout_user, login_required, current_user
 
 @app.route('/login', methods=['GET', 'POST'])
+@orcamento(sql=2, ms=150)
 def login():
     if request.method == 'POST':
         email = request.form['email']
         senha = request.form['senha']
         usuario = Usuario.query.filter_by(email=email).first()
 
-        if usuario and bcrypt.check_password_hash(usuario.senha, senha):
+        try:
+            senha_ok = usuario is not None and senhas.conferir(usuario.senha, senha)
+        except senhas.SobrecargaSenhas:
+            flash('Muitos acessos ao mesmo tempo. Tente novamente em instantes.', 'warning')
+            return render_template('login.html'), 503
+
+        if senha_ok:
+            # Hash antigo (custo menor que o atual) é refeito agora que temos a senha
+            if senhas.precisa_rehash(usuario.senha):
+                try:
+                    usuario.senha = senhas.gerar_hash(senha)
+                    db.session.commit()
+                except senhas.SobrecargaSenhas:
+                    pass  # fica para o próximo login
+
             # Faz o login de fato
             login_user(usuario)# ✅ IMPORTANTE: mantém a sessão ativa
 
@@ -110,6 +170,7 @@ def login():
 from flask_login import logout_user
 
 @app.route('/logout')
+@orcamento(sql=2, ms=20)
 @login_required
 def logout():
     logout_user()  # limpa apenas os dados de login do usuário
@@ -138,6 +199,7 @@ def tipo_requerido(tipo):
     return decorator
 
 @app.route('/cadastro', methods=['GET', 'POST'])
+@orcamento(sql=5, ms=150)
 def cadastro():
     if request.method == 'POST':
         nome = request.form['nome']
@@ -147,31 +209,27 @@ def cadastro():
         email = request.form['email']
         senha = request.form['senha']
 
+        # Confere antes de gastar um hash; a operação confere de novo ao gravar
         if Usuario.query.filter_by(email=email).first():
             flash('Email já cadastrado.', 'warning')
             return redirect(url_for('cadastro'))
 
-        # Cria ou encontra apartamento
-        apartamento = Apartamento.query.filter_by(bloco=bloco, numero=numero).first()
-        if not apartamento:
-            apartamento = Apartamento(bloco=bloco, numero=numero)
-            db.session.add(apartamento)
-            db.session.commit()
-
-        # Cria usuário e morador
-        hashed_senha = bcrypt.generate_password_hash(senha).decode('utf-8')
-        novo_usuario = Usuario(email=email, senha=hashed_senha, tipo='morador')
-        db.session.add(novo_usuario)
-        db.session.commit()
-
-        morador = Morador(
-            usuario_id=novo_usuario.id,
-            apartamento_id=apartamento.id,
-            nome=nome,
-            telefone=telefone
-        )
-        db.session.add(morador)
-        db.session.commit()
+        try:
+            hashed_senha = senhas.gerar_hash(senha)
+        except senhas.SobrecargaSenhas:
+            flash('Muitos acessos ao mesmo tempo. Tente novamente em instantes.', 'warning')
+            return render_template('cadastro.html'), 503
+
+        # Apartamento, usuário e morador em uma só transação
+        try:
+            escritas.executar('cadastrar_morador', nome=nome, bloco=bloco, numero=numero,
+                              telefone=telefone, email=email, senha_hash=hashed_senha)
+        except escritas.ErroEscrita as e:
+            flash(str(e), 'warning')
+            return redirect(url_for('cadastro'))
+        except escritas.FalhaEscritor:
+            flash(FALHA_GRAVACAO, 'warning')
+            return render_template('cadastro.html'), 503
 
         flash('Cadastro realizado com sucesso! Faça login.', 'success')
         return redirect(url_for('login'))
@@ -182,9 +240,11 @@ def cadastro():
 # ROTAS DE PERFIL
 # -------------------------------
 @app.route('/editar_perfil', methods=['GET', 'POST'])
+@orcamento(sql=9, ms=150)
 @tipo_requerido('morador')  # apenas moradores podem acessar
 def editar_perfil():
-    usuario = current_user  # pega o usuário logado pelo Flask-Login
+    # current_user é só leitura (cache de identidade); carrega o usuário para alterar
+    usuario = Usuario.query.get(current_user.id)
     morador = Morador.query.filter_by(usuario_id=usuario.id).first()
     apartamento = morador.apartamento_obj or Apartamento(bloco='', numero='')
 
@@ -196,28 +256,26 @@ def editar_perfil():
         email = request.form['email'].strip()
         senha = request.form['senha'].strip()
 
-        # Verifica se o email já existe em outro usuário
-        if Usuario.query.filter(Usuario.email==email, Usuario.id!=usuario.id).first():
-            flash('Este e-mail já está em uso por outro morador.', 'danger')
-            return redirect(url_for('editar_perfil'))
-
-        usuario.email = email
+        senha_hash = None
         if senha:
-            usuario.senha = bcrypt.generate_password_hash(senha).decode('utf-8')
-
-        morador.nome = nome
-        morador.telefone = telefone
-
-        # Atualiza o apartamento, se necessário
-        if bloco != (apartamento.bloco or '') or numero != (apartamento.numero or ''):
-            apt = Apartamento.query.filter_by(bloco=bloco, numero=numero).first()
-            if not apt:
-                apt = Apartamento(bloco=bloco, numero=numero)
-                db.session.add(apt)
-                db.session.commit()
-            morador.apartamento_id = apt.id
+            try:
+                senha_hash = senhas.gerar_hash(senha)
+            except senhas.SobrecargaSenhas:
+                flash('Muitos acessos ao mesmo tempo. Tente novamente em instantes.', 'warning')
+                return redirect(url_for('editar_perfil'))
+
+        # Confere o email, atualiza usuário e morador e troca o apartamento, se necessário
+        try:
+            escritas.executar('atualizar_perfil', usuario_id=usuario.id, nome=nome, bloco=bloco,
+                              numero=numero, telefone=telefone, email=email, senha_hash=senha_hash)
+        except escritas.ErroEscrita as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('editar_perfil'))
+        except escritas.FalhaEscritor:
+            flash(FALHA_GRAVACAO, 'warning')
+            return redirect(url_for('editar_perfil'))
+        identidades.esquecer(usuario.id)
 
-        db.session.commit()
         flash('Perfil atualizado com sucesso!', 'success')
         return redirect(url_for('editar_perfil'))
 
@@ -227,7 +285,8 @@ def editar_perfil():
 # ROTAS DE SERVIÇOS
 # -------------------------------
 @app.route('/cadastrar_servico', methods=['POST'])
-@login_requerido('sindico')
+@orcamento(sql=4, ms=50)
+@tipo_requerido('sindico')
 def cadastrar_servico():
     nome = request.form.get('nome_servico', '').strip().capitalize()
     if not nome:
@@ -237,7 +296,10 @@ def cadastrar_servico():
     if Servico.query.filter_by(nome=nome).first():
         flash('Este serviço já está cadastrado.', 'warning')
     else:
-        db.session.add(Servico(nome=nome))
+        servico = Servico(nome=nome)
+        db.session.add(servico)
+        alteracoes.marcar(servico)
+        catalogo.invalidar()  # avisa os outros workers na mesma transação
         db.session.commit()
         flash(f'Serviço "{nome}" cadastrado com sucesso!', 'success')
 
@@ -247,6 +309,7 @@ def cadastrar_servico():
 # ROTAS DE PEDIDOS
 # -------------------------------
 @app.route('/novo_pedido', methods=['GET', 'POST'])
+@orcamento(sql=6, ms=100)
 @login_required
 @tipo_requerido('morador')
 def novo_pedido():
@@ -255,89 +318,79 @@ def novo_pedido():
         nome = request.form.get('nome')
         descricao = request.form.get('descricao')
 
-        if not servico_id:
+        if not servico_id or not servico_id.isdigit():
             flash('Selecione um serviço.', 'warning')
             return redirect(url_for('novo_pedido'))
 
-        novo_pedido = Pedido(
-            usuario_id=current_user.id,
-            servico_id=servico_id,
-            nome=nome,
-            descricao=descricao
-        )
-        db.session.add(novo_pedido)
-        db.session.commit()
+        # Chave do formulário (preenchida no navegador): reenvio não duplica o pedido
+        try:
+            escritas.executar('criar_pedido', usuario_id=current_user.id, servico_id=int(servico_id),
+                              nome=nome, descricao=descricao, chave=ler_chave(request.form))
+        except escritas.ErroEscrita as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('novo_pedido'))
+        except escritas.FalhaEscritor:
+            flash(FALHA_GRAVACAO, 'warning')
+            return redirect(url_for('novo_pedido'))
         flash('Pedido criado com sucesso!', 'success')
         return redirect(url_for('meus_pedidos'))
 
-    servicos_disponiveis = Servico.query.all()
-    return render_template('novo_pedido.html', servicos_disponiveis=servicos_disponiveis)
+    servicos_disponiveis = catalogo.listar()
+    # O pwa.js troca a chave no navegador (a página pode vir do cache do app)
+    return render_template('novo_pedido.html', servicos_disponiveis=servicos_disponiveis,
+                           chave=uuid.uuid4().hex)
 
 
 @app.route('/meus_pedidos')
+@orcamento(sql=4, ms=150)
 @tipo_requerido('morador')
 def meus_pedidos():
     usuario_id = current_user.id
     servico_filtro = request.args.get('servico')
     
-    query = Pedido.query.filter_by(usuario_id=usuario_id)
-    
-    if servico_filtro and servico_filtro.isdigit():
-        query = query.filter_by(servico_id=int(servico_filtro))
-    
-    pedidos = query.order_by(Pedido.data.desc()).all()
-    
-    # Preparar dados para o template
-    pedidos_formatados = []
-    for p in pedidos:
-        pedidos_formatados.append({
-            'servico_nome': p.servico.nome,
-            'nome_morador': getattr(p.usuario, 'perfil', None) == 'morador' and p.usuario.email or None,
-            'usuario_email': p.usuario.email,
-            'status': p.status,
-            'data_solicitacao': p.data.replace(tzinfo=ZoneInfo("UTC")).astimezone(brasil).strftime('%d/%m/%Y %H:%M') if p.data else None,
-            'observacao': p.observacao
-        })
-
-    servicos_disponiveis = Servico.query.order_by(Servico.nome).all()
+    servico_id = int(servico_filtro) if servico_filtro and servico_filtro.isdigit() else None
+
+    # Preparar dados para o template (pedido, serviço e usuário em uma só consulta)
+    pedidos_formatados, proximo_cursor = listar_pedidos(
+        usuario_id=usuario_id,
+        servico_id=servico_id,
+        cursor=request.args.get('cursor')
+    )
+
+    servicos_disponiveis = catalogo.listar()
     
     voltar_endpoint = 'dashboard_sindico' if current_user.tipo == 'sindico' else 'dashboard_morador'
 
     return render_template(
         'meus_pedidos.html',
         pedidos=pedidos_formatados,
+        proximo_cursor=proximo_cursor,
         servicos_disponiveis=servicos_disponiveis,
         voltar_endpoint=voltar_endpoint
     )
 
 @app.route('/pedidos')
+@orcamento(sql=3, ms=150)
 @tipo_requerido('sindico')
 def pedidos():
     servico_filtro = request.args.get('servico')
     
-    query = Pedido.query  # Todos os pedidos
-    
-    if servico_filtro and servico_filtro.isdigit():
-        query = query.filter_by(servico_id=int(servico_filtro))
-    
-    pedidos = query.order_by(Pedido.data.desc()).all()
-    
-    pedidos_formatados = []
-    for p in pedidos:
-        pedidos_formatados.append({
-            'servico_nome': p.servico.nome,
-            'nome_morador': p.usuario.email,  # sempre mostrar email do morador
-            'usuario_email': p.usuario.email,
-            'status': p.status,
-            'data_solicitacao': p.data.replace(tzinfo=ZoneInfo("UTC")).astimezone(brasil).strftime('%d/%m/%Y %H:%M') if p.data else None,
-            'observacao': p.observacao
-        })
-
-    servicos_disponiveis = Servico.query.order_by(Servico.nome).all()
+    servico_id = int(servico_filtro) if servico_filtro and servico_filtro.isdigit() else None
+
+    # Todos os pedidos, sempre mostrando o email do morador
+    pedidos_formatados, proximo_cursor = listar_pedidos(
+        servico_id=servico_id,
+        mostrar_email=True,
+        cursor=request.args.get('cursor')
+    )
+
+    servicos_disponiveis = catalogo.listar()
     
+    # Mesmo template de meus_pedidos, que já trata a visão do síndico
     return render_template(
-        'pedidos.html',
+        'meus_pedidos.html',
         pedidos=pedidos_formatados,
+        proximo_cursor=proximo_cursor,
         servicos_disponiveis=servicos_disponiveis,
         voltar_endpoint='dashboard_sindico'
     )
@@ -348,52 +401,76 @@ from app import app
 from models import Pedido, Usuario
 
 @app.route('/historico')
+@orcamento(sql=3, ms=200)
 @tipo_requerido('sindico')
 def historico():
-    # Buscar todos os pedidos (ou com filtros, se houver)
-    pedidos = Pedido.query.order_by(Pedido.data.desc()).all()
-
-    pedidos_formatados = []
-    for p in pedidos:
-        pedidos_formatados.append({
-            'id': p.id,  # necessário para o dropdown de alteração
-            'servico_nome': p.servico.nome,
-            'nome_morador': getattr(p.usuario, 'perfil', None) == 'morador' and p.usuario.email or None,
-            'usuario_email': p.usuario.email,
-            'status': p.status,
-            'data_solicitacao': p.data.replace(tzinfo=ZoneInfo("UTC")).astimezone(brasil).strftime('%d/%m/%Y %H:%M') if p.data else None,
-            'observacao': p.observacao
-        })
+    # Filtros da querystring, repassados ao "Carregar mais" e à exportação
+    filtros_args = {k: request.args[k] for k in FILTROS if request.args.get(k)}
+
+    # Buscar uma página de pedidos (o id vem junto, necessário para o dropdown de alteração)
+    pedidos_formatados, proximo_cursor = listar_pedidos(
+        cursor=request.args.get('cursor'),
+        **ler_filtros(request.args)
+    )
 
     return render_template(
         'historico.html',
-        pedidos=pedidos_formatados
+        pedidos=pedidos_formatados,
+        proximo_cursor=proximo_cursor,
+        filtros_args=filtros_args,
+        servicos_disponiveis=catalogo.listar()
+    )
+
+@app.route('/exportar')
+@orcamento(sql=2, ms=1500)
+@tipo_requerido('sindico')
+def exportar():
+    formato = request.args.get('formato', 'csv')
+    if formato not in exportacao.FORMATOS:
+        flash('Formato de exportação inválido.', 'danger')
+        return redirect(url_for('historico'))
+
+    # Mesmos filtros do histórico; as linhas são geradas aos poucos, em lotes
+    mimetype, arquivo = exportacao.FORMATOS[formato]
+    gerador = exportacao.GERADORES[formato](ler_filtros(request.args))
+    return Response(
+        stream_with_context(gerador),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment;filename={arquivo}"}
     )
 
 @app.route('/alterar_status/<int:pedido_id>', methods=['POST'])
+@orcamento(sql=8, ms=50)
 @login_required
 def alterar_status(pedido_id):
     if current_user.tipo != 'sindico':
         flash("Acesso negado.", "danger")
         return redirect(url_for('historico'))
 
-    novo_status = request.form.get('status')
-    pedido = Pedido.query.get_or_404(pedido_id)
-    pedido.status = novo_status
-    db.session.commit()
+    novo_status = request.form.get('status', '').strip().lower()
+    try:
+        escritas.executar('mudar_status', pedido_id=pedido_id, status=novo_status)
+    except escritas.ErroEscrita as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('historico'))
+    except escritas.FalhaEscritor:
+        flash(FALHA_GRAVACAO, 'warning')
+        return redirect(url_for('historico'))
 
     flash(f"Status do pedido atualizado para '{novo_status}'.", "success")
     return redirect(url_for('historico'))
 
 @app.route('/gerenciar_sindico')
+@orcamento(sql=2, ms=150)
 def gerenciar_sindico():
     # Recupera todos os usuários e serviços disponíveis
     usuarios = Usuario.query.all()
-    servicos_disponiveis = Servico.query.all()
+    servicos_disponiveis = catalogo.listar()
     return render_template('gerenciar_sindico.html', usuarios=usuarios, servicos_disponiveis=servicos_disponiveis)
 
 # Promover morador a síndico
 @app.route('/promover_sindico/<int:morador_id>', methods=['POST'])
+@orcamento(sql=8, ms=50)
 def promover_sindico(morador_id):
     morador = Usuario.query.get_or_404(morador_id)
     # Rebaixa o síndico atual, se houver
@@ -401,21 +478,25 @@ def promover_sindico(morador_id):
     if sindico_atual:
         sindico_atual.tipo = 'morador'
         sindico_atual.perfil = 'morador'
+        identidades.invalidar(sindico_atual.id)
     
     # Promove o morador selecionado
     morador.tipo = 'sindico'
     morador.perfil = 'sindico'
+    identidades.invalidar(morador.id)
     db.session.commit()
     flash(f"{morador.email} foi promovido a síndico!", "success")
     return redirect(url_for('gerenciar_sindico'))
 
 # Rebaixar síndico para morador
 @app.route('/dispromover_sindico/<int:morador_id>', methods=['POST'])
+@orcamento(sql=4, ms=50)
 def dispromover_sindico(morador_id):
     usuario = Usuario.query.get_or_404(morador_id)
     if usuario.tipo == 'sindico':
         usuario.tipo = 'morador'
         usuario.perfil = 'morador'
+        identidades.invalidar(usuario.id)
         db.session.commit()
         flash(f"{usuario.email} foi rebaixado para morador.", "success")
     else:
@@ -429,6 +510,7 @@ def dispromover_sindico(morador_id):
 # DASHBOARD MORADOR
 # -------------------------------
 @app.route('/dashboard_morador')
+@orcamento(sql=2, ms=50)
 @tipo_requerido('morador')
 def dashboard_morador():
     # O decorador já garante que apenas moradores acessam
@@ -438,15 +520,318 @@ def dashboard_morador():
 # DASHBOARD SÍNDICO
 # -------------------------------
 @app.route('/dashboard_sindico')
+@orcamento(sql=4, ms=100)
 @tipo_requerido('sindico')
 def dashboard_sindico():
-    # Consulta serviços e status dos pedidos
-    query_result = db.session.query(Servico.nome, db.func.count(Pedido.id))\
-        .join(Pedido, isouter=True).group_by(Servico.id).all()
+    # Consulta serviços e status dos pedidos nos contadores (sem varrer pedidos)
+    query_result = contadores.contagem_por_servico()
     servicos_count = [{'nome': nome, 'quantidade': quantidade} for nome, quantidade in query_result]
-    status_count = db.session.query(Pedido.status, db.func.count(Pedido.id)).group_by(Pedido.status).all()
+    status_count = contadores.contagem_por_status()
     return render_template('dashboard_sindico.html', servicos_count=servicos_count, status_count=status_count)
 
+# -------------------------------
+# ESTATÍSTICAS (tendências por período)
+# -------------------------------
+@app.route('/estatisticas')
+@orcamento(sql=2, ms=50)
+@tipo_requerido('sindico')
+def estatisticas():
+    # Os gráficos buscam os dados em /api/estatisticas/pedidos (static/estatisticas.js)
+    return render_template('estatisticas.html', periodos=periodos.PERIODOS)
+
+@app.route('/api/estatisticas/pedidos')
+@orcamento(sql=4, ms=100)
+@tipo_requerido('sindico')
+def api_estatisticas_pedidos():
+    # Pedidos por período, serviço e status, lidos só de contagem_periodos (periodos.py).
+    # ?periodo=dia|semana|mes (padrão mes) e, opcionais, ?inicio= e ?fim= (AAAA-MM-DD)
+    periodo = request.args.get('periodo', 'mes')
+    try:
+        inicios = periodos.intervalo(periodo, ler_data(request.args.get('inicio')),
+                                     ler_data(request.args.get('fim')))
+    except ValueError as e:
+        return jsonify(erro=str(e)), 400
+    return jsonify(periodos.series(periodo, inicios))
+
+@app.route('/api/estatisticas/atendimento')
+@orcamento(sql=3, ms=50)
+@tipo_requerido('sindico')
+def api_estatisticas_atendimento():
+    # p50/p90 do tempo entre a abertura e o desfecho, por serviço, juntando os
+    # resumos mensais (atendimento.py). ?desfecho=concluído|rejeitado (padrão
+    # concluído); ?inicio= e ?fim= (AAAA-MM-DD) escolhem os meses, padrão os últimos 12
+    desfecho = atendimento.desfecho(request.args.get('desfecho', 'concluído'))
+    if desfecho is None:
+        return jsonify(erro='Desfecho inválido (use concluído ou rejeitado).'), 400
+    try:
+        meses = periodos.intervalo('mes', ler_data(request.args.get('inicio')),
+                                   ler_data(request.args.get('fim')))
+    except ValueError as e:
+        return jsonify(erro=str(e)), 400
+    return jsonify(desfecho=desfecho, inicio=meses[0].isoformat(), fim=meses[-1].isoformat(),
+                   unidade='horas', **atendimento.percentis(meses[0], meses[-1], desfecho))
+
+
+# -------------------------------
+# AVISOS EM TEMPO REAL (SSE)
+# -------------------------------
+@app.route('/eventos')
+@orcamento(sql=2, ms=50)
+@login_required
+def eventos():
+    # Síndico: pedidos novos e mudanças de status; morador: status dos seus pedidos
+    if current_user.tipo == 'sindico':
+        canal = tempo_real.CANAL_SINDICO
+    else:
+        canal = tempo_real.canal_morador(current_user.id)
+
+    # Reconexão: o navegador manda o id do último evento recebido
+    desde = request.headers.get('Last-Event-ID') or request.args.get('desde')
+    desde = int(desde) if desde and desde.isdigit() else None
+
+    # Sem stream_with_context: a conexão fica aberta sem prender sessão do banco
+    return Response(
+        tempo_real.central.fluxo(canal, desde),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# -------------------------------
+# SINCRONIZAÇÃO DO APP (PWA)
+# -------------------------------
+@app.route('/api/changes')
+@orcamento(sql=2, ms=100)
+@login_required
+def api_alteracoes():
+    # Pedidos e serviços alterados depois do cursor since (0 = tudo, em páginas)
+    desde = request.args.get('since', '0')
+    limite = request.args.get('limite', '')
+    if not desde.isdigit():
+        return jsonify(erro='since deve ser um número inteiro.'), 400
+    limite = min(int(limite), alteracoes.LIMITE_MAXIMO) if limite.isdigit() and int(limite) > 0 \
+        else alteracoes.LIMITE_PADRAO
+
+    # Morador só recebe os próprios pedidos
+    usuario_id = None if current_user.tipo == 'sindico' else current_user.id
+    resposta = jsonify(alteracoes.listar(int(desde), usuario_id=usuario_id, limite=limite))
+    resposta.headers['Cache-Control'] = 'no-store'
+    return resposta
+
+@app.route('/api/pedidos', methods=['POST'])
+@orcamento(sql=6, ms=100)
+@tipo_requerido('morador')
+def api_criar_pedido():
+    # Envio da fila offline do app (service-worker.js): JSON com a chave do pedido.
+    # O mesmo envio repetido devolve o mesmo id, então o app pode reenviar à vontade.
+    dados = request.get_json(silent=True) or {}
+    servico_id = dados.get('servico_id')
+    chave = ler_chave(dados)
+    if not str(servico_id or '').isdigit() or not dados.get('nome') or not chave:
+        return jsonify(erro='Informe servico_id, nome e chave.'), 400
+    # A operação também confere, mas o erro dela é 409 (tentar de novo); este
+    # pedido nunca vai ser aceito e sai da fila do app com o 400
+    if catalogo.obter(int(servico_id)) is None:
+        return jsonify(erro='Serviço inexistente.'), 400
+
+    try:
+        pedido_id = escritas.executar('criar_pedido', usuario_id=current_user.id,
+                                      servico_id=int(servico_id), nome=dados['nome'],
+                                      descricao=dados.get('descricao'), chave=chave)
+    except escritas.ErroEscrita as e:
+        return jsonify(erro=str(e)), 409
+    except escritas.FalhaEscritor:
+        return jsonify(erro=FALHA_GRAVACAO), 503
+    return jsonify(id=pedido_id), 201
+
+@app.route('/api/pedidos/status', methods=['POST'])
+@orcamento(sql=8, ms=150)
+@tipo_requerido('sindico')
+def api_alterar_status_em_lote():
+    # Vários pedidos de uma vez (seleção do /historico), numa só transação.
+    # Corpo: {"ids": [...], "status": "...", "observacao": "..." (opcional)}
+    dados = request.get_json(silent=True) or {}
+    ids = dados.get('ids')
+    status = str(dados.get('status') or '').strip().lower()
+    observacao = str(dados.get('observacao') or '').strip() or None
+    if not isinstance(ids, list) or not ids or not all(type(i) is int for i in ids):
+        return jsonify(erro='Informe os ids dos pedidos.'), 400
+    if len(ids) > LOTE_STATUS:
+        return jsonify(erro=f'No máximo {LOTE_STATUS} pedidos por vez.'), 400
+
+    try:
+        resultado = escritas.executar('mudar_status_em_lote', pedido_ids=ids, status=status,
+                                      observacao=observacao)
+    except escritas.ErroEscrita as e:
+        return jsonify(erro=str(e)), 400
+    except escritas.FalhaEscritor:
+        return jsonify(erro=FALHA_GRAVACAO), 503
+    return jsonify(status=status, observacao=observacao, **resultado)
+
+@app.route('/api/pedidos/<int:pedido_id>/eventos')
+@orcamento(sql=3, ms=50)
+@login_required
+def api_eventos_pedido(pedido_id):
+    # Linha do tempo de status do pedido (síndico, ou o morador dono do pedido)
+    dono = db.session.query(Pedido.usuario_id).filter_by(id=pedido_id).scalar()
+    if dono is None or (current_user.tipo != 'sindico' and dono != current_user.id):
+        return jsonify(erro='Pedido não encontrado.'), 404
+    return jsonify(pedido_id=pedido_id, eventos=[
+        {'anterior': e.anterior, 'status': e.status, 'em': data_iso(e.em)}
+        for e in eventos_do_pedido(pedido_id)
+    ])
+
+@app.route('/service-worker.js')
+@orcamento(sql=0, ms=20)
+def service_worker():
+    # Servido na raiz para o escopo do service worker ser o site inteiro
+    resposta = app.send_static_file('service-worker.js')
+    resposta.headers['Cache-Control'] = 'no-cache'
+    return resposta
+
+# -------------------------------
+# MÉTRICAS (Prometheus)
+# -------------------------------
+@app.route('/metrics')
+@orcamento(sql=0, ms=50)
+def exportar_metricas():
+    token = app.config.get('METRICAS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return Response('Não autorizado\n', status=401, mimetype='text/plain')
+    return Response(metricas.texto_prometheus(), mimetype='text/plain; version=0.0.4')
+
+# -------------------------------
+# COMANDOS (flask <comando>)
+# -------------------------------
+@app.cli.command('recalcular-contadores')
+def recalcular_contadores_command():
+    """Recalcula os contadores do dashboard e as contagens por período a partir dos pedidos."""
+    divergencias = contadores.recalcular_contadores()
+    for servico_id, status, gravado, real in divergencias:
+        print(f"⚠️  serviço {servico_id} / '{status}': contador {gravado}, real {real}")
+    if divergencias:
+        print(f"{len(divergencias)} divergência(s) corrigida(s).")
+    else:
+        print("✅ Contadores conferem com os pedidos.")
+
+    divergencias = periodos.recalcular()
+    if divergencias:
+        print(f"⚠️  {divergencias} contagem(ns) por período corrigida(s).")
+    else:
+        print("✅ Contagens por período conferem com os pedidos.")
+
+
+@app.cli.command('reconstruir-busca')
+def reconstruir_busca_command():
+    """Refaz o índice da busca textual (FTS5) a partir dos pedidos."""
+    from busca import reconstruir_busca
+    inicio = time.perf_counter()
+    reconstruir_busca()
+    print(f"✅ Índice da busca refeito em {time.perf_counter() - inicio:.1f} s.")
+
+
+@app.cli.command('reconstruir-tempos')
+def reconstruir_tempos_command():
+    """Refaz os resumos de tempo de atendimento a partir do histórico de status."""
+    inicio = time.perf_counter()
+    quantidade = atendimento.reconstruir()
+    print(f"✅ {quantidade} tempos de atendimento resumidos em {time.perf_counter() - inicio:.1f} s.")
+
+
+@app.cli.command('relatorio')
+@click.argument('tipo', type=click.Choice(['mapa', 'crescimento', 'ranking']))
+@click.option('--inicio', default=None, help='Primeiro dia (AAAA-MM-DD).')
+@click.option('--fim', default=None, help='Último dia (AAAA-MM-DD).')
+@click.option('--limite', default=20, show_default=True, help='Apartamentos no ranking.')
+@click.option('--saida', type=click.File('w', encoding='utf-8'), default='-', help='Arquivo CSV (padrão: tela).')
+def relatorio_command(tipo, inicio, fim, limite, saida):
+    """Relatório do síndico em CSV: mapa (bloco x serviço), crescimento (mensal) ou ranking (apartamentos)."""
+    import csv
+    import relatorios
+    try:
+        inicio, fim = ler_data(inicio), ler_data(fim)
+    except ValueError as erro:
+        raise click.BadParameter(str(erro))
+    colunas = relatorios.carregar().filtrar(inicio, fim)
+    if tipo == 'ranking':
+        resultado = relatorios.ranking_apartamentos(colunas, limite)
+    else:
+        resultado = relatorios.RELATORIOS[tipo](colunas)
+    csv.writer(saida).writerows(resultado.tabela())
+
+
+@app.cli.command('calibrar-senhas')
+def calibrar_senhas_command():
+    """Mede o bcrypt nesta máquina e mostra o custo para BCRYPT_LOG_ROUNDS."""
+    alvo = app.config['BCRYPT_ALVO_MS']
+    custo = senhas.calibrar(alvo)
+    print(f"Custo {custo} (até {alvo} ms por hash); em uso: {app.config['BCRYPT_LOG_ROUNDS']}.")
+    print(f"Para fixar: BCRYPT_LOG_ROUNDS={custo}")
+
+
+@app.cli.command('escritor')
+def escritor_command():
+    """Roda o processo escritor único no socket ESCRITOR_ENDERECO."""
+    import escritor
+    endereco = app.config.get('ESCRITOR_ENDERECO')
+    if not endereco:
+        print("Defina ESCRITOR_ENDERECO (ex.: /tmp/condominio-escritor.sock).")
+        return
+    escritor.servir(app, endereco)
+
+@app.cli.command('importar-moradores')
+@click.argument('arquivo', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--lote', default=500, show_default=True, help='Linhas por transação.')
+@click.option('--processos', type=int, default=None, help='Processos para o hash (padrão: todos os núcleos).')
+@click.option('--custo', type=int, default=None,
+              help='Custo do bcrypt (padrão: BCRYPT_LOG_ROUNDS). Custo menor é refeito no primeiro login.')
+@click.option('--dry-run', is_flag=True, help='Valida e simula a gravação, sem salvar nada.')
+def importar_moradores_command(arquivo, lote, processos, custo, dry_run):
+    """Importa moradores de um CSV (email, senha, tipo, bloco, numero, nome)."""
+    import importacao
+    inicio = time.perf_counter()
+    importados, erros = importacao.importar_moradores(
+        arquivo,
+        custo=custo or app.config['BCRYPT_LOG_ROUNDS'],
+        tamanho_lote=lote,
+        processos=processos,
+        dry_run=dry_run,
+        avisar=lambda linha, mensagem: print(f"⚠️  linha {linha}: {mensagem}")
+    )
+    segundos = time.perf_counter() - inicio
+    acao = 'seriam importados' if dry_run else 'importados'
+    print(f"{'✅' if not erros else '⚠️ '} {importados} {acao}, {erros} com erro, em {segundos:.1f} s.")
+
+
+@app.cli.command('gerar-dados')
+@click.option('--semente', default=42, show_default=True, help='Mesma semente, mesmos dados.')
+@click.option('--apartamentos', default=400, show_default=True)
+@click.option('--blocos', default=4, show_default=True)
+@click.option('--moradores', default=800, show_default=True)
+@click.option('--pedidos', default=100_000, show_default=True)
+@click.option('--dias', default=365, show_default=True, help='Período coberto pelas datas dos pedidos.')
+@click.option('--status', 'pesos_status', default=None,
+              help="Pesos dos status, ex.: 'pendente=20,em andamento=10,concluído=60,rejeitado=10'.")
+@click.option('--datas', type=click.Choice(['uniforme', 'crescente']), default='uniforme', show_default=True)
+@click.option('--lote', default=50_000, show_default=True, help='Pedidos por INSERT/commit.')
+def gerar_dados_command(semente, apartamentos, blocos, moradores, pedidos, dias, pesos_status, datas, lote):
+    """Preenche o banco vazio com um condomínio sintético (testes de carga)."""
+    import dados_sinteticos
+    try:
+        pesos = dados_sinteticos.ler_status(pesos_status) if pesos_status else None
+    except ValueError as erro:
+        raise click.BadParameter(str(erro), param_hint='--status')
+    if db.session.query(Usuario.id).first() is not None:
+        print("❌ O banco já tem usuários; gere os dados em um banco vazio (flask db upgrade).")
+        return
+    inicio = time.perf_counter()
+    dados_sinteticos.gerar(
+        semente=semente, apartamentos=apartamentos, blocos=blocos, moradores=moradores,
+        pedidos=pedidos, dias=dias, distribuicao=datas, tamanho_lote=lote,
+        status=pesos,
+        avisar=print
+    )
+    print(f"✅ Dados gerados em {time.perf_counter() - inicio:.1f} s. "
+          f"Senha de todos: {dados_sinteticos.SENHA} ({dados_sinteticos.EMAIL_SINDICO} é o síndico).")
 
 
 # -------------------------------
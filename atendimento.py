@@ -0,0 +1,179 @@
+# atendimento.py
+# Percentis do tempo de atendimento (da abertura do pedido até "concluído" ou
+# "rejeitado") por serviço, para o relatório da assembleia: "metade dos
+# pedidos de hidráulica foi concluída em até X horas, 90% em até Y".
+#
+# O cálculo exato ordenaria todos os pedidos da história. Aqui cada
+# (desfecho, mês, serviço) guarda um resumo t-digest (quantis.py, ~1 KB) na
+# tabela tempos_atendimento; a consulta junta os resumos dos meses pedidos,
+# com custo que depende de serviços x meses, não da quantidade de pedidos.
+#
+# Regras (as mesmas na escrita e na reconstrução, a partir de pedido_eventos):
+#   - conta a passagem de um status aberto para um desfecho; correções entre
+#     desfechos (rejeitado -> concluído) não contam de novo;
+#   - o tempo vai da criação do pedido até a passagem, em segundos;
+#   - o mês é o da passagem, no horário de Brasília;
+#   - pedido reaberto e concluído de novo conta outra vez, com o tempo total.
+#
+# A escrita lê o resumo, soma os valores e grava de volta. Por isso é chamada
+# depois de alguma outra escrita da mesma transação: a partir daí a conexão
+# tem a trava de escrita do SQLite e ninguém altera o resumo no meio.
+#
+# "flask reconstruir-tempos" refaz a tabela a partir de pedido_eventos.
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy.dialects.sqlite import insert
+from models import db, TempoAtendimento
+from quantis import TDigest
+from periodos import dia_local
+from catalogo import catalogo
+
+DESFECHOS = ('concluído', 'rejeitado')
+# Percentis do relatório
+QUANTIS = (0.5, 0.9)
+
+
+def desfecho(status):
+    """O desfecho ('concluído' ou 'rejeitado') correspondente ao status, ou None."""
+    status = (status or '').lower()
+    return status if status in DESFECHOS else None
+
+
+def mes_local(data):
+    """Primeiro dia do mês, no horário de Brasília, de uma data gravada em UTC."""
+    return dia_local(data).replace(day=1)
+
+
+# -------------------------------
+# Escrita (junto com a mudança de status)
+# -------------------------------
+def _gravar(resumos, fim, mes):
+    """Upsert dos resumos {servico_id: TDigest} num só executemany, sem commit."""
+    stmt = insert(TempoAtendimento)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['desfecho', 'mes', 'servico_id'],
+        set_={'quantidade': stmt.excluded.quantidade, 'resumo': stmt.excluded.resumo}
+    )
+    db.session.execute(stmt, [
+        {'desfecho': fim, 'mes': mes, 'servico_id': servico_id,
+         'quantidade': resumo.total, 'resumo': resumo.para_bytes()}
+        for servico_id, resumo in resumos.items()
+    ])
+
+
+def registrar_varios(pedidos, status, em=None):
+    """Registra vários (servico_id, criado em, status anterior) que passaram para status agora.
+
+    Um SELECT dos resumos do mês e um executemany, seja qual for a
+    quantidade de pedidos. Nada a fazer se status não for um desfecho.
+    """
+    fim = desfecho(status)
+    if fim is None:
+        return
+    em = em or datetime.utcnow()
+    tempos = defaultdict(list)
+    for servico_id, criado_em, anterior in pedidos:
+        if desfecho(anterior) is None:
+            tempos[servico_id].append((em - criado_em).total_seconds())
+    if not tempos:
+        return
+
+    mes = mes_local(em)
+    gravados = dict(db.session.query(TempoAtendimento.servico_id, TempoAtendimento.resumo).filter(
+        TempoAtendimento.desfecho == fim, TempoAtendimento.mes == mes,
+        TempoAtendimento.servico_id.in_(list(tempos))
+    ))
+    resumos = {}
+    for servico_id, valores in tempos.items():
+        resumo = TDigest.de_bytes(gravados[servico_id]) if servico_id in gravados else TDigest()
+        for valor in valores:
+            resumo.adicionar(valor)
+        resumos[servico_id] = resumo
+    _gravar(resumos, fim, mes)
+
+
+def registrar_mudanca(servico_id, criado_em, anterior, status):
+    """Um pedido mudou de status. Chamar depois de outra escrita da transação, antes do commit."""
+    registrar_varios([(servico_id, criado_em, anterior)], status)
+
+
+# -------------------------------
+# Consulta
+# -------------------------------
+def percentis(inicio, fim, status='concluído', quantis=QUANTIS):
+    """Percentis do tempo (em horas) para os desfechos nos meses de inicio a fim.
+
+    inicio e fim são primeiros dias de mês. Devolve
+    {'servicos': [{'servico_id', 'servico', 'quantidade', 'p50', ...}], 'geral': {...}},
+    com 'geral' juntando todos os serviços.
+    """
+    por_servico = defaultdict(TDigest)
+    for servico_id, dados in db.session.query(TempoAtendimento.servico_id, TempoAtendimento.resumo).filter(
+            TempoAtendimento.desfecho == desfecho(status),
+            TempoAtendimento.mes >= inicio, TempoAtendimento.mes <= fim):
+        por_servico[servico_id].mesclar(TDigest.de_bytes(dados))
+
+    def linha(resumo):
+        valores = {'quantidade': resumo.total}
+        for q in quantis:
+            segundos = resumo.quantil(q)
+            valores[f'p{round(q * 100)}'] = round(segundos / 3600, 1) if segundos is not None else None
+        return valores
+
+    geral = TDigest()
+    servicos = []
+    for servico_id, resumo in sorted(por_servico.items()):
+        geral.mesclar(resumo)
+        servico = catalogo.obter(servico_id)
+        servicos.append({'servico_id': servico_id,
+                         'servico': servico.nome if servico else f'Serviço {servico_id}',
+                         **linha(resumo)})
+    return {'servicos': servicos, 'geral': linha(geral)}
+
+
+# -------------------------------
+# Reconstrução
+# -------------------------------
+# Passagens de status aberto para desfecho, com o evento de criação do mesmo
+# pedido; tempo e hora UTC (que decide o mês local) calculados no SQLite
+AMOSTRAS_DO_HISTORICO = """
+    SELECT e.servico_id, lower(e.status), strftime('%Y-%m-%d %H', e.em),
+           (julianday(e.em) - julianday(c.em)) * 86400.0
+    FROM pedido_eventos e
+    JOIN pedido_eventos c ON c.pedido_id = e.pedido_id AND c.anterior IS NULL
+    WHERE e.anterior IS NOT NULL
+      AND lower(e.status) IN (?, ?) AND lower(e.anterior) NOT IN (?, ?)
+"""
+
+
+def amostras_do_historico(conexao):
+    """{(desfecho, mes, servico_id): [segundos]} a partir de pedido_eventos."""
+    amostras = defaultdict(list)
+    meses = {}
+    for servico_id, fim, hora, segundos in conexao.exec_driver_sql(AMOSTRAS_DO_HISTORICO,
+                                                                  DESFECHOS + DESFECHOS):
+        if hora not in meses:
+            meses[hora] = mes_local(datetime.strptime(hora, '%Y-%m-%d %H'))
+        amostras[fim, meses[hora], servico_id].append(segundos)
+    return amostras
+
+
+def reconstruir(amostras=None):
+    """Refaz tempos_atendimento a partir de pedido_eventos (com commit); devolve quantos tempos entraram.
+
+    amostras, no formato de amostras_do_historico, dispensa a leitura do
+    histórico (dados_sinteticos, que as junta enquanto gera os eventos).
+    """
+    if amostras is None:
+        amostras = amostras_do_historico(db.session.connection())
+    TempoAtendimento.query.delete()
+    if amostras:
+        linhas = []
+        for (fim, mes, servico_id), valores in amostras.items():
+            resumo = TDigest.de_valores(valores)
+            linhas.append({'desfecho': fim, 'mes': mes, 'servico_id': servico_id,
+                           'quantidade': resumo.total, 'resumo': resumo.para_bytes()})
+        db.session.execute(insert(TempoAtendimento), linhas)
+    db.session.commit()
+    return sum(len(valores) for valores in amostras.values())
@@ -0,0 +1,56 @@
+# banco.py
+# Perfis de configuração do SQLite, aplicados em cada conexão nova do engine
+# (evento 'connect' do SQLAlchemy).
+#
+# - padrao:   como o SQLite vem (journal de rollback; leitores bloqueiam o escritor)
+# - producao: WAL (leitores não bloqueiam o escritor), synchronous=NORMAL
+#             (fsync só no checkpoint, seguro com WAL), espera de até 5 s pelo lock
+#             em vez de "database is locked", e cache/mmap maiores.
+#
+# O perfil vem de SQLITE_PERFIL; SQLITE_PRAGMAS (dict) sobrescreve valores avulsos.
+from sqlalchemy import event
+
+PERFIS = {
+    'padrao': {},
+    'producao': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,          # ms
+        'cache_size': -20000,          # negativo = KiB (~20 MB por conexão)
+        'mmap_size': 268435456,        # 256 MB
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+def pragmas_do_app(app):
+    """Pragmas do perfil configurado, com os ajustes de SQLITE_PRAGMAS."""
+    perfil = app.config.get('SQLITE_PERFIL', 'producao')
+    if perfil not in PERFIS:
+        raise ValueError(f"SQLITE_PERFIL desconhecido: {perfil!r} (use {', '.join(PERFIS)})")
+    pragmas = dict(PERFIS[perfil])
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    return pragmas
+
+
+def aplicar_pragmas(conexao, pragmas):
+    """Executa os PRAGMAs em uma conexão sqlite3 recém-aberta."""
+    cursor = conexao.cursor()
+    for nome, valor in pragmas.items():
+        cursor.execute(f'PRAGMA {nome}={valor}')
+    cursor.close()
+
+
+def configurar_engine(engine, pragmas):
+    """Registra os pragmas para toda conexão nova do engine (só SQLite)."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _ao_conectar(conexao, registro):
+        aplicar_pragmas(conexao, pragmas)
+
+
+def init_app(app, db):
+    with app.app_context():
+        configurar_engine(db.engine, pragmas_do_app(app))
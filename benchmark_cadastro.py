@@ -0,0 +1,124 @@
+# benchmark_cadastro.py
+# Vazão de cadastros com vários processos ao mesmo tempo, comparando o fluxo
+# antigo do /cadastro (procura/cria o apartamento e três commits) com a
+# operação cadastrar_morador (upsert do apartamento e uma só transação).
+#
+# O hash da senha é calculado uma vez só, fora da medição: aqui interessa o
+# custo no banco. Os moradores caem em poucos apartamentos, para forçar a
+# disputa no "encontra ou cria".
+#
+# Uso: python benchmark_cadastro.py [--processos 4] [--segundos 5] [--apartamentos 20]
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+
+def _app(caminho):
+    os.environ['DATABASE_URL'] = f'sqlite:///{caminho}'
+    os.environ.setdefault('BCRYPT_LOG_ROUNDS', '10')
+    from app import app
+    return app
+
+
+def criar_banco(caminho):
+    app = _app(caminho)
+    from models import db
+    with app.app_context():
+        db.create_all()
+
+
+def cadastro_tres_commits(nome, bloco, numero, email, senha_hash):
+    """Como o /cadastro fazia antes: um commit por tabela."""
+    from models import db, Usuario, Morador, Apartamento
+
+    apartamento = Apartamento.query.filter_by(bloco=bloco, numero=numero).first()
+    if not apartamento:
+        apartamento = Apartamento(bloco=bloco, numero=numero)
+        db.session.add(apartamento)
+        db.session.commit()
+
+    usuario = Usuario(email=email, senha=senha_hash, tipo='morador')
+    db.session.add(usuario)
+    db.session.commit()
+
+    db.session.add(Morador(usuario_id=usuario.id, apartamento_id=apartamento.id, nome=nome))
+    db.session.commit()
+
+
+def cadastro_uma_transacao(nome, bloco, numero, email, senha_hash):
+    import escritas
+    escritas.executar('cadastrar_morador', nome=nome, bloco=bloco, numero=numero,
+                      telefone='', email=email, senha_hash=senha_hash)
+
+
+MODOS = {
+    'tres_commits': cadastro_tres_commits,
+    'uma_transacao': cadastro_uma_transacao,
+}
+
+
+def trabalhador(caminho, modo, indice, segundos, apartamentos, senha_hash, largada, saida):
+    app = _app(caminho)
+    from models import db
+    cadastrar = MODOS[modo]
+    sorteio = random.Random(indice)
+
+    ok = erros = 0
+    with app.app_context():
+        largada.wait()
+        fim = time.time() + segundos
+        while time.time() < fim:
+            n = sorteio.randrange(apartamentos)
+            try:
+                cadastrar(f'Morador {indice}-{ok + erros}', f'B{n % 4}', str(100 + n),
+                          f'p{indice}-{ok + erros}@teste.com', senha_hash)
+                ok += 1
+            except Exception:
+                db.session.rollback()
+                erros += 1
+    saida.put((ok, erros))
+
+
+def rodar(modo, processos, segundos, apartamentos):
+    import bcrypt
+    senha_hash = bcrypt.hashpw(b'bench123', bcrypt.gensalt(10)).decode('utf-8')
+
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'bench.db')
+        criador = ctx.Process(target=criar_banco, args=(caminho,))
+        criador.start()
+        criador.join()
+
+        largada = ctx.Barrier(processos)
+        saida = ctx.Queue()
+        trabalhadores = [
+            ctx.Process(target=trabalhador, args=(caminho, modo, i, segundos, apartamentos,
+                                                  senha_hash, largada, saida))
+            for i in range(processos)
+        ]
+        for p in trabalhadores:
+            p.start()
+        resultados = [saida.get() for _ in trabalhadores]
+        for p in trabalhadores:
+            p.join()
+
+    return sum(r[0] for r in resultados), sum(r[1] for r in resultados)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Vazão de cadastros: três commits x uma transação')
+    parser.add_argument('--processos', type=int, default=4)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--apartamentos', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{args.processos} processos cadastrando por {args.segundos:g} s "
+          f"em {args.apartamentos} apartamentos\n")
+    print(f"{'modo':<14} {'cadastros/s':>12} {'erros':>7}")
+    for modo in MODOS:
+        ok, erros = rodar(modo, args.processos, args.segundos, args.apartamentos)
+        print(f"{modo:<14} {ok / args.segundos:>12.0f} {erros:>7}")
@@ -0,0 +1,349 @@
+# benchmark_carga.py
+# Benchmark de ponta a ponta, por HTTP: gera um banco sintético
+# (dados_sinteticos.py), sobe o app no gunicorn em cima dele e dispara uma
+# carga mista de moradores e síndicos a partir de processos locais:
+#
+#   moradores   login, dashboard, meus pedidos, formulário e POST de novo pedido
+#   síndicos    login, dashboard, histórico (página 1, página 2 e filtros) e
+#               mudança de status
+#
+# Mostra requisições por segundo e latência p50/p95/p99 de cada endpoint e
+# grava tudo em JSON (com o commit e a configuração), para comparar rodadas
+# antes e depois de uma mudança e estimar quantos condomínios cabem num nó.
+#
+# Uso: python benchmark_carga.py [--workers 2] [--processos 2] [--conexoes 8]
+#                                [--segundos 20] [--pedidos 100000] [--saida carga.json]
+# Opções de ambiente do app (SQLITE_PERFIL etc.) passam para o gunicorn.
+import argparse
+import http.client
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from urllib.parse import urlencode
+
+CURSOR = re.compile(r'cursor=([\w-]+)')
+STATUS = ['pendente', 'em andamento', 'concluído', 'rejeitado']
+
+
+# -------------------------------
+# Preparação
+# -------------------------------
+def _ambiente(pasta, custo):
+    ambiente = dict(os.environ)
+    ambiente['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'carga.db')}"
+    ambiente['METRICAS_DIR'] = os.path.join(pasta, 'metricas')
+    ambiente.pop('ESCRITOR_ENDERECO', None)
+    if custo:
+        ambiente['BCRYPT_LOG_ROUNDS'] = str(custo)
+    return ambiente
+
+
+def criar_banco(ambiente, apartamentos, moradores, pedidos, semente):
+    os.environ.update(ambiente)
+    from app import app, db
+    import dados_sinteticos
+    with app.app_context():
+        db.create_all()
+        dados_sinteticos.gerar(semente=semente, apartamentos=apartamentos,
+                               moradores=moradores, pedidos=pedidos)
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _esperar_servidor(porta, processo, limite=120):
+    fim = time.time() + limite
+    while time.time() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError('o gunicorn terminou antes de atender')
+        try:
+            conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=2)
+            conexao.request('GET', '/login')
+            conexao.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('o gunicorn não respondeu a tempo')
+
+
+# -------------------------------
+# Usuário virtual
+# -------------------------------
+class Usuario:
+    def __init__(self, porta, email, senha, sorteio, pedidos, amostras, erros):
+        self.conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=60)
+        self.email = email
+        self.senha = senha
+        self.sorteio = sorteio
+        self.pedidos = pedidos
+        self.amostras = amostras      # rótulo -> [ms]
+        self.erros = erros            # rótulo -> quantidade
+        self.cookie = None
+        self.cursor = None
+        self.medindo = False
+
+    def pedir(self, rotulo, metodo, caminho, dados=None):
+        """Faz a requisição e registra a latência. Devolve o corpo (ou None se falhou)."""
+        cabecalhos = {}
+        corpo = None
+        if dados is not None:
+            corpo = urlencode(dados)
+            cabecalhos['Content-Type'] = 'application/x-www-form-urlencoded'
+        if self.cookie:
+            cabecalhos['Cookie'] = self.cookie
+
+        inicio = time.perf_counter()
+        try:
+            self.conexao.request(metodo, caminho, corpo, cabecalhos)
+            resposta = self.conexao.getresponse()
+            conteudo = resposta.read()
+        except (OSError, http.client.HTTPException):
+            self.conexao.close()
+            resposta = conteudo = None
+        ms = (time.perf_counter() - inicio) * 1000
+
+        ok = resposta is not None and resposta.status < 400 and (
+            rotulo.endswith('/login') or '/login' not in (resposta.getheader('Location') or ''))
+        if resposta is not None:
+            cookie = resposta.getheader('Set-Cookie')
+            if cookie:
+                self.cookie = cookie.split(';', 1)[0]
+        if self.medindo:
+            if ok:
+                self.amostras[rotulo].append(ms)
+            else:
+                self.erros[rotulo] += 1
+        return conteudo.decode('utf-8', 'replace') if ok else None
+
+    def entrar(self):
+        self.cookie = None
+        self.pedir('POST /login', 'POST', '/login', {'email': self.email, 'senha': self.senha})
+
+
+def _historico(u):
+    corpo = u.pedir('GET /historico', 'GET', '/historico')
+    encontrado = CURSOR.search(corpo or '')
+    u.cursor = encontrado.group(1) if encontrado else None
+
+
+def _historico_pagina_2(u):
+    if u.cursor is None:
+        return _historico(u)
+    u.pedir('GET /historico?cursor', 'GET', f'/historico?cursor={u.cursor}')
+
+
+def _historico_filtro(u):
+    filtros = {'servico': u.sorteio.randint(1, 8), 'status': u.sorteio.choice(STATUS)}
+    u.pedir('GET /historico?filtros', 'GET', '/historico?' + urlencode(filtros))
+
+
+def _alterar_status(u):
+    pedido_id = u.sorteio.randint(1, u.pedidos)
+    u.pedir('POST /alterar_status', 'POST', f'/alterar_status/{pedido_id}',
+            {'status': u.sorteio.choice(STATUS)})
+
+
+def _novo_pedido(u):
+    u.pedir('POST /novo_pedido', 'POST', '/novo_pedido',
+            {'servico_id': u.sorteio.randint(1, 8), 'nome': 'Pedido da carga',
+             'descricao': 'Gerado pelo benchmark de carga.'})
+
+
+# (peso, ação) de cada papel
+ACOES_MORADOR = [
+    (5, lambda u: u.entrar()),
+    (30, lambda u: u.pedir('GET /dashboard_morador', 'GET', '/dashboard_morador')),
+    (30, lambda u: u.pedir('GET /meus_pedidos', 'GET', '/meus_pedidos')),
+    (10, lambda u: u.pedir('GET /novo_pedido', 'GET', '/novo_pedido')),
+    (25, _novo_pedido),
+]
+ACOES_SINDICO = [
+    (5, lambda u: u.entrar()),
+    (20, lambda u: u.pedir('GET /dashboard_sindico', 'GET', '/dashboard_sindico')),
+    (30, _historico),
+    (15, _historico_pagina_2),
+    (10, _historico_filtro),
+    (20, _alterar_status),
+]
+
+
+def _rodar_usuario(usuario, acoes, inicio_medicao, fim):
+    pesos = [peso for peso, _ in acoes]
+    funcoes = [funcao for _, funcao in acoes]
+    usuario.entrar()
+    while True:
+        agora = time.time()
+        if agora >= fim:
+            break
+        usuario.medindo = agora >= inicio_medicao
+        usuario.sorteio.choices(funcoes, weights=pesos)[0](usuario)
+
+
+def trabalhador(porta, indice, conexoes, parte_sindicos, moradores, pedidos, senha,
+                semente, aquecimento, segundos, largada, saida):
+    from dados_sinteticos import EMAIL_SINDICO
+    amostras = defaultdict(list)
+    erros = Counter()
+    usuarios = []
+    for i in range(conexoes):
+        sorteio = random.Random(semente * 1000 + indice * conexoes + i)
+        if sorteio.random() < parte_sindicos:
+            email, acoes = EMAIL_SINDICO, ACOES_SINDICO
+        else:
+            email, acoes = f'morador{sorteio.randrange(moradores)}@exemplo.com', ACOES_MORADOR
+        usuarios.append((Usuario(porta, email, senha, sorteio, pedidos, amostras, erros), acoes))
+
+    largada.wait()
+    inicio_medicao = time.time() + aquecimento
+    fim = inicio_medicao + segundos
+    threads = [threading.Thread(target=_rodar_usuario, args=(u, acoes, inicio_medicao, fim))
+               for u, acoes in usuarios]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    saida.put((dict(amostras), dict(erros)))
+
+
+# -------------------------------
+# Resultado
+# -------------------------------
+def percentil(ordenados, p):
+    if not ordenados:
+        return None
+    return round(ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)], 2)
+
+
+def resumo(latencias, erros, segundos):
+    ordenados = sorted(latencias)
+    return {
+        'requisicoes': len(ordenados),
+        'erros': erros,
+        'rps': round(len(ordenados) / segundos, 1),
+        'p50_ms': percentil(ordenados, 50),
+        'p95_ms': percentil(ordenados, 95),
+        'p99_ms': percentil(ordenados, 99),
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def rodar(args):
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as pasta:
+        ambiente = _ambiente(pasta, args.custo_bcrypt)
+        print(f"Gerando {args.pedidos} pedidos, {args.moradores} moradores...")
+        criador = ctx.Process(target=criar_banco, args=(ambiente, args.apartamentos, args.moradores,
+                                                         args.pedidos, args.semente))
+        criador.start()
+        criador.join()
+        if criador.exitcode:
+            raise RuntimeError('falha ao gerar o banco')
+
+        porta = _porta_livre()
+        servidor = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers),
+             '--threads', str(args.threads), '--bind', f'127.0.0.1:{porta}',
+             '--log-level', 'warning', 'app:app'],
+            env=ambiente
+        )
+        try:
+            _esperar_servidor(porta, servidor)
+            print(f"gunicorn: {args.workers} worker(s) x {args.threads} thread(s); "
+                  f"carga: {args.processos} processo(s) x {args.conexoes} conexões, "
+                  f"{args.aquecimento:g} s de aquecimento + {args.segundos:g} s medidos\n")
+
+            from dados_sinteticos import SENHA
+            largada = ctx.Barrier(args.processos)
+            saida = ctx.Queue()
+            processos = [
+                ctx.Process(target=trabalhador, args=(
+                    porta, i, args.conexoes, args.sindicos, args.moradores, args.pedidos, SENHA,
+                    args.semente, args.aquecimento, args.segundos, largada, saida))
+                for i in range(args.processos)
+            ]
+            for p in processos:
+                p.start()
+            parciais = [saida.get() for _ in processos]
+            for p in processos:
+                p.join()
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+    latencias = defaultdict(list)
+    erros = Counter()
+    for amostras, falhas in parciais:
+        for rotulo, valores in amostras.items():
+            latencias[rotulo].extend(valores)
+        erros.update(falhas)
+
+    rotulos = sorted(set(latencias) | set(erros))
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'configuracao': vars(args),
+        'maquina': {'cpus': os.cpu_count(), 'python': platform.python_version(),
+                    'sistema': platform.platform()},
+        'total': resumo([ms for valores in latencias.values() for ms in valores],
+                        sum(erros.values()), args.segundos),
+        'endpoints': {r: resumo(latencias[r], erros[r], args.segundos) for r in rotulos},
+    }
+
+
+def imprimir(resultado):
+    def ms(valor):
+        return f"{valor:>8.1f}" if valor is not None else f"{'-':>8}"
+
+    print(f"{'endpoint':<28} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    linhas = list(resultado['endpoints'].items()) + [('TOTAL', resultado['total'])]
+    for rotulo, r in linhas:
+        print(f"{rotulo:<28} {r['rps']:>8.1f} {ms(r['p50_ms'])} {ms(r['p95_ms'])} "
+              f"{ms(r['p99_ms'])} {r['erros']:>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Carga HTTP mista contra o app no gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='Workers do gunicorn.')
+    parser.add_argument('--threads', type=int, default=1, help='Threads por worker do gunicorn.')
+    parser.add_argument('--processos', type=int, default=2, help='Processos gerando carga.')
+    parser.add_argument('--conexoes', type=int, default=8, help='Usuários simultâneos por processo.')
+    parser.add_argument('--segundos', type=float, default=20)
+    parser.add_argument('--aquecimento', type=float, default=3)
+    parser.add_argument('--sindicos', type=float, default=0.2, help='Fração de usuários síndicos.')
+    parser.add_argument('--apartamentos', type=int, default=400)
+    parser.add_argument('--moradores', type=int, default=800)
+    parser.add_argument('--pedidos', type=int, default=100_000)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--custo-bcrypt', type=int, default=None,
+                        help='Custo fixo do bcrypt (padrão: calibrado como em produção).')
+    parser.add_argument('--saida', default=None, help='Arquivo JSON (padrão: carga-<data>.json).')
+    args = parser.parse_args()
+
+    resultado = rodar(args)
+    imprimir(resultado)
+    saida = args.saida or f"carga-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"\nResultado salvo em {saida}")
@@ -0,0 +1,122 @@
+# benchmark_escrita.py
+# Dispara POSTs de /novo_pedido de vários processos ao mesmo tempo (como os
+# workers do gunicorn) e compara a gravação direta com o escritor único
+# (escritor.py), que grava vários pedidos por commit.
+#
+# Uso: python benchmark_escrita.py [--processos 8] [--segundos 5]
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+SENHA = 'bench123'
+
+
+def _preparar_ambiente(caminho, endereco=None):
+    os.environ['DATABASE_URL'] = f'sqlite:///{caminho}'
+    os.environ.setdefault('BCRYPT_LOG_ROUNDS', '10')  # sem calibração em cada processo
+    if endereco:
+        os.environ['ESCRITOR_ENDERECO'] = endereco
+
+
+def criar_banco(caminho, processos):
+    _preparar_ambiente(caminho)
+    from app import app, db
+    from models import Usuario, Servico, Morador, Apartamento
+    import senhas
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Servico(id=1, nome='Elétrica'))
+        db.session.add(Apartamento(id=1, bloco='A', numero='101'))
+        senha_hash = senhas.gerar_hash(SENHA)
+        for i in range(processos):
+            db.session.add(Usuario(id=i + 1, email=f'bench{i}@teste.com', senha=senha_hash, tipo='morador'))
+            db.session.add(Morador(usuario_id=i + 1, apartamento_id=1, nome=f'Bench {i}'))
+        db.session.commit()
+
+
+def escritor(caminho, endereco):
+    _preparar_ambiente(caminho, endereco)
+    from app import app
+    import escritor
+    escritor.servir(app, endereco)
+
+
+def trabalhador(caminho, endereco, indice, segundos, largada, saida):
+    _preparar_ambiente(caminho, endereco)
+    from app import app
+
+    cliente = app.test_client()
+    cliente.post('/login', data={'email': f'bench{indice}@teste.com', 'senha': SENHA})
+
+    ok = erros = 0
+    latencias = []
+    largada.wait()  # todos começam juntos, já com o app importado
+    fim = time.time() + segundos
+    while time.time() < fim:
+        t0 = time.perf_counter()
+        try:
+            resposta = cliente.post('/novo_pedido', data={'servico_id': '1', 'nome': 'Bench', 'descricao': '...'})
+            sucesso = resposta.status_code == 302
+        except Exception:
+            sucesso = False
+        latencias.append(time.perf_counter() - t0)
+        if sucesso:
+            ok += 1
+        else:
+            erros += 1
+    saida.put((ok, erros, latencias))
+
+
+def rodar(modo, processos, segundos):
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'bench.db')
+        endereco = os.path.join(pasta, 'escritor.sock') if modo == 'escritor' else None
+
+        criador = ctx.Process(target=criar_banco, args=(caminho, processos))
+        criador.start()
+        criador.join()
+
+        servidor = None
+        if endereco:
+            servidor = ctx.Process(target=escritor, args=(caminho, endereco), daemon=True)
+            servidor.start()
+            while not os.path.exists(endereco):
+                time.sleep(0.05)
+
+        largada = ctx.Barrier(processos)
+        saida = ctx.Queue()
+        trabalhadores = [
+            ctx.Process(target=trabalhador, args=(caminho, endereco, i, segundos, largada, saida))
+            for i in range(processos)
+        ]
+        for p in trabalhadores:
+            p.start()
+        resultados = [saida.get() for _ in trabalhadores]
+        for p in trabalhadores:
+            p.join()
+
+        if servidor:
+            servidor.terminate()
+
+    ok = sum(r[0] for r in resultados)
+    erros = sum(r[1] for r in resultados)
+    latencias = sorted(l for r in resultados for l in r[2])
+    p95 = latencias[int(len(latencias) * 0.95)] * 1000 if latencias else 0
+    return ok, erros, p95
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compara a gravação direta com o escritor único')
+    parser.add_argument('--processos', type=int, default=8)
+    parser.add_argument('--segundos', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.processos} processos enviando /novo_pedido por {args.segundos:g} s\n")
+    print(f"{'modo':<10} {'pedidos/s':>10} {'erros':>7} {'p95 (ms)':>9}")
+    for modo in ('direto', 'escritor'):
+        ok, erros, p95 = rodar(modo, args.processos, args.segundos)
+        print(f"{modo:<10} {ok / args.segundos:>10.0f} {erros:>7} {p95:>9.1f}")
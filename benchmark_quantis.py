@@ -0,0 +1,143 @@
+# benchmark_quantis.py
+# Precisão dos percentis do t-digest (quantis.py) contra os percentis exatos.
+#
+# 1. Em memória: distribuições parecidas com tempos de atendimento
+#    (log-normal, exponencial, mistura de serviços rápidos e lentos, uniforme).
+#    Para cada uma, o resumo montado valor a valor (como na escrita) e o
+#    montado em 12 partes, gravadas em bytes e depois juntadas (como a
+#    consulta de 12 meses). Mostra o erro do valor (%) e o erro de posição
+#    (quantos % dos valores ficam entre o estimado e o exato), mais o tamanho
+#    gravado e o tempo de montar/consultar contra ordenar tudo.
+# 2. Com --pedidos: banco temporário com dados sintéticos, comparando
+#    atendimento.percentis (lê só os resumos) com o cálculo exato a partir de
+#    pedido_eventos, por serviço.
+#
+# Uso: python benchmark_quantis.py [--valores 200000] [--compressao 100] [--pedidos 100000]
+import argparse
+import bisect
+import os
+import random
+import tempfile
+import time
+
+QUANTIS = (0.5, 0.9, 0.99)
+
+
+def exato(ordenados, q):
+    """Percentil com interpolação linear entre vizinhos (o mesmo do Excel/NumPy)."""
+    posicao = q * (len(ordenados) - 1)
+    i = int(posicao)
+    if i + 1 >= len(ordenados):
+        return ordenados[-1]
+    return ordenados[i] + (ordenados[i + 1] - ordenados[i]) * (posicao - i)
+
+
+def erro_posicao(ordenados, estimado, q):
+    """Distância, em fração dos valores, entre a posição do estimado e q."""
+    inicio = bisect.bisect_left(ordenados, estimado)
+    fim = bisect.bisect_right(ordenados, estimado)
+    n = len(ordenados)
+    if inicio / n <= q <= fim / n:
+        return 0.0
+    return min(abs(inicio / n - q), abs(fim / n - q))
+
+
+def distribuicoes(sorteio, n):
+    def mistura():
+        # 70% de serviços rápidos (~8 h), 30% lentos (~3 dias)
+        return (sorteio.lognormvariate(2, 0.6) if sorteio.random() < 0.7
+                else sorteio.lognormvariate(4.3, 0.5))
+    return {
+        'log-normal': [sorteio.lognormvariate(3, 0.9) for _ in range(n)],
+        'exponencial': [sorteio.expovariate(1 / 24) for _ in range(n)],
+        'mistura': [mistura() for _ in range(n)],
+        'uniforme': [sorteio.uniform(0, 240) for _ in range(n)],
+    }
+
+
+def em_memoria(valores_por_distribuicao, compressao):
+    from quantis import TDigest
+
+    print(f"{'distribuição':<12} {'montagem':<9} {'q':>5} {'exato':>9} {'resumo':>9} "
+          f"{'erro valor':>11} {'erro posição':>13}")
+    for nome, valores in valores_por_distribuicao.items():
+        inicio = time.perf_counter()
+        ordenados = sorted(valores)
+        exatos = {q: exato(ordenados, q) for q in QUANTIS}
+        tempo_exato = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        um_a_um = TDigest(compressao)
+        for valor in valores:
+            um_a_um.adicionar(valor)
+        tempo_montar = time.perf_counter() - inicio
+
+        partes = [TDigest.de_valores(valores[i::12], compressao).para_bytes() for i in range(12)]
+        inicio = time.perf_counter()
+        juntado = TDigest(compressao)
+        for dados in partes:
+            juntado.mesclar(TDigest.de_bytes(dados, compressao))
+        estimados = {q: juntado.quantil(q) for q in QUANTIS}
+        tempo_consulta = time.perf_counter() - inicio
+
+        # Os quantis do juntado são os consultados dentro do tempo medido acima
+        linhas = (('um a um', {q: um_a_um.quantil(q) for q in QUANTIS}), ('12 partes', estimados))
+        for montagem, quantis in linhas:
+            for q in QUANTIS:
+                estimado = quantis[q]
+                print(f"{nome:<12} {montagem:<9} {q:>5} {exatos[q]:>9.2f} {estimado:>9.2f} "
+                      f"{abs(estimado - exatos[q]) / exatos[q] * 100:>10.2f}% "
+                      f"{erro_posicao(ordenados, estimado, q) * 100:>12.3f}%")
+        print(f"{'':<12} {len(valores)} valores; resumo com {len(um_a_um.para_bytes())} bytes; "
+              f"{tempo_montar / len(valores) * 1e6:.1f} µs por valor; "
+              f"juntar 12 partes + consultar: {tempo_consulta * 1000:.1f} ms; "
+              f"ordenar tudo: {tempo_exato * 1000:.0f} ms\n")
+
+
+def com_banco(pedidos):
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'quantis.db')}"
+    os.environ.pop('ESCRITOR_ENDERECO', None)
+    from app import app
+    from models import db
+    from datetime import date
+    import atendimento
+    import dados_sinteticos
+
+    with app.app_context():
+        db.create_all()
+        dados_sinteticos.gerar(pedidos=pedidos)
+
+        inicio = time.perf_counter()
+        resultado = atendimento.percentis(date(2000, 1, 1), date(2100, 1, 1))
+        tempo_resumo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        por_servico = {}
+        for (fim, _, servico_id), valores in atendimento.amostras_do_historico(db.session.connection()).items():
+            if fim == 'concluído':
+                por_servico.setdefault(servico_id, []).extend(valores)
+        exatos = {servico_id: {q: exato(sorted(valores), q) / 3600 for q in atendimento.QUANTIS}
+                  for servico_id, valores in por_servico.items()}
+        tempo_exato = time.perf_counter() - inicio
+
+    print(f"Banco com {pedidos} pedidos — horas até a conclusão, resumo x exato")
+    print(f"{'serviço':<14} {'pedidos':>8} {'p50':>7} {'exato':>7} {'p90':>7} {'exato':>7}")
+    for linha in resultado['servicos']:
+        exato_servico = exatos[linha['servico_id']]
+        print(f"{linha['servico']:<14} {linha['quantidade']:>8} {linha['p50']:>7} {exato_servico[0.5]:>7.1f} "
+              f"{linha['p90']:>7} {exato_servico[0.9]:>7.1f}")
+    print(f"\nResumos: {tempo_resumo * 1000:.1f} ms; exato a partir de pedido_eventos: {tempo_exato * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precisão do t-digest contra percentis exatos')
+    parser.add_argument('--valores', type=int, default=200_000)
+    parser.add_argument('--compressao', type=int, default=100)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--pedidos', type=int, default=0, help='Também compara num banco sintético.')
+    args = parser.parse_args()
+
+    em_memoria(distribuicoes(random.Random(args.semente), args.valores), args.compressao)
+    if args.pedidos:
+        com_banco(args.pedidos)
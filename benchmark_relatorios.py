@@ -0,0 +1,156 @@
+# benchmark_relatorios.py
+# Relatórios do síndico (relatorios.py) calculados de três jeitos, sobre o
+# mesmo banco, conferindo que os três dão o mesmo resultado:
+#
+#   orm     uma passada pelos objetos Pedido, em lotes, com serviço, usuário,
+#           morador e apartamento carregados junto (sem N+1), somando os
+#           três relatórios em dicionários
+#   sql     um GROUP BY por relatório; o mês sai da hora UTC agrupada no
+#           SQLite e convertida para Brasília em Python, como em periodos.py
+#   numpy   relatorios.carregar() uma vez e os três relatórios sobre os arrays
+#
+# Sem --banco, gera um banco temporário com dados sintéticos (1 milhão de
+# pedidos leva pouco mais de 1 minuto). O ORM é o mais lento de longe; use
+# --sem-orm para pular.
+#
+# Uso: python benchmark_relatorios.py [--pedidos 1000000] [--banco /tmp/rel.db] [--sem-orm]
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+
+
+def normalizar(mapa, crescimento, ranking):
+    """Os três relatórios em estruturas Python simples, para comparar."""
+    return (
+        {chave: quantidade for chave, quantidade in mapa.items() if quantidade},
+        dict(sorted(crescimento.items())),
+        ranking,
+    )
+
+
+def com_orm(limite):
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from models import db, Pedido, Usuario, Morador
+    from atendimento import desfecho, mes_local
+
+    mapa, crescimento, total, abertos, nomes = Counter(), Counter(), Counter(), Counter(), {}
+    consulta = select(Pedido).options(
+        selectinload(Pedido.servico),
+        selectinload(Pedido.usuario).selectinload(Usuario.morador).selectinload(Morador.apartamento_obj),
+    ).execution_options(yield_per=10_000)
+    for pedido in db.session.scalars(consulta):
+        crescimento[mes_local(pedido.data).strftime('%Y-%m')] += 1
+        morador = pedido.usuario.morador
+        if morador is None:
+            continue
+        apartamento = morador.apartamento_obj
+        mapa[apartamento.bloco or '', pedido.servico.nome] += 1
+        total[apartamento.id] += 1
+        abertos[apartamento.id] += desfecho(pedido.status) is None
+        nomes[apartamento.id] = (apartamento.bloco or '', apartamento.numero)
+    ordem = sorted(total, key=lambda id: (-total[id], nomes[id], id))[:limite]
+    return normalizar(mapa, crescimento, [(*nomes[id], total[id], abertos[id]) for id in ordem])
+
+
+def com_sql(limite):
+    from models import db
+    from atendimento import DESFECHOS
+    from periodos import dia_local
+    from datetime import datetime
+
+    conexao = db.session.connection()
+    mapa = {(bloco, servico): quantidade for bloco, servico, quantidade in conexao.exec_driver_sql("""
+        SELECT coalesce(a.bloco, ''), s.nome, count(*)
+        FROM pedidos p
+        JOIN moradores m ON m.usuario_id = p.usuario_id
+        JOIN apartamentos a ON a.id = m.apartamento_id
+        JOIN servicos s ON s.id = p.servico_id
+        GROUP BY 1, 2
+    """)}
+
+    crescimento = Counter()
+    for hora, quantidade in conexao.exec_driver_sql(
+            "SELECT strftime('%Y-%m-%d %H', data), count(*) FROM pedidos GROUP BY 1"):
+        crescimento[dia_local(datetime.strptime(hora, '%Y-%m-%d %H')).strftime('%Y-%m')] += quantidade
+
+    ranking = [tuple(linha) for linha in conexao.exec_driver_sql("""
+        SELECT coalesce(a.bloco, ''), a.numero, count(*),
+               sum(lower(p.status) NOT IN (?, ?))
+        FROM pedidos p
+        JOIN moradores m ON m.usuario_id = p.usuario_id
+        JOIN apartamentos a ON a.id = m.apartamento_id
+        GROUP BY a.id
+        ORDER BY 3 DESC, 1, 2, a.id
+        LIMIT ?
+    """, DESFECHOS + (limite,))]
+    return normalizar(mapa, crescimento, ranking)
+
+
+def com_numpy(limite, tempos):
+    import relatorios
+
+    inicio = time.perf_counter()
+    colunas = relatorios.carregar()
+    tempos['numpy: carregar'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    mapa = relatorios.mapa_blocos_servicos(colunas)
+    crescimento = relatorios.crescimento_mensal(colunas)
+    ranking = relatorios.ranking_apartamentos(colunas, limite)
+    tempos['numpy: 3 relatórios'] = time.perf_counter() - inicio
+
+    bytes_ = sum(getattr(colunas, nome).nbytes for nome in ('dia', 'servico', 'status', 'apartamento'))
+    print(f"{len(colunas)} pedidos em {bytes_ / 2**20:.1f} MiB de arrays")
+    return normalizar(
+        {(bloco, servico): quantidade
+         for bloco, linha in zip(mapa.blocos, mapa.quantidades.tolist())
+         for servico, quantidade in zip(mapa.servicos, linha)},
+        {str(mes): quantidade for mes, quantidade in zip(crescimento.meses, crescimento.quantidades.tolist())},
+        [(*apartamento, total, abertos) for apartamento, total, abertos
+         in zip(ranking.apartamentos, ranking.total.tolist(), ranking.abertos.tolist())],
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Relatórios em ORM, SQL e NumPy')
+    parser.add_argument('--pedidos', type=int, default=1_000_000)
+    parser.add_argument('--banco', help='Usa um banco SQLite já preenchido (ex.: flask gerar-dados).')
+    parser.add_argument('--limite', type=int, default=20, help='Apartamentos no ranking.')
+    parser.add_argument('--sem-orm', action='store_true')
+    args = parser.parse_args()
+
+    caminho = args.banco or os.path.join(tempfile.mkdtemp(), 'relatorios.db')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.abspath(caminho)}"
+    os.environ.pop('ESCRITOR_ENDERECO', None)
+    from app import app
+    from models import db
+
+    with app.app_context():
+        if not args.banco:
+            import dados_sinteticos
+            db.create_all()
+            inicio = time.perf_counter()
+            dados_sinteticos.gerar(pedidos=args.pedidos)
+            print(f"{args.pedidos} pedidos gerados em {time.perf_counter() - inicio:.0f} s")
+
+        tempos, resultados = {}, {}
+        resultados['numpy'] = com_numpy(args.limite, tempos)
+        tempos['numpy'] = tempos['numpy: carregar'] + tempos['numpy: 3 relatórios']
+        inicio = time.perf_counter()
+        resultados['sql'] = com_sql(args.limite)
+        tempos['sql: 3 GROUP BY'] = time.perf_counter() - inicio
+        if not args.sem_orm:
+            inicio = time.perf_counter()
+            resultados['orm'] = com_orm(args.limite)
+            tempos['orm: 1 passada'] = time.perf_counter() - inicio
+        db.session.rollback()
+
+    for nome, segundos in tempos.items():
+        print(f"{nome:<22} {segundos * 1000:>9.0f} ms")
+    for nome, resultado in resultados.items():
+        if resultado != resultados['numpy']:
+            raise SystemExit(f"❌ {nome} diverge do NumPy")
+    print(f"✅ {', '.join(resultados)}: mesmos resultados")
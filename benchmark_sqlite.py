@@ -0,0 +1,99 @@
+# benchmark_sqlite.py
+# Compara os perfis do SQLite (banco.py) com vários processos escrevendo e
+# lendo o mesmo arquivo ao mesmo tempo, como os workers do gunicorn fazem.
+#
+# Escritores: inserem pedidos em transações pequenas (como o novo_pedido).
+# Leitores: rodam a consulta da primeira página do /historico.
+#
+# Uso: python benchmark_sqlite.py [--escritores 4] [--leitores 4] [--segundos 5]
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+import banco
+from models import db, Usuario, Servico, Pedido
+
+pedidos = Pedido.__table__
+
+
+def criar_banco(caminho, pragmas):
+    engine = create_engine(f'sqlite:///{caminho}')
+    banco.configurar_engine(engine, pragmas)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Usuario.__table__).values(id=1, email='bench@teste.com', senha='x', tipo='morador'))
+        conn.execute(insert(Servico.__table__).values(id=1, nome='Elétrica'))
+        conn.execute(insert(pedidos), [
+            {'usuario_id': 1, 'servico_id': 1, 'nome': f'Pedido {i}', 'status': 'pendente', 'data': datetime.utcnow()}
+            for i in range(1000)
+        ])
+    engine.dispose()
+
+
+def trabalhador(caminho, pragmas, papel, segundos, inicio):
+    engine = create_engine(f'sqlite:///{caminho}')
+    banco.configurar_engine(engine, pragmas)
+    consulta = select(pedidos.c.id, pedidos.c.status, pedidos.c.data)\
+        .order_by(pedidos.c.data.desc(), pedidos.c.id.desc()).limit(50)
+
+    ok = erros = 0
+    while time.time() < inicio:
+        time.sleep(0.001)
+    fim = inicio + segundos
+    while time.time() < fim:
+        try:
+            if papel == 'escrita':
+                with engine.begin() as conn:
+                    conn.execute(insert(pedidos).values(
+                        usuario_id=1, servico_id=1, nome='Bench', status='pendente', data=datetime.utcnow()
+                    ))
+            else:
+                with engine.connect() as conn:
+                    conn.execute(consulta).fetchall()
+            ok += 1
+        except OperationalError:
+            erros += 1
+    engine.dispose()
+    return papel, ok, erros
+
+
+def rodar(perfil, escritores, leitores, segundos):
+    pragmas = banco.PERFIS[perfil]
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'bench.db')
+        criar_banco(caminho, pragmas)
+
+        inicio = time.time() + 1  # todos começam juntos
+        tarefas = [(caminho, pragmas, 'escrita', segundos, inicio)] * escritores
+        tarefas += [(caminho, pragmas, 'leitura', segundos, inicio)] * leitores
+        with multiprocessing.Pool(len(tarefas)) as pool:
+            resultados = pool.starmap(trabalhador, tarefas)
+
+    total = {'escrita': [0, 0], 'leitura': [0, 0]}
+    for papel, ok, erros in resultados:
+        total[papel][0] += ok
+        total[papel][1] += erros
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compara os perfis do SQLite sob concorrência')
+    parser.add_argument('--escritores', type=int, default=4)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--perfis', default=','.join(banco.PERFIS))
+    args = parser.parse_args()
+
+    print(f"{args.escritores} escritores + {args.leitores} leitores, {args.segundos:g} s por perfil\n")
+    print(f"{'perfil':<10} {'escritas/s':>11} {'erros esc.':>11} {'leituras/s':>11} {'erros leit.':>12}")
+    for perfil in args.perfis.split(','):
+        total = rodar(perfil, args.escritores, args.leitores, args.segundos)
+        (esc, esc_erros), (leit, leit_erros) = total['escrita'], total['leitura']
+        print(f"{perfil:<10} {esc / args.segundos:>11.0f} {esc_erros:>11} "
+              f"{leit / args.segundos:>11.0f} {leit_erros:>12}")
@@ -0,0 +1,110 @@
+# busca.py
+# Busca textual nos pedidos (nome, descrição e observação) com o FTS5 do SQLite.
+#
+# pedidos_busca é uma tabela FTS5 de conteúdo externo: guarda só o índice
+# invertido e lê o texto da própria tabela pedidos. Gatilhos mantêm o índice
+# em dia a cada INSERT, DELETE e UPDATE desses três campos (a mudança de
+# status, a escrita mais comum, não toca no índice). O tokenizador unicode61
+# com remove_diacritics ignora acentos e maiúsculas: "agua" encontra "Água".
+#
+# A tabela é criada pela migração e, em bancos de teste feitos com
+# db.create_all(), logo depois da tabela pedidos (evento after_create abaixo).
+import re
+from contextlib import contextmanager
+
+from markupsafe import Markup, escape
+from sqlalchemy import column, event, literal_column, table, text
+from models import db, Pedido
+
+TABELA = 'pedidos_busca'
+
+CRIAR = [
+    """CREATE VIRTUAL TABLE pedidos_busca USING fts5(
+        nome, descricao, observacao,
+        content='pedidos', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER pedidos_busca_insert AFTER INSERT ON pedidos BEGIN
+        INSERT INTO pedidos_busca(rowid, nome, descricao, observacao)
+        VALUES (new.id, new.nome, new.descricao, new.observacao);
+    END""",
+    """CREATE TRIGGER pedidos_busca_delete AFTER DELETE ON pedidos BEGIN
+        INSERT INTO pedidos_busca(pedidos_busca, rowid, nome, descricao, observacao)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.observacao);
+    END""",
+    """CREATE TRIGGER pedidos_busca_update AFTER UPDATE OF nome, descricao, observacao ON pedidos BEGIN
+        INSERT INTO pedidos_busca(pedidos_busca, rowid, nome, descricao, observacao)
+        VALUES ('delete', old.id, old.nome, old.descricao, old.observacao);
+        INSERT INTO pedidos_busca(rowid, nome, descricao, observacao)
+        VALUES (new.id, new.nome, new.descricao, new.observacao);
+    END""",
+]
+
+# Marcadores do snippet(); trocados por <mark> depois de escapar o texto
+INICIO_DESTAQUE, FIM_DESTAQUE = '\x02', '\x03'
+
+pedidos_busca = table(TABELA, column('rowid'))
+
+
+def expressao_busca(texto):
+    """Texto digitado -> consulta FTS5 (None se não sobrar nenhuma palavra).
+
+    Cada palavra vai entre aspas, então o que o usuário digita nunca é lido
+    como operador do FTS5; todas precisam aparecer (E implícito). Palavra
+    terminada em * casa como prefixo ("vazam*" acha "vazamento"). Prefixo não
+    é o padrão: juntar as listas de todos os termos que começam igual deixa
+    a consulta várias vezes mais lenta.
+    """
+    palavras = re.findall(r'(\w+)(\*?)', texto or '')
+    return ' '.join(f'"{palavra}"{prefixo}' for palavra, prefixo in palavras) or None
+
+
+def casa_busca(expressao):
+    """Condição WHERE da busca (usar com pedidos_busca no FROM)."""
+    return text('pedidos_busca MATCH :busca').bindparams(busca=expressao)
+
+
+def relevancia():
+    """bm25 da linha encontrada: quanto menor, mais relevante."""
+    return db.func.bm25(literal_column(TABELA))
+
+
+def trecho():
+    """Trecho do campo que casou, com as palavras encontradas marcadas."""
+    return db.func.snippet(literal_column(TABELA), -1, INICIO_DESTAQUE, FIM_DESTAQUE, '…', 12)
+
+
+def trecho_html(texto):
+    """Trecho do snippet() como HTML seguro, com as palavras em <mark>."""
+    if not texto:
+        return None
+    html = str(escape(texto))
+    return Markup(html.replace(INICIO_DESTAQUE, '<mark>').replace(FIM_DESTAQUE, '</mark>'))
+
+
+def reconstruir_busca():
+    """Refaz o índice inteiro a partir da tabela pedidos (e faz o commit)."""
+    db.session.execute(text("INSERT INTO pedidos_busca(pedidos_busca) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+@contextmanager
+def carga_em_massa():
+    """Para inserir muitos pedidos: sem o gatilho de INSERT, e um 'rebuild' no fim.
+
+    Indexar linha a linha pelo gatilho custa mais que refazer o índice de uma vez.
+    """
+    db.session.execute(text('DROP TRIGGER IF EXISTS pedidos_busca_insert'))
+    db.session.commit()
+    try:
+        yield
+    finally:
+        db.session.rollback()
+        db.session.execute(text(CRIAR[1]))
+        reconstruir_busca()
+
+
+@event.listens_for(Pedido.__table__, 'after_create')
+def _criar_busca(tabela, conexao, **kwargs):
+    for comando in CRIAR:
+        conexao.exec_driver_sql(comando)
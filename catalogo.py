@@ -0,0 +1,65 @@
+# catalogo.py
+# Cache em memória do catálogo de serviços, compartilhado por todas as
+# requisições do worker. O catálogo quase nunca muda, então as páginas leem
+# daqui em vez de rodar Servico.query a cada acesso.
+#
+# Cada worker do gunicorn tem sua própria cópia. Quem cadastra um serviço
+# incrementa a versão 'servicos' em versoes_cache na mesma transação; os
+# outros workers conferem essa versão no máximo a cada INTERVALO_VERIFICACAO
+# segundos e recarregam quando ela muda.
+import threading
+import time
+from collections import namedtuple
+
+from models import db, Servico
+from versoes import versao_atual, incrementar_versao
+
+CHAVE = 'servicos'
+INTERVALO_VERIFICACAO = 5.0
+
+# Registro imutável de serviço (os templates usam .id e .nome)
+ServicoInfo = namedtuple('ServicoInfo', ['id', 'nome'])
+
+
+class CatalogoServicos:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (tupla ordenada por nome, dict por id); trocado de uma vez só
+        self._estado = None
+        self._versao = None
+        self._verificado_em = 0.0
+
+    def _carregar(self, versao):
+        linhas = db.session.query(Servico.id, Servico.nome).order_by(Servico.nome).all()
+        servicos = tuple(ServicoInfo(id, nome) for id, nome in linhas)
+        self._estado = (servicos, {s.id: s for s in servicos})
+        self._versao = versao
+
+    def _atual(self):
+        estado = self._estado
+        if estado is not None and time.monotonic() - self._verificado_em < INTERVALO_VERIFICACAO:
+            return estado
+        with self._lock:
+            if self._estado is None or time.monotonic() - self._verificado_em >= INTERVALO_VERIFICACAO:
+                versao = versao_atual(CHAVE)
+                if self._estado is None or versao != self._versao:
+                    self._carregar(versao)
+                self._verificado_em = time.monotonic()
+            return self._estado
+
+    def listar(self):
+        """Todos os serviços, ordenados por nome."""
+        return self._atual()[0]
+
+    def obter(self, servico_id):
+        """Serviço pelo id, ou None."""
+        return self._atual()[1].get(servico_id)
+
+    def invalidar(self):
+        """Marca o catálogo como alterado. Chamar antes do commit da escrita."""
+        incrementar_versao(CHAVE)
+        with self._lock:
+            self._estado = None
+
+
+catalogo = CatalogoServicos()
@@ -0,0 +1,276 @@
+# consultas.py
+import base64
+import binascii
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from models import db, Usuario, Servico, Pedido
+from busca import pedidos_busca, expressao_busca, casa_busca, relevancia, trecho, trecho_html
+
+# -------------------------------
+# Fusos horários
+# -------------------------------
+utc = ZoneInfo("UTC")
+brasil = ZoneInfo("America/Sao_Paulo")
+
+# Quantidade de pedidos por página nas listas
+POR_PAGINA = 50
+
+# A busca ordena por relevância só os pedidos mais recentes que casam com ela
+JANELA_BUSCA = 5000
+
+
+def formatar_data(data):
+    """Converte a data gravada em UTC para o horário de Brasília."""
+    if not data:
+        return None
+    return data.replace(tzinfo=utc).astimezone(brasil).strftime('%d/%m/%Y %H:%M')
+
+
+def data_iso(data):
+    """Data em ISO 8601 no horário de Brasília (com o fuso, para planilhas e scripts)."""
+    return data.replace(tzinfo=utc).astimezone(brasil).isoformat(timespec='seconds') if data else None
+
+
+# -------------------------------
+# Cursor de paginação (data, id)
+# -------------------------------
+def gerar_cursor(data, pedido_id):
+    """Gera o token opaco que aponta para depois do pedido informado."""
+    bruto = f'{data.isoformat()}|{pedido_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def ler_cursor(token):
+    """Decodifica o token em (data, id). Token inválido volta para a primeira página."""
+    if not token:
+        return None
+    try:
+        bruto = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8')
+        data, pedido_id = bruto.split('|')
+        return datetime.fromisoformat(data), int(pedido_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def gerar_cursor_busca(relevancia, pedido_id, piso, teto):
+    """Cursor da busca: relevância e id do último pedido, mais o piso e o teto da janela.
+
+    Sem relevância, id e piso, aponta para o começo da janela seguinte
+    (pedidos com id <= teto).
+    """
+    partes = ('' if v is None else repr(v) for v in (relevancia, pedido_id, piso, teto))
+    bruto = '|'.join(partes).encode('utf-8')
+    return base64.urlsafe_b64encode(bruto).decode('ascii').rstrip('=')
+
+
+def ler_cursor_busca(token):
+    """Decodifica o cursor da busca em (relevância, id, piso, teto); inválido volta ao início."""
+    if not token:
+        return None
+    try:
+        bruto = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8')
+        valor, pedido_id, piso, teto = (parte or None for parte in bruto.split('|'))
+        return (valor and float(valor), pedido_id and int(pedido_id),
+                piso and int(piso), teto and int(teto))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+# -------------------------------
+# Filtros do histórico (?servico=&status=&nome=&busca=&data_inicial=&data_final=)
+# -------------------------------
+FILTROS = ('servico', 'status', 'nome', 'busca', 'data_inicial', 'data_final')
+
+
+def _inicio_do_dia(texto):
+    """'AAAA-MM-DD' no horário de Brasília -> datetime UTC sem fuso (como gravado)."""
+    try:
+        dia = datetime.strptime(texto, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+    return dia.replace(tzinfo=brasil).astimezone(utc).replace(tzinfo=None)
+
+
+def ler_filtros(args):
+    """Lê os filtros da querystring nos argumentos aceitos por consulta_pedidos."""
+    servico = args.get('servico', '')
+    data_final = _inicio_do_dia(args.get('data_final'))
+    return {
+        'servico_id': int(servico) if servico.isdigit() else None,
+        # Status gravados como em STATUS_PEDIDO (minúsculas); ?status=Pendente também serve
+        'status': args.get('status', '').strip().lower() or None,
+        'nome': args.get('nome', '').strip() or None,
+        'busca': args.get('busca', '').strip() or None,
+        'data_inicial': _inicio_do_dia(args.get('data_inicial')),
+        # data final inclusiva: vai até o início do dia seguinte
+        'data_final': data_final + timedelta(days=1) if data_final else None,
+    }
+
+
+def filtrar_pedidos(query, usuario_id=None, servico_id=None, status=None, nome=None,
+                    busca=None, data_inicial=None, data_final=None):
+    """Aplica os filtros das listas e da exportação a uma consulta sobre pedidos."""
+    expressao = expressao_busca(busca)
+    if expressao:
+        query = query.join(pedidos_busca, pedidos_busca.c.rowid == Pedido.id)\
+                     .filter(casa_busca(expressao))
+    if usuario_id is not None:
+        query = query.filter(Pedido.usuario_id == usuario_id)
+    if servico_id is not None:
+        query = query.filter(Pedido.servico_id == servico_id)
+    if status:
+        query = query.filter(Pedido.status == status)
+    if nome:
+        query = query.filter(Pedido.nome.ilike(f'%{nome}%'))
+    if data_inicial is not None:
+        query = query.filter(Pedido.data >= data_inicial)
+    if data_final is not None:
+        query = query.filter(Pedido.data < data_final)
+    return query
+
+
+def consulta_pedidos(usuario_id=None, servico_id=None, cursor=None, **filtros):
+    """Monta a consulta das listas de pedidos.
+
+    Busca só as colunas usadas nas telas, já com o JOIN em serviço e usuário,
+    para que a lista inteira saia em uma única ida ao banco (sem o N+1 de
+    acessar p.servico e p.usuario dentro do loop).
+
+    A ordem é (data, id) decrescente. Com um cursor, a consulta continua
+    logo depois dele (keyset), sem OFFSET: a página 100 custa o mesmo que a 1ª.
+    """
+    query = db.session.query(
+        Pedido.id,
+        Pedido.status,
+        Pedido.data,
+        Pedido.observacao,
+        Servico.nome.label('servico_nome'),
+        Usuario.email.label('usuario_email'),
+        Usuario.perfil.label('usuario_perfil'),
+    ).join(Servico, Pedido.servico_id == Servico.id)\
+     .join(Usuario, Pedido.usuario_id == Usuario.id)
+
+    query = filtrar_pedidos(query, usuario_id=usuario_id, servico_id=servico_id, **filtros)
+    if cursor is not None:
+        data, pedido_id = cursor
+        # Comparação de row value: o SQLite usa como faixa no índice (data<?)
+        query = query.filter(db.tuple_(Pedido.data, Pedido.id) < (data, pedido_id))
+
+    return query.order_by(Pedido.data.desc(), Pedido.id.desc())
+
+
+def consulta_busca(busca, usuario_id=None, servico_id=None, cursor=None, **filtros):
+    """Monta a consulta da busca textual, com as mesmas colunas de consulta_pedidos.
+
+    Calcular o bm25 de todos os pedidos que casam com uma palavra comum custa
+    caro (centenas de ms com um milhão de pedidos). Por isso só os
+    JANELA_BUSCA mais recentes que casam com a busca e os filtros entram no
+    ranking: o piso é o menor id dessa janela, e o FTS5 recebe o id >= piso
+    como faixa. O piso vai no cursor, para as páginas seguintes usarem a mesma
+    janela. A ordem é (relevância, id decrescente).
+
+    Esgotada a janela, a busca continua na seguinte, a dos JANELA_BUSCA
+    anteriores a ela: o teto (id <= teto) no cursor marca onde ela começa.
+    """
+    valor, pedido_id, piso, teto = cursor or (None, None, None, None)
+    if piso is not None:
+        piso = db.literal(piso)
+    else:
+        janela = filtrar_pedidos(
+            db.session.query(Pedido.id), usuario_id=usuario_id, servico_id=servico_id,
+            busca=busca, **filtros
+        )
+        if teto is not None:
+            janela = janela.filter(pedidos_busca.c.rowid <= teto)
+        janela = janela.order_by(pedidos_busca.c.rowid.desc()).limit(JANELA_BUSCA).correlate(None).subquery()
+        piso = db.session.query(db.func.min(janela.c.id)).correlate(None).scalar_subquery()
+
+    pontos = relevancia()
+    query = db.session.query(
+        Pedido.id,
+        Pedido.status,
+        Pedido.data,
+        Pedido.observacao,
+        Servico.nome.label('servico_nome'),
+        Usuario.email.label('usuario_email'),
+        Usuario.perfil.label('usuario_perfil'),
+        pontos.label('relevancia'),
+        trecho().label('trecho'),
+        piso.label('piso'),
+    ).join(Servico, Pedido.servico_id == Servico.id)\
+     .join(Usuario, Pedido.usuario_id == Usuario.id)
+
+    query = filtrar_pedidos(query, usuario_id=usuario_id, servico_id=servico_id, busca=busca, **filtros)
+    query = query.filter(pedidos_busca.c.rowid >= piso)
+    if teto is not None:
+        query = query.filter(pedidos_busca.c.rowid <= teto)
+    if valor is not None:
+        query = query.filter(db.or_(pontos > valor, db.and_(pontos == valor, Pedido.id < pedido_id)))
+
+    return query.order_by(pontos, Pedido.id.desc())
+
+
+def existe_busca_anterior(busca, piso, usuario_id=None, servico_id=None, **filtros):
+    """Se algum pedido abaixo do piso (janela mais antiga) casa com a busca e os filtros."""
+    query = filtrar_pedidos(db.session.query(Pedido.id), usuario_id=usuario_id,
+                            servico_id=servico_id, busca=busca, **filtros)
+    return query.filter(pedidos_busca.c.rowid < piso).first() is not None
+
+
+def formatar_pedido(linha, mostrar_email=False):
+    """Transforma uma linha da consulta no dicionário usado pelos templates."""
+    if mostrar_email:
+        nome_morador = linha.usuario_email
+    else:
+        nome_morador = linha.usuario_perfil == 'morador' and linha.usuario_email or None
+
+    return {
+        'id': linha.id,
+        'servico_nome': linha.servico_nome,
+        'nome_morador': nome_morador,
+        'usuario_email': linha.usuario_email,
+        'status': linha.status,
+        'data_solicitacao': formatar_data(linha.data),
+        'observacao': linha.observacao,
+        'trecho': trecho_html(getattr(linha, 'trecho', None)),
+    }
+
+
+def listar_pedidos(usuario_id=None, servico_id=None, mostrar_email=False,
+                   cursor=None, por_pagina=POR_PAGINA, **filtros):
+    """Lista uma página de pedidos formatados para /pedidos, /historico e /meus_pedidos.
+
+    Retorna (pedidos, proximo_cursor); proximo_cursor é None na última página.
+    Com o filtro busca, a lista vem por relevância (consulta_busca), janela
+    por janela; a última página de cada janela faz uma consulta a mais para
+    saber se existe uma janela anterior.
+    """
+    busca = filtros.pop('busca', None)
+    if expressao_busca(busca):
+        cursor_busca = ler_cursor_busca(cursor)
+        query = consulta_busca(busca, usuario_id=usuario_id, servico_id=servico_id,
+                               cursor=cursor_busca, **filtros)
+    else:
+        query = consulta_pedidos(usuario_id=usuario_id, servico_id=servico_id,
+                                 cursor=ler_cursor(cursor), **filtros)
+    # Busca um a mais só para saber se existe próxima página
+    linhas = query.limit(por_pagina + 1).all()
+
+    proximo_cursor = None
+    if expressao_busca(busca):
+        teto = cursor_busca[3] if cursor_busca else None
+        if len(linhas) > por_pagina:
+            linhas = linhas[:por_pagina]
+            ultima = linhas[-1]
+            proximo_cursor = gerar_cursor_busca(ultima.relevancia, ultima.id, ultima.piso, teto)
+        elif linhas and existe_busca_anterior(busca, linhas[0].piso, usuario_id=usuario_id,
+                                              servico_id=servico_id, **filtros):
+            proximo_cursor = gerar_cursor_busca(None, None, None, linhas[0].piso - 1)
+    elif len(linhas) > por_pagina:
+        linhas = linhas[:por_pagina]
+        ultima = linhas[-1]
+        proximo_cursor = gerar_cursor(ultima.data, ultima.id)
+
+    pedidos = [formatar_pedido(linha, mostrar_email=mostrar_email) for linha in linhas]
+    return pedidos, proximo_cursor
+
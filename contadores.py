@@ -0,0 +1,87 @@
+# contadores.py
+# Mantém a tabela contagem_pedidos (serviço x status) junto com cada escrita em
+# pedidos, para o dashboard do síndico não precisar agrupar a tabela inteira.
+from sqlalchemy.dialects.sqlite import insert
+from models import db, Servico, Pedido, ContagemPedido, STATUS_PEDIDO
+
+
+def somar(servico_id, status, delta):
+    """Soma delta ao contador (servico_id, status) na transação atual, sem commit."""
+    stmt = insert(ContagemPedido).values(servico_id=servico_id, status=status, quantidade=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['servico_id', 'status'],
+        set_={'quantidade': ContagemPedido.quantidade + delta}
+    )
+    db.session.execute(stmt)
+
+
+def somar_varios(deltas):
+    """Aplica {(servico_id, status): delta} num só executemany, sem commit."""
+    deltas = [{'servico_id': servico_id, 'status': status, 'quantidade': delta}
+              for (servico_id, status), delta in deltas.items() if delta]
+    if not deltas:
+        return
+    stmt = insert(ContagemPedido)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['servico_id', 'status'],
+        set_={'quantidade': ContagemPedido.quantidade + stmt.excluded.quantidade}
+    )
+    db.session.execute(stmt, deltas)
+
+
+def registrar_pedido(pedido):
+    """Conta um pedido novo. Chamar antes do commit que grava o pedido."""
+    somar(pedido.servico_id, pedido.status or STATUS_PEDIDO[0], 1)
+
+
+def registrar_mudanca_status(servico_id, status_antigo, status_novo):
+    """Move um pedido de um status para outro. Chamar antes do commit."""
+    if status_antigo == status_novo:
+        return
+    somar_varios({(servico_id, status_antigo): -1, (servico_id, status_novo): 1})
+
+
+def contagem_por_servico():
+    """[(nome, quantidade)] para todos os serviços, lendo só os contadores."""
+    return db.session.query(Servico.nome, db.func.coalesce(db.func.sum(ContagemPedido.quantidade), 0))\
+        .outerjoin(ContagemPedido, ContagemPedido.servico_id == Servico.id)\
+        .group_by(Servico.id).all()
+
+
+def contagem_por_status():
+    """[(status, quantidade)] lendo só os contadores."""
+    return db.session.query(ContagemPedido.status, db.func.sum(ContagemPedido.quantidade))\
+        .group_by(ContagemPedido.status)\
+        .having(db.func.sum(ContagemPedido.quantidade) > 0).all()
+
+
+def recalcular_contadores():
+    """Recalcula os contadores a partir de pedidos e grava o resultado.
+
+    Retorna a lista de divergências encontradas como
+    (servico_id, status, quantidade_gravada, quantidade_real).
+    """
+    reais = {
+        (servico_id, status): quantidade
+        for servico_id, status, quantidade in db.session.query(
+            Pedido.servico_id, Pedido.status, db.func.count(Pedido.id)
+        ).group_by(Pedido.servico_id, Pedido.status)
+    }
+    gravados = {
+        (c.servico_id, c.status): c.quantidade
+        for c in ContagemPedido.query.all()
+    }
+
+    divergencias = []
+    for chave in sorted(set(reais) | set(gravados), key=str):
+        gravado, real = gravados.get(chave, 0), reais.get(chave, 0)
+        if gravado != real:
+            divergencias.append((chave[0], chave[1], gravado, real))
+
+    ContagemPedido.query.delete()
+    db.session.add_all(
+        ContagemPedido(servico_id=servico_id, status=status, quantidade=quantidade)
+        for (servico_id, status), quantidade in reais.items()
+    )
+    db.session.commit()
+    return divergencias
@@ -0,0 +1,285 @@
+# dados_sinteticos.py
+# Gera um condomínio sintético para testes de carga e de escala
+# ("flask gerar-dados" ou gerar() direto, como nos benchmarks):
+# serviços, apartamentos distribuídos em blocos, um síndico, moradores e
+# pedidos — milhões, se for o caso.
+#
+# Tudo sai de um único random.Random(semente): a mesma semente e os mesmos
+# parâmetros geram o mesmo banco (só o salt do hash da senha muda), para os
+# benchmarks poderem ser repetidos. Os pedidos são gravados em ordem de data
+# (como no uso real, o id cresce com a data), com INSERT executemany direto
+# pelo driver em lotes grandes, junto com o histórico de cada um. Os
+# contadores do dashboard e as contagens por período saem de um INSERT ...
+# SELECT ... GROUP BY cada, no fim; os tempos de atendimento são juntados na
+# mesma passada que gera o histórico. Os índices de pedidos e pedido_eventos
+# (e o da busca) ficam de fora durante a carga e são criados uma vez só, no fim.
+#
+# Distribuições:
+#   status      pesos por status, ex.: {'pendente': 20, 'concluído': 60, ...}
+#   datas       'uniforme' no período ou 'crescente' (o volume cresce em linha
+#               reta até hoje); a hora do dia segue HORAS (mais de dia)
+#   serviços    poucos serviços concentram a maior parte dos pedidos
+#   moradores   alguns moradores pedem muito mais que os outros (Pareto)
+#   histórico   cada pedido tem os eventos de status até o status final
+#               (pedido_eventos): pendente -> em andamento -> concluído, ou
+#               pendente -> rejeitado, com prazos log-normais por serviço (PRAZOS)
+import bisect
+import itertools
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from models import db, Usuario, Morador, Apartamento, Servico, Pedido, PedidoEvento, VersaoCache, STATUS_PEDIDO
+import senhas
+from busca import carga_em_massa
+import alteracoes
+import periodos
+import atendimento
+
+SENHA = 'senha123'
+EMAIL_SINDICO = 'sindico@exemplo.com'
+APARTAMENTOS_POR_ANDAR = 4
+
+SERVICOS = [
+    ('Hidráulica', 30, [('Vazamento na cozinha', 'Água pingando embaixo da pia.'),
+                        ('Descarga com defeito', 'A descarga do banheiro não para de correr.'),
+                        ('Torneira quebrada', 'Torneira do tanque sem vedação.')]),
+    ('Elétrica', 25, [('Lâmpada queimada', 'Lâmpada do corredor do andar queimada.'),
+                      ('Tomada sem energia', 'Tomada da sala não funciona.'),
+                      ('Disjuntor desarmando', 'O disjuntor do chuveiro desarma toda hora.')]),
+    ('Elevador', 12, [('Elevador parado', 'Elevador social parado no térreo.'),
+                      ('Porta do elevador', 'A porta do elevador está fechando com força.')]),
+    ('Limpeza', 10, [('Lixo acumulado', 'Lixo acumulado na área de serviço.'),
+                     ('Escada suja', 'Escada de emergência precisa de limpeza.')]),
+    ('Segurança', 8, [('Portão aberto', 'Portão da garagem ficou aberto à noite.'),
+                      ('Câmera desligada', 'Câmera da entrada sem imagem.')]),
+    ('Jardinagem', 6, [('Poda de árvore', 'Galhos encostando na janela do primeiro andar.'),
+                       ('Grama alta', 'Grama do jardim interno muito alta.')]),
+    ('Pintura', 5, [('Parede descascando', 'Pintura do hall descascando por umidade.'),
+                    ('Pichação', 'Pichação no muro lateral.')]),
+    ('Portaria', 4, [('Interfone mudo', 'Interfone do apartamento não chama a portaria.'),
+                     ('Encomenda extraviada', 'Encomenda registrada e não entregue.')]),
+]
+
+STATUS_PADRAO = {'pendente': 20, 'em andamento': 10, 'concluído': 60, 'rejeitado': 10}
+# Mediana, em horas, do pedido até a conclusão, por serviço (log-normal em volta dela)
+PRAZOS = {'Hidráulica': 30, 'Elétrica': 24, 'Elevador': 8, 'Limpeza': 12, 'Segurança': 6,
+          'Jardinagem': 120, 'Pintura': 240, 'Portaria': 4}
+DISPERSAO_PRAZO = 0.9
+OBSERVACOES = {
+    'concluído': 'Serviço executado pela equipe de manutenção.',
+    'rejeitado': 'Responsabilidade do morador, não do condomínio.',
+}
+
+# Peso de cada hora do dia (0h a 23h) na data dos pedidos
+HORAS = [1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 14, 12, 10, 12, 14, 14, 12, 12, 10, 8, 6, 4, 2, 1]
+DISTRIBUICOES = ('uniforme', 'crescente')
+
+
+def conferir_status(pesos):
+    """ValueError se algum status não existe no app ou os pesos não servem para sortear."""
+    validos = ', '.join(STATUS_PEDIDO)
+    for status, peso in pesos.items():
+        if status not in STATUS_PEDIDO:
+            raise ValueError(f'status desconhecido: {status!r} (use {validos})')
+        if peso < 0:
+            raise ValueError(f'peso negativo para {status!r}: {peso:g}')
+    if not any(pesos.values()):
+        raise ValueError(f'informe peso maior que zero para ao menos um status ({validos})')
+
+
+def ler_status(texto):
+    """'Pendente=20,concluído=60' -> {'pendente': 20.0, 'concluído': 60.0}; ValueError se inválido."""
+    pesos = {}
+    for parte in texto.split(','):
+        status, _, peso = parte.partition('=')
+        try:
+            pesos[status.strip().lower()] = float(peso)
+        except ValueError:
+            raise ValueError(f'peso inválido em {parte.strip()!r} (use status=peso)')
+    conferir_status(pesos)
+    return pesos
+
+
+def _acumulados(pesos):
+    return list(itertools.accumulate(pesos))
+
+
+def _datas(sorteio, quantidade, dias, distribuicao, fim):
+    """Datas ordenadas dos pedidos, dentro dos últimos dias até fim."""
+    horas = _acumulados(HORAS)
+    hora_total = horas[-1]
+    segundos = []
+    for _ in range(quantidade):
+        u = sorteio.random()
+        fracao = u if distribuicao == 'uniforme' else u ** 0.5  # densidade 2t
+        dia = min(int(fracao * dias), dias - 1)
+        hora = bisect.bisect(horas, sorteio.random() * hora_total)
+        segundos.append(dia * 86400 + hora * 3600 + sorteio.randrange(3600))
+    segundos.sort()
+    inicio = fim - timedelta(days=dias)
+    return (inicio + timedelta(seconds=s) for s in segundos)
+
+
+# Pedidos e histórico gravados direto pelo driver: com milhões de linhas, montar
+# os parâmetros e converter cada data pelo tipo DateTime do SQLAlchemy dobraria
+# o tempo da carga. O texto é o mesmo formato que o SQLAlchemy grava no SQLite.
+INSERIR_PEDIDOS = ('INSERT INTO pedidos (usuario_id, servico_id, nome, descricao, status, observacao, '
+                   'data, alteracao) VALUES (?, ?, ?, ?, ?, ?, ?, ?)')
+INSERIR_EVENTOS = ('INSERT INTO pedido_eventos (pedido_id, servico_id, anterior, status, em) '
+                   'VALUES (?, ?, ?, ?, ?)')
+# Contadores do dashboard (contadores.py): cada pedido conta uma vez só nas
+# linhas por mês de contagem_periodos, algumas centenas em vez dos pedidos
+CONTAR_PEDIDOS = ('INSERT INTO contagem_pedidos (servico_id, status, quantidade) '
+                  "SELECT servico_id, status, sum(quantidade) FROM contagem_periodos WHERE periodo = 'mes' "
+                  'GROUP BY servico_id, status')
+
+
+def _texto_data(data):
+    return data.isoformat(' ', timespec='microseconds')
+
+
+def _eventos(sorteio, pedido_id, servico_id, situacao, data, texto, fim, tempos):
+    """Histórico de status do pedido (tuplas de INSERIR_EVENTOS), da criação até a situação final.
+
+    texto é a data já formatada. O tempo até o desfecho (concluído ou
+    rejeitado), em segundos, vai para tempos[situacao, hora UTC do desfecho,
+    servico_id] — as amostras de tempos_atendimento (atendimento.py).
+    """
+    nome_servico = SERVICOS[servico_id - 1][0]
+    eventos = [(pedido_id, servico_id, None, 'pendente', texto)]
+    if situacao == 'pendente':
+        return eventos
+
+    prazo = sorteio.lognormvariate(0, DISPERSAO_PRAZO) * PRAZOS.get(nome_servico, 24)
+    inicio = data + timedelta(hours=prazo * sorteio.uniform(0.1, 0.5))
+    if situacao == 'concluído':
+        passos = [('em andamento', inicio), (situacao, data + timedelta(hours=prazo))]
+    elif situacao == 'em andamento':
+        passos = [(situacao, inicio)]
+    else:
+        passos = [(situacao, data + timedelta(hours=prazo))]
+    anterior = 'pendente'
+    for status, em in passos:
+        em = min(em, fim)
+        eventos.append((pedido_id, servico_id, anterior, status, _texto_data(em)))
+        anterior = status
+    if situacao in atendimento.DESFECHOS:
+        tempos[situacao, em.replace(minute=0, second=0, microsecond=0), servico_id].append(
+            (em - data).total_seconds())
+    return eventos
+
+
+@contextmanager
+def sem_indices(*modelos):
+    """Para inserir milhões de linhas: sem os índices secundários, criados de novo no fim.
+
+    Como o gatilho da busca (busca.carga_em_massa): criar o índice de uma vez,
+    ordenando, custa bem menos que mantê-lo linha a linha.
+    """
+    indices = [indice for modelo in modelos for indice in modelo.__table__.indexes]
+    conexao = db.session.connection()
+    for indice in indices:
+        indice.drop(conexao)
+    db.session.commit()
+    try:
+        yield
+    finally:
+        db.session.rollback()
+        conexao = db.session.connection()
+        for indice in indices:
+            indice.create(conexao)
+        db.session.commit()
+
+
+def gerar(semente=42, apartamentos=400, blocos=4, moradores=800, pedidos=100_000, dias=365,
+          status=None, distribuicao='uniforme', tamanho_lote=50_000, fim=None, avisar=None):
+    """Grava o condomínio sintético no banco (vazio) do app e faz o commit.
+
+    Usuário 1 é o síndico (EMAIL_SINDICO); o morador i é o usuário i + 2, com
+    email morador{i}@exemplo.com. Todos usam a senha SENHA. Devolve um
+    dict com as quantidades gravadas. avisar(mensagem) recebe o progresso.
+    """
+    status = status or STATUS_PADRAO
+    conferir_status(status)
+    fim = fim or datetime(2026, 1, 1)
+    if distribuicao not in DISTRIBUICOES:
+        raise ValueError(f'distribuição de datas inválida: {distribuicao!r}')
+    avisar = avisar or (lambda mensagem: None)
+    sorteio = random.Random(semente)
+
+    # Serviços, apartamentos e usuários: poucos, um executemany cada
+    # Serviços e pedidos numerados na sequência de alterações (ver alteracoes.py)
+    db.session.execute(insert(Servico), [
+        {'nome': nome, 'alteracao': i + 1} for i, (nome, _, _) in enumerate(SERVICOS)
+    ])
+    db.session.execute(insert(Apartamento), [
+        {'bloco': chr(ord('A') + i % blocos),
+         'numero': f'{(i // blocos) // APARTAMENTOS_POR_ANDAR + 1}{(i // blocos) % APARTAMENTOS_POR_ANDAR + 1:02d}'}
+        for i in range(apartamentos)
+    ])
+    senha_hash = senhas.gerar_hash(SENHA)
+    db.session.execute(insert(Usuario), [
+        {'email': EMAIL_SINDICO, 'senha': senha_hash, 'tipo': 'sindico', 'perfil': 'sindico'}
+    ] + [
+        {'email': f'morador{i}@exemplo.com', 'senha': senha_hash, 'tipo': 'morador', 'perfil': 'morador'}
+        for i in range(moradores)
+    ])
+    db.session.execute(insert(Morador), [
+        {'usuario_id': i + 2, 'apartamento_id': i % apartamentos + 1, 'nome': f'Morador {i}',
+         'telefone': f'(11) 9{sorteio.randrange(10**7, 10**8)}', 'ativo': True}
+        for i in range(moradores)
+    ])
+    db.session.commit()
+    avisar(f'{len(SERVICOS)} serviços, {apartamentos} apartamentos, {moradores} moradores')
+
+    # Pedidos
+    peso_moradores = _acumulados(sorteio.paretovariate(1.5) for _ in range(moradores))
+    peso_servicos = _acumulados(peso for _, peso, _ in SERVICOS)
+    lista_status = list(status)
+    peso_status = _acumulados(status.values())
+    textos = [modelos for _, _, modelos in SERVICOS]
+
+    tempos = defaultdict(list)
+    datas = _datas(sorteio, pedidos, dias, distribuicao, fim)
+    gravados = 0
+    primeiro_id = (db.session.query(db.func.max(Pedido.id)).scalar() or 0) + 1
+    with carga_em_massa(), sem_indices(Pedido, PedidoEvento):  # índices refeitos uma vez no fim
+        while gravados < pedidos:
+            n = min(tamanho_lote, pedidos - gravados)
+            usuarios = sorteio.choices(range(2, moradores + 2), cum_weights=peso_moradores, k=n)
+            servicos = sorteio.choices(range(1, len(SERVICOS) + 1), cum_weights=peso_servicos, k=n)
+            situacoes = sorteio.choices(lista_status, cum_weights=peso_status, k=n)
+            lote, historico = [], []
+            for usuario_id, servico_id, situacao, data in zip(usuarios, servicos, situacoes, datas):
+                nome, descricao = sorteio.choice(textos[servico_id - 1])
+                texto = _texto_data(data)
+                historico += _eventos(sorteio, primeiro_id + gravados + len(lote), servico_id,
+                                      situacao, data, texto, fim, tempos)
+                lote.append((usuario_id, servico_id, nome, descricao, situacao, OBSERVACOES.get(situacao),
+                             texto, len(SERVICOS) + gravados + len(lote) + 1))
+            conexao = db.session.connection()
+            conexao.exec_driver_sql(INSERIR_PEDIDOS, lote)
+            conexao.exec_driver_sql(INSERIR_EVENTOS, historico)
+            db.session.commit()
+            gravados += n
+            avisar(f'{gravados} pedidos')
+
+    periodos.preencher()
+    db.session.connection().exec_driver_sql(CONTAR_PEDIDOS)
+    db.session.execute(insert(VersaoCache), [{'chave': alteracoes.CHAVE, 'versao': len(SERVICOS) + pedidos}])
+    db.session.commit()
+    avisar('contadores e contagens por período')
+
+    # Amostras por hora do desfecho -> por mês local, como em atendimento.amostras_do_historico
+    amostras = defaultdict(list)
+    meses = {}
+    for (situacao, hora, servico_id), valores in tempos.items():
+        if hora not in meses:
+            meses[hora] = atendimento.mes_local(hora)
+        amostras[situacao, meses[hora], servico_id] += valores
+    atendimento.reconstruir(amostras)
+    return {'servicos': len(SERVICOS), 'apartamentos': apartamentos,
+            'moradores': moradores, 'pedidos': pedidos}
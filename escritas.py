@@ -0,0 +1,272 @@
+# escritas.py
+# Operações de escrita do app (cadastro, novo pedido, mudança de status,
+# edição de perfil), cada uma descrita por nome + argumentos simples.
+#
+# Por padrão executar() roda a operação aqui mesmo e faz o commit. Com
+# ESCRITOR_ENDERECO configurado, a operação é enviada ao processo escritor
+# (escritor.py, "flask escritor"), que é o único a escrever no SQLite e grava
+# várias operações por commit. Em ambos os casos quem chamou recebe o
+# resultado da sua operação ou a exceção correspondente. Escritor fora do ar,
+# sem resposta em ESCRITOR_ESPERA segundos ou com falha ao gravar vira
+# FalhaEscritor (as rotas pedem para tentar de novo; as APIs respondem 503).
+#
+# As operações não fazem commit: só alteram db.session e devolvem valores
+# simples (ids), que podem atravessar o socket.
+import threading
+from collections import Counter
+from multiprocessing.connection import Client
+
+from flask import current_app
+from sqlalchemy import bindparam, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import IntegrityError
+from models import db, Usuario, Morador, Apartamento, Pedido, STATUS_PEDIDO
+import contadores
+import alteracoes
+import eventos
+import periodos
+import atendimento
+from catalogo import catalogo
+from identidade import identidades
+
+OPERACOES = {}
+
+# Segundos esperando a resposta do escritor (config ESCRITOR_ESPERA)
+ESCRITOR_ESPERA = 10.0
+
+
+class ErroEscrita(Exception):
+    """Erro de regra do app (ex.: e-mail já cadastrado), para mostrar ao usuário."""
+
+
+class FalhaEscritor(Exception):
+    """O processo escritor não respondeu ou a gravação falhou."""
+
+
+def operacao(func):
+    OPERACOES[func.__name__] = func
+    return func
+
+
+# -------------------------------
+# Operações
+# -------------------------------
+def _apartamento_id(bloco, numero):
+    """Id do apartamento, criando-o se não existir (sem commit).
+
+    Um único INSERT ... ON CONFLICT no UNIQUE (bloco, numero): não há janela
+    entre procurar e criar, então cadastros simultâneos não duplicam o apartamento.
+    O DO UPDATE não muda nada; existe só para o RETURNING devolver o id existente.
+    """
+    stmt = insert(Apartamento).values(bloco=bloco or '', numero=numero)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['bloco', 'numero'],
+        set_={'numero': stmt.excluded.numero}
+    ).returning(Apartamento.id)
+    return db.session.execute(stmt).scalar_one()
+
+
+@operacao
+def cadastrar_morador(nome, bloco, numero, telefone, email, senha_hash):
+    apartamento_id = _apartamento_id(bloco, numero)
+
+    # O UNIQUE de email decide quem chegou primeiro, sem SELECT antes
+    usuario = Usuario(email=email, senha=senha_hash, tipo='morador')
+    db.session.add(usuario)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        raise ErroEscrita('Email já cadastrado.')
+
+    db.session.add(Morador(
+        usuario_id=usuario.id,
+        apartamento_id=apartamento_id,
+        nome=nome,
+        telefone=telefone
+    ))
+    db.session.flush()
+    return usuario.id
+
+
+@operacao
+def atualizar_perfil(usuario_id, nome, bloco, numero, telefone, email, senha_hash=None):
+    if Usuario.query.filter(Usuario.email == email, Usuario.id != usuario_id).first():
+        raise ErroEscrita('Este e-mail já está em uso por outro morador.')
+
+    usuario = db.session.get(Usuario, usuario_id)
+    morador = Morador.query.filter_by(usuario_id=usuario_id).first()
+    usuario.email = email
+    if senha_hash:
+        usuario.senha = senha_hash
+    morador.nome = nome
+    morador.telefone = telefone
+
+    # Troca de apartamento, se necessário
+    atual = morador.apartamento_obj
+    if atual is None or (bloco or '') != (atual.bloco or '') or numero != (atual.numero or ''):
+        morador.apartamento_id = _apartamento_id(bloco, numero)
+
+    identidades.invalidar(usuario_id)
+
+
+@operacao
+def criar_pedido(usuario_id, servico_id, nome, descricao, chave=None):
+    """Cria o pedido e devolve o id.
+
+    chave (opcional) é gerada pelo navegador para cada pedido: o mesmo pedido
+    enviado de novo (fila offline do app, duplo clique) devolve o id do que
+    já foi gravado, sem criar outro. O índice UNIQUE (usuario_id, chave)
+    garante isso mesmo se dois envios iguais chegarem juntos; o segundo falha
+    e, ao tentar de novo, encontra o primeiro.
+    """
+    if chave:
+        existente = db.session.query(Pedido.id)\
+            .filter_by(usuario_id=usuario_id, chave_idempotencia=chave).scalar()
+        if existente is not None:
+            return existente
+
+    # Sem isto o INSERT passa (o SQLite não confere a chave estrangeira) e os
+    # contadores e contagens ganham uma linha de um serviço que não existe
+    if catalogo.obter(servico_id) is None:
+        raise ErroEscrita('Serviço inexistente.')
+
+    pedido = Pedido(usuario_id=usuario_id, servico_id=servico_id, nome=nome, descricao=descricao,
+                    chave_idempotencia=chave or None)
+    db.session.add(pedido)
+    alteracoes.marcar(pedido)  # antes do INSERT, que já leva o número
+    try:
+        db.session.flush()
+    except IntegrityError:
+        raise ErroEscrita('Este pedido já está sendo gravado; tente de novo.')
+    contadores.registrar_pedido(pedido)  # mesma transação do pedido
+    periodos.registrar_pedido(pedido)
+    eventos.registrar_criacao(pedido)
+    return pedido.id
+
+
+def _validar_status(status):
+    # Aqui, e não nas rotas: o formulário, a API em lote e o escritor passam
+    # todos por estas operações (status vazio viraria IntegrityError, um 500)
+    if status not in STATUS_PEDIDO:
+        raise ErroEscrita('Status inválido.')
+
+
+@operacao
+def mudar_status(pedido_id, status):
+    _validar_status(status)
+    pedido = db.session.get(Pedido, pedido_id)
+    if pedido is None:
+        raise ErroEscrita('Pedido não encontrado.')
+    anterior = pedido.status
+    contadores.registrar_mudanca_status(pedido.servico_id, anterior, status)
+    periodos.registrar_mudanca_status(pedido.servico_id, pedido.data, anterior, status)
+    pedido.status = status
+    alteracoes.marcar(pedido)
+    if anterior != status:
+        eventos.registrar_mudanca(pedido_id, pedido.servico_id, anterior, status)
+        atendimento.registrar_mudanca(pedido.servico_id, pedido.data, anterior, status)
+
+
+@operacao
+def mudar_status_em_lote(pedido_ids, status, observacao=None):
+    """Aplica o status (e a observação, se houver) a vários pedidos de uma vez.
+
+    Número fixo de comandos, seja qual for a quantidade de pedidos: um SELECT,
+    a reserva dos números de alteração e um executemany para cada tabela
+    (pedidos, contadores, contagem por período, eventos), mais a leitura e a
+    gravação dos resumos de tempo de atendimento. Devolve os ids atualizados
+    e os que não existem.
+    """
+    _validar_status(status)
+    pedidos = Pedido.__table__
+    linhas = db.session.execute(
+        db.select(pedidos.c.id, pedidos.c.usuario_id, pedidos.c.servico_id, pedidos.c.status,
+                  pedidos.c.data)
+        .where(pedidos.c.id.in_(set(pedido_ids)))
+        .order_by(pedidos.c.id)
+    ).all()
+    if not linhas:
+        return {'atualizados': [], 'nao_encontrados': sorted(set(pedido_ids))}
+
+    valores = {'status': status, 'alteracao': bindparam('b_alteracao')}
+    if observacao:
+        valores['observacao'] = observacao
+    inicio = alteracoes.reservar(len(linhas))
+    db.session.execute(
+        update(pedidos).where(pedidos.c.id == bindparam('b_id')).values(**valores),
+        [{'b_id': linha.id, 'b_alteracao': inicio + i} for i, linha in enumerate(linhas)]
+    )
+
+    deltas = Counter()
+    for linha in linhas:
+        if linha.status != status:
+            deltas[linha.servico_id, linha.status] -= 1
+            deltas[linha.servico_id, status] += 1
+    contadores.somar_varios(deltas)
+    periodos.registrar_varios([(linha.servico_id, linha.data, linha.status) for linha in linhas], status)
+    eventos.registrar_varios([(linha.id, linha.servico_id, linha.status)
+                              for linha in linhas if linha.status != status], status)
+    atendimento.registrar_varios([(linha.servico_id, linha.data, linha.status)
+                                  for linha in linhas if linha.status != status], status)
+
+    atualizados = [linha.id for linha in linhas]
+    return {'atualizados': atualizados,
+            'nao_encontrados': sorted(set(pedido_ids) - set(atualizados))}
+
+
+# -------------------------------
+# Execução
+# -------------------------------
+_local = threading.local()
+
+
+def _conexao_escritor():
+    conexao = getattr(_local, 'conexao', None)
+    if conexao is None:
+        conexao = Client(current_app.config['ESCRITOR_ENDERECO'],
+                         authkey=current_app.config['SECRET_KEY'].encode('utf-8'))
+        _local.conexao = conexao
+    return conexao
+
+
+def _descartar_conexao():
+    conexao, _local.conexao = getattr(_local, 'conexao', None), None
+    if conexao is not None:
+        try:
+            conexao.close()
+        except OSError:
+            pass
+
+
+def _enviar(nome_operacao, kwargs):
+    espera = current_app.config.get('ESCRITOR_ESPERA', ESCRITOR_ESPERA)
+    try:
+        conexao = _conexao_escritor()
+        conexao.send((nome_operacao, kwargs))
+        if not conexao.poll(espera):
+            # A resposta atrasada ficaria na conexão para a próxima operação
+            _descartar_conexao()
+            raise FalhaEscritor(f'Escritor não respondeu em {espera:g} s')
+        return conexao.recv()
+    except (OSError, EOFError) as e:
+        _descartar_conexao()
+        raise FalhaEscritor(f'Escritor indisponível: {e}') from e
+
+
+def executar(nome_operacao, /, **kwargs):
+    """Executa a operação de escrita e devolve o seu resultado."""
+    if current_app.config.get('ESCRITOR_ENDERECO'):
+        situacao, valor = _enviar(nome_operacao, kwargs)
+        if situacao == 'ok':
+            return valor
+        if situacao == 'erro_escrita':
+            raise ErroEscrita(valor)
+        raise FalhaEscritor(valor)
+
+    try:
+        resultado = OPERACOES[nome_operacao](**kwargs)
+        db.session.commit()
+        return resultado
+    except Exception:
+        db.session.rollback()
+        raise
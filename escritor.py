@@ -0,0 +1,108 @@
+# escritor.py
+# Processo escritor único ("flask escritor"). Os workers do gunicorn mandam as
+# operações de escrita (escritas.py) por um socket Unix; aqui uma só thread
+# grava no SQLite, então nunca há disputa pelo lock de escrita.
+#
+# Commit em grupo: a thread pega tudo o que estiver na fila (até LOTE_MAXIMO),
+# roda cada operação dentro de um SAVEPOINT e faz um único COMMIT para o lote.
+# Se uma operação falhar, só o SAVEPOINT dela é desfeito e só ela recebe o erro.
+import queue
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+from sqlalchemy import event
+from models import db
+from escritas import OPERACOES, ErroEscrita
+
+LOTE_MAXIMO = 64
+
+
+class _Pedido:
+    def __init__(self, nome, kwargs):
+        self.nome = nome
+        self.kwargs = kwargs
+        self.resposta = None
+        self.pronto = threading.Event()
+
+
+def _preparar_engine(engine):
+    """Transações explícitas com BEGIN IMMEDIATE, para o SAVEPOINT funcionar no pysqlite."""
+    @event.listens_for(engine, 'connect')
+    def _ao_conectar(conexao, registro):
+        conexao.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _ao_iniciar(conn):
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+
+    engine.dispose()  # descarta conexões abertas antes dos eventos
+
+
+def _gravar_lote(lote):
+    for pedido in lote:
+        try:
+            with db.session.begin_nested():
+                pedido.resposta = ('ok', OPERACOES[pedido.nome](**pedido.kwargs))
+        except ErroEscrita as e:
+            pedido.resposta = ('erro_escrita', str(e))
+        except Exception as e:
+            pedido.resposta = ('falha', f'{type(e).__name__}: {e}')
+
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for pedido in lote:
+            if pedido.resposta[0] == 'ok':
+                pedido.resposta = ('falha', f'{type(e).__name__}: {e}')
+    finally:
+        db.session.remove()
+
+    for pedido in lote:
+        pedido.pronto.set()
+
+
+def _gravar(app, fila):
+    with app.app_context():
+        _preparar_engine(db.engine)
+        while True:
+            lote = [fila.get()]
+            while len(lote) < LOTE_MAXIMO:
+                try:
+                    lote.append(fila.get_nowait())
+                except queue.Empty:
+                    break
+            _gravar_lote(lote)
+
+
+def _atender(conexao, fila):
+    with conexao:
+        while True:
+            try:
+                nome, kwargs = conexao.recv()
+            except (EOFError, OSError):
+                return
+            pedido = _Pedido(nome, kwargs)
+            fila.put(pedido)
+            pedido.pronto.wait()
+            try:
+                conexao.send(pedido.resposta)
+            except OSError:
+                return  # o worker desistiu de esperar e fechou a conexão
+
+
+def servir(app, endereco):
+    """Atende os workers em endereco (socket Unix) até o processo ser encerrado."""
+    fila = queue.Queue()
+    threading.Thread(target=_gravar, args=(app, fila), daemon=True).start()
+
+    with Listener(endereco, family='AF_UNIX', authkey=app.config['SECRET_KEY'].encode('utf-8')) as listener:
+        print(f"✍️  Escritor ouvindo em {endereco}")
+        while True:
+            try:
+                conexao = listener.accept()
+            except (AuthenticationError, OSError) as e:
+                print(f"⚠️  Conexão recusada: {e}")
+                continue
+            threading.Thread(target=_atender, args=(conexao, fila), daemon=True).start()
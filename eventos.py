@@ -0,0 +1,59 @@
+# eventos.py
+# Histórico dos pedidos (tabela pedido_eventos): um evento na criação e um a
+# cada mudança de status, gravados na mesma transação da escrita. A tabela só
+# recebe INSERT — o status atual continua em pedidos.status, e o tempo que um
+# pedido passou em cada status sai da diferença entre eventos seguidos.
+#
+# Índices:
+#   (em)              relatórios por período (SLA, vazão) leem só o intervalo
+#   (pedido_id, em)   a linha do tempo de um pedido
+#
+# É também a fonte dos avisos em tempo real: tempo_real.py lê os eventos com
+# id maior que o último distribuído.
+#
+# Pedidos anteriores ao histórico entram (migração) com um único evento de
+# criação, já com o status atual, na data do pedido: o que aconteceu antes
+# não foi registrado e não é inventado.
+from datetime import datetime
+
+from sqlalchemy import insert
+from models import db, PedidoEvento
+
+
+def registrar_criacao(pedido):
+    """Evento de criação do pedido (já com id). Chamar antes do commit."""
+    db.session.execute(insert(PedidoEvento), [{
+        'pedido_id': pedido.id, 'servico_id': pedido.servico_id, 'anterior': None,
+        'status': pedido.status, 'em': pedido.data or datetime.utcnow(),
+    }])
+
+
+def registrar_mudanca(pedido_id, servico_id, anterior, status):
+    """Evento de mudança de status. Chamar antes do commit."""
+    registrar_varios([(pedido_id, servico_id, anterior)], status)
+
+
+def registrar_varios(pedidos, status):
+    """Mudança de vários (pedido_id, servico_id, status anterior) num só executemany."""
+    if not pedidos:
+        return
+    agora = datetime.utcnow()
+    db.session.execute(insert(PedidoEvento), [
+        {'pedido_id': pedido_id, 'servico_id': servico_id, 'anterior': anterior,
+         'status': status, 'em': agora}
+        for pedido_id, servico_id, anterior in pedidos
+    ])
+
+
+def eventos_do_pedido(pedido_id):
+    """Linha do tempo do pedido, do mais antigo ao mais recente."""
+    return PedidoEvento.query.filter_by(pedido_id=pedido_id)\
+        .order_by(PedidoEvento.em, PedidoEvento.id).all()
+
+
+def eventos_no_periodo(inicio, fim, status=None):
+    """Eventos com inicio <= em < fim (UTC), em ordem; status filtra o status novo."""
+    query = PedidoEvento.query.filter(PedidoEvento.em >= inicio, PedidoEvento.em < fim)
+    if status is not None:
+        query = query.filter(PedidoEvento.status == status)
+    return query.order_by(PedidoEvento.em, PedidoEvento.id)
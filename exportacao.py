@@ -0,0 +1,71 @@
+# exportacao.py
+# Exportação de pedidos em CSV ou NDJSON, gerada aos poucos.
+# As linhas vêm do banco em lotes (yield_per) e cada lote vira um pedaço da
+# resposta, então a memória fica constante seja qual for o tamanho da exportação.
+import csv
+import io
+import json
+
+from models import db, Usuario, Servico, Pedido
+from consultas import filtrar_pedidos, data_iso
+
+TAMANHO_LOTE = 1000
+
+CABECALHO = ['id', 'data', 'servico', 'usuario', 'nome', 'descricao', 'status', 'observacao']
+
+FORMATOS = {
+    'csv': ('text/csv', 'pedidos.csv'),
+    'ndjson': ('application/x-ndjson', 'pedidos.ndjson'),
+}
+
+
+def consulta_exportacao(**filtros):
+    query = db.session.query(
+        Pedido.id,
+        Pedido.data,
+        Servico.nome,
+        Usuario.email,
+        Pedido.nome,
+        Pedido.descricao,
+        Pedido.status,
+        Pedido.observacao,
+    ).join(Servico, Pedido.servico_id == Servico.id)\
+     .join(Usuario, Pedido.usuario_id == Usuario.id)
+    query = filtrar_pedidos(query, **filtros)
+    return query.order_by(Pedido.data.desc(), Pedido.id.desc())
+
+
+def _lotes(filtros):
+    """Lotes de linhas já com a data formatada, lidos do cursor aos poucos."""
+    resultado = db.session.execute(
+        consulta_exportacao(**filtros).statement.execution_options(yield_per=TAMANHO_LOTE)
+    )
+    for lote in resultado.partitions():
+        yield [(linha[0], data_iso(linha[1])) + tuple(linha[2:]) for linha in lote]
+
+
+def gerar_csv(filtros):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CABECALHO)
+    for lote in _lotes(filtros):
+        writer.writerows(lote)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gerar_ndjson(filtros):
+    for lote in _lotes(filtros):
+        yield ''.join(
+            json.dumps(dict(zip(CABECALHO, linha)), ensure_ascii=False) + '\n'
+            for linha in lote
+        )
+
+
+GERADORES = {
+    'csv': gerar_csv,
+    'ndjson': gerar_ndjson,
+}
@@ -0,0 +1,20 @@
+# gunicorn.conf.py
+# Lido pelo gunicorn na pasta do projeto (Procfile, render.yaml). Os ganchos
+# rodam no processo mestre, uma vez por início do servidor, antes dos workers.
+import os
+
+import metricas
+import senhas
+
+
+def on_starting(server):
+    # Cada worker grava suas métricas num arquivo próprio (metricas.py); os da
+    # execução anterior sairiam somados no /metrics
+    metricas.limpar_pasta()
+
+    # Custo do bcrypt medido uma vez aqui e herdado pelos workers pelo ambiente:
+    # todos usam o mesmo custo (ver senhas.py). Fixo se já vier configurado.
+    if not os.environ.get('BCRYPT_LOG_ROUNDS'):
+        custo = senhas.calibrar(int(os.environ.get('BCRYPT_ALVO_MS', 250)))
+        os.environ['BCRYPT_LOG_ROUNDS'] = str(custo)
+        server.log.info('bcrypt: custo %s calibrado para os workers', custo)
@@ -0,0 +1,91 @@
+# identidade.py
+# Cache da identidade do usuário logado, usado pelo user_loader do Flask-Login.
+# Guarda só o que as páginas leem de current_user (id, email, tipo, perfil e o
+# nome do morador), para a requisição autenticada comum não consultar o banco.
+#
+# Cada entrada vale por TTL segundos. Quem altera um usuário chama invalidar(),
+# que limpa a entrada local e incrementa a versão 'usuarios' na transação; os
+# outros workers conferem essa versão no máximo a cada INTERVALO_VERIFICACAO
+# segundos e descartam o cache inteiro quando ela muda.
+import threading
+import time
+from collections import namedtuple
+
+from flask_login import UserMixin
+from models import db, Usuario, Morador
+from versoes import versao_atual, incrementar_versao
+
+CHAVE = 'usuarios'
+TTL = 60.0
+INTERVALO_VERIFICACAO = 5.0
+
+MoradorInfo = namedtuple('MoradorInfo', ['nome'])
+
+
+class Identidade(UserMixin):
+    """Cópia somente leitura do usuário logado.
+
+    Para alterar o usuário, carregue o Usuario do banco pelo id.
+    """
+    def __init__(self, id, email, tipo, perfil, morador):
+        self.id = id
+        self.email = email
+        self.tipo = tipo
+        self.perfil = perfil
+        self.morador = morador
+
+
+class CacheIdentidades:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entradas = {}        # usuario_id -> (expira_em, Identidade)
+        self._versao = None
+        self._verificado_em = 0.0
+
+    def _conferir_versao(self):
+        agora = time.monotonic()
+        if agora - self._verificado_em < INTERVALO_VERIFICACAO:
+            return
+        with self._lock:
+            if agora - self._verificado_em < INTERVALO_VERIFICACAO:
+                return
+            versao = versao_atual(CHAVE)
+            if versao != self._versao:
+                self._entradas = {}
+                self._versao = versao
+            self._verificado_em = agora
+
+    def _carregar(self, usuario_id):
+        linha = db.session.query(
+            Usuario.id, Usuario.email, Usuario.tipo, Usuario.perfil, Morador.nome
+        ).outerjoin(Morador, Morador.usuario_id == Usuario.id)\
+         .filter(Usuario.id == usuario_id).first()
+        if linha is None:
+            return None
+        morador = MoradorInfo(linha.nome) if linha.nome is not None else None
+        return Identidade(linha.id, linha.email, linha.tipo, linha.perfil, morador)
+
+    def obter(self, usuario_id):
+        """Identidade do usuário, do cache ou do banco (None se não existir)."""
+        self._conferir_versao()
+        entrada = self._entradas.get(usuario_id)
+        if entrada is not None and entrada[0] > time.monotonic():
+            return entrada[1]
+
+        identidade = self._carregar(usuario_id)
+        if identidade is not None:
+            self._entradas[usuario_id] = (time.monotonic() + TTL, identidade)
+        return identidade
+
+    def invalidar(self, *usuario_ids):
+        """Descarta os usuários alterados. Chamar antes do commit da escrita."""
+        incrementar_versao(CHAVE)
+        self.esquecer(*usuario_ids)
+
+    def esquecer(self, *usuario_ids):
+        """Descarta só a cópia deste worker (quando a escrita rodou no escritor)."""
+        for usuario_id in usuario_ids:
+            self._entradas.pop(usuario_id, None)
+
+
+identidades = CacheIdentidades()
@@ -0,0 +1,145 @@
+# importacao.py
+# Importação de moradores em massa a partir de um CSV ("flask importar-moradores").
+#
+# Colunas, nesta ordem: email, senha, tipo, bloco, numero, nome. O cabeçalho é
+# opcional e bloco/numero/nome podem faltar (ex.: o síndico, sem apartamento).
+#
+# O arquivo é lido aos poucos, em lotes. Em cada lote:
+#   1. valida as linhas e guarda os erros com o número da linha;
+#   2. gera os hashes das senhas em um pool de processos (todos os núcleos);
+#   3. grava apartamentos (upsert), usuários e moradores com executemany,
+#      em uma transação por lote.
+# No modo de teste (dry_run) tudo roda, menos o hash e o commit.
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt as _bcrypt
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models import db, Usuario, Morador, Apartamento
+
+COLUNAS = ['email', 'senha', 'tipo', 'bloco', 'numero', 'nome']
+TIPOS = ('morador', 'sindico')
+
+
+def _hash(senha, custo):
+    return _bcrypt.hashpw(senha.encode('utf-8'), _bcrypt.gensalt(custo)).decode('utf-8')
+
+
+def _ler(arquivo):
+    """(número da linha, dict) para cada linha do CSV, pulando o cabeçalho."""
+    for numero_linha, campos in enumerate(csv.reader(arquivo), start=1):
+        if not any(c.strip() for c in campos):
+            continue
+        if numero_linha == 1 and campos[0].strip().lower() == 'email':
+            continue
+        campos = [c.strip() for c in campos] + [''] * (len(COLUNAS) - len(campos))
+        yield numero_linha, dict(zip(COLUNAS, campos))
+
+
+def _lotes(linhas, tamanho):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) == tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _validar(lote, vistos):
+    """Separa as linhas válidas; devolve (válidas, erros)."""
+    validas, erros = [], []
+    existentes = {
+        email for (email,) in db.session.query(Usuario.email)
+        .filter(Usuario.email.in_([dados['email'] for _, dados in lote]))
+    }
+    for numero_linha, dados in lote:
+        dados['tipo'] = (dados['tipo'] or 'morador').lower()
+        if not dados['email'] or not dados['senha']:
+            erros.append((numero_linha, 'email e senha são obrigatórios'))
+        elif dados['tipo'] not in TIPOS:
+            erros.append((numero_linha, f"tipo inválido: {dados['tipo']!r}"))
+        elif dados['email'] in vistos:
+            erros.append((numero_linha, f"email repetido no arquivo: {dados['email']}"))
+        elif dados['email'] in existentes:
+            erros.append((numero_linha, f"email já cadastrado: {dados['email']}"))
+        elif dados['numero'] and not dados['nome']:
+            erros.append((numero_linha, 'nome é obrigatório para quem tem apartamento'))
+        else:
+            vistos.add(dados['email'])
+            validas.append((numero_linha, dados))
+    return validas, erros
+
+
+def _gravar(validas):
+    """Grava apartamentos, usuários e moradores do lote (sem commit)."""
+    chaves = {(d['bloco'], d['numero']) for _, d in validas if d['numero']}
+    apartamentos = {}
+    if chaves:
+        db.session.execute(
+            sqlite_insert(Apartamento).on_conflict_do_nothing(index_elements=['bloco', 'numero']),
+            [{'bloco': bloco, 'numero': numero} for bloco, numero in chaves]
+        )
+        apartamentos = {
+            (bloco, numero): id for id, bloco, numero in
+            db.session.query(Apartamento.id, Apartamento.bloco, Apartamento.numero)
+            .filter(db.tuple_(Apartamento.bloco, Apartamento.numero).in_(chaves))
+        }
+
+    ids = {
+        email: id for id, email in db.session.execute(
+            insert(Usuario).returning(Usuario.id, Usuario.email),
+            [{'email': d['email'], 'senha': d['senha'], 'tipo': d['tipo'], 'perfil': d['tipo']}
+             for _, d in validas]
+        )
+    }
+
+    moradores = [
+        {'usuario_id': ids[d['email']], 'apartamento_id': apartamentos[(d['bloco'], d['numero'])],
+         'nome': d['nome'], 'ativo': True}
+        for _, d in validas if d['numero']
+    ]
+    if moradores:
+        db.session.execute(insert(Morador), moradores)
+
+
+def importar_moradores(arquivo, custo, tamanho_lote=500, processos=None, dry_run=False, avisar=print):
+    """Importa o CSV aberto em arquivo. Devolve (importados, erros).
+
+    avisar(numero_linha, mensagem) é chamado para cada linha rejeitada.
+    """
+    importados = total_erros = 0
+    vistos = set()
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count()) as pool:
+        for lote in _lotes(_ler(arquivo), tamanho_lote):
+            validas, erros = _validar(lote, vistos)
+            for numero_linha, mensagem in erros:
+                avisar(numero_linha, mensagem)
+            total_erros += len(erros)
+            if not validas:
+                continue
+
+            if not dry_run:
+                senhas = [d['senha'] for _, d in validas]
+                hashes = pool.map(_hash, senhas, [custo] * len(senhas), chunksize=8)
+                for (_, dados), senha_hash in zip(validas, hashes):
+                    dados['senha'] = senha_hash
+
+            try:
+                _gravar(validas)
+            except Exception as e:
+                db.session.rollback()
+                primeira, ultima = validas[0][0], validas[-1][0]
+                avisar(primeira, f'lote das linhas {primeira}-{ultima} não gravado: {e}')
+                total_erros += len(validas)
+                continue
+
+            if dry_run:
+                db.session.rollback()
+            else:
+                db.session.commit()
+            importados += len(validas)
+    return importados, total_erros
@@ -0,0 +1,216 @@
+# metricas.py
+# Métricas por endpoint no formato texto do Prometheus (rota /metrics):
+#
+#   condominio_requisicao_segundos     histograma da latência
+#   condominio_sql_por_requisicao      histograma de comandos SQL por requisição
+#   condominio_sql_segundos_total      tempo total gasto em SQL
+#   condominio_resposta_bytes_total    bytes enviados (respostas com tamanho conhecido)
+#
+# Os comandos SQL são contados pelos eventos before/after_cursor_execute do
+# engine (comandos que falham não entram). Cada worker do gunicorn guarda seus
+# números em memória e os grava em METRICAS_DIR/<pid>-<id aleatório>.json no
+# máximo a cada INTERVALO_GRAVACAO segundos; o /metrics soma os arquivos de
+# todos os workers. O id aleatório é de cada processo: um worker novo com o pid
+# de um que morreu não sobrescreve os números dele, e os contadores somados
+# nunca diminuem. O gunicorn.conf.py limpa a pasta quando o servidor sobe.
+#
+# A requisição é registrada no teardown_request, que roda também quando a view
+# levanta uma exceção (os 500 entram nas métricas).
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+INTERVALO_GRAVACAO = 1.0
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_SQL = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def pasta_padrao():
+    """METRICAS_DIR do ambiente ou uma pasta fixa no diretório temporário."""
+    return os.environ.get('METRICAS_DIR') or os.path.join(tempfile.gettempdir(), 'condominio-metricas')
+
+
+def limpar_pasta(pasta=None):
+    """Apaga os arquivos dos workers (início do servidor, ver gunicorn.conf.py)."""
+    for caminho in glob.glob(os.path.join(pasta or pasta_padrao(), '*.json*')):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+
+def _novo():
+    return {
+        'n': 0,
+        'segundos': 0.0,
+        'buckets_segundos': [0] * len(BUCKETS_SEGUNDOS),
+        'sql': 0,
+        'buckets_sql': [0] * len(BUCKETS_SQL),
+        'sql_segundos': 0.0,
+        'bytes': 0,
+    }
+
+
+def _somar(destino, origem):
+    for chave, valor in origem.items():
+        if isinstance(valor, list):
+            destino[chave] = [a + b for a, b in zip(destino[chave], valor)]
+        else:
+            destino[chave] += valor
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados = {}
+        self._gravado_em = 0.0
+        self._pid = None
+        self._arquivo = None
+        self.pasta = None
+
+    def _do_processo(self):
+        """Números deste processo; depois de um fork (worker novo) começam do zero."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._arquivo = f'{self._pid}-{uuid.uuid4().hex[:12]}.json'
+            self._dados = {}
+        return self._dados
+
+    # -------------------------------
+    # Coleta
+    # -------------------------------
+    def registrar(self, endpoint, segundos, consultas, sql_segundos, tamanho):
+        with self._lock:
+            d = self._do_processo().setdefault(endpoint, _novo())
+            d['n'] += 1
+            d['segundos'] += segundos
+            for i, limite in enumerate(BUCKETS_SEGUNDOS):
+                if segundos <= limite:
+                    d['buckets_segundos'][i] += 1
+            d['sql'] += consultas
+            for i, limite in enumerate(BUCKETS_SQL):
+                if consultas <= limite:
+                    d['buckets_sql'][i] += 1
+            d['sql_segundos'] += sql_segundos
+            d['bytes'] += tamanho or 0
+
+        if time.monotonic() - self._gravado_em >= INTERVALO_GRAVACAO:
+            self.gravar()
+
+    def gravar(self):
+        """Grava os números deste worker no arquivo dele (troca atômica)."""
+        if not self.pasta:
+            return
+        with self._lock:
+            dados = self._do_processo()
+            if not dados:
+                return  # scripts e o processo mestre não deixam arquivo vazio
+            conteudo = json.dumps(dados)
+            self._gravado_em = time.monotonic()
+            caminho = os.path.join(self.pasta, self._arquivo)
+        temporario = caminho + '.tmp'
+        with open(temporario, 'w') as f:
+            f.write(conteudo)
+        os.replace(temporario, caminho)
+
+    # -------------------------------
+    # Exportação
+    # -------------------------------
+    def _todos(self):
+        """Soma dos arquivos de todos os workers."""
+        self.gravar()
+        total = {}
+        for caminho in glob.glob(os.path.join(self.pasta, '*.json')):
+            try:
+                with open(caminho) as f:
+                    dados = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for endpoint, valores in dados.items():
+                _somar(total.setdefault(endpoint, _novo()), valores)
+        return total
+
+    def texto_prometheus(self):
+        total = self._todos()
+        linhas = []
+
+        def histograma(nome, ajuda, chave_buckets, limites, chave_soma):
+            linhas.append(f'# HELP {nome} {ajuda}')
+            linhas.append(f'# TYPE {nome} histogram')
+            for endpoint in sorted(total):
+                d = total[endpoint]
+                for limite, quantidade in zip(limites, d[chave_buckets]):
+                    linhas.append(f'{nome}_bucket{{endpoint="{endpoint}",le="{limite}"}} {quantidade}')
+                linhas.append(f'{nome}_bucket{{endpoint="{endpoint}",le="+Inf"}} {d["n"]}')
+                linhas.append(f'{nome}_sum{{endpoint="{endpoint}"}} {d[chave_soma]}')
+                linhas.append(f'{nome}_count{{endpoint="{endpoint}"}} {d["n"]}')
+
+        def contador(nome, ajuda, chave):
+            linhas.append(f'# HELP {nome} {ajuda}')
+            linhas.append(f'# TYPE {nome} counter')
+            for endpoint in sorted(total):
+                linhas.append(f'{nome}{{endpoint="{endpoint}"}} {total[endpoint][chave]}')
+
+        histograma('condominio_requisicao_segundos', 'Latência das requisições.',
+                   'buckets_segundos', BUCKETS_SEGUNDOS, 'segundos')
+        histograma('condominio_sql_por_requisicao', 'Comandos SQL executados por requisição.',
+                   'buckets_sql', BUCKETS_SQL, 'sql')
+        contador('condominio_sql_segundos_total', 'Tempo gasto executando SQL.', 'sql_segundos')
+        contador('condominio_resposta_bytes_total', 'Bytes enviados nas respostas.', 'bytes')
+        return '\n'.join(linhas) + '\n'
+
+    # -------------------------------
+    # Integração com o app
+    # -------------------------------
+    def init_app(self, app, db):
+        self.pasta = app.config.get('METRICAS_DIR') or pasta_padrao()
+        os.makedirs(self.pasta, exist_ok=True)
+        atexit.register(self.gravar)
+
+        with app.app_context():
+            engine = db.engine
+
+        # O início fica no contexto do próprio comando, não numa pilha da conexão:
+        # o after_cursor_execute não roda quando o comando falha, e um início
+        # que sobrasse na pilha deslocaria os tempos dos comandos seguintes
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _antes(conn, cursor, statement, parameters, context, executemany):
+            context._metricas_inicio = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _depois(conn, cursor, statement, parameters, context, executemany):
+            inicio = getattr(context, '_metricas_inicio', None)
+            if inicio is not None and has_request_context() and 'metricas_inicio' in g:
+                g.metricas_sql += 1
+                g.metricas_sql_segundos += time.perf_counter() - inicio
+
+        @app.before_request
+        def _iniciar():
+            g.metricas_inicio = time.perf_counter()
+            g.metricas_sql = 0
+            g.metricas_sql_segundos = 0.0
+
+        @app.after_request
+        def _tamanho(resposta):
+            g.metricas_tamanho = None if resposta.is_streamed else resposta.content_length
+            return resposta
+
+        # No teardown, e não no after_request: roda também quando a view falha
+        @app.teardown_request
+        def _registrar(erro=None):
+            if 'metricas_inicio' in g:
+                endpoint = request.endpoint or 'sem_rota'
+                self.registrar(endpoint, time.perf_counter() - g.metricas_inicio,
+                               g.metricas_sql, g.metricas_sql_segundos, g.get('metricas_tamanho'))
+
+
+metricas = Metricas()
@@ -0,0 +1,32 @@
+"""notificacoes para o /eventos (SSE)
+
+Revision ID: 3f8a6d2c9e14
+Revises: e6b1c4d8a2f3
+Create Date: 2026-10-18 17:12:47.205913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8a6d2c9e14'
+down_revision = 'e6b1c4d8a2f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notificacoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('pedido_id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('criado_em', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('notificacoes')
@@ -0,0 +1,28 @@
+"""versoes dos caches em memoria
+
+Revision ID: 5b9e03f7c2a8
+Revises: d41e7a0c5f12
+Create Date: 2026-10-18 11:26:02.318475
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9e03f7c2a8'
+down_revision = 'd41e7a0c5f12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('versoes_cache',
+        sa.Column('chave', sa.String(length=50), nullable=False),
+        sa.Column('versao', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('chave')
+    )
+
+
+def downgrade():
+    op.drop_table('versoes_cache')
@@ -0,0 +1,31 @@
+"""indices de pedidos para as listas e o dashboard
+
+Revision ID: 8c2f1d3a9b47
+Revises: 41074f47c8f7
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2f1d3a9b47'
+down_revision = '41074f47c8f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('pedidos', schema=None) as batch_op:
+        batch_op.create_index('ix_pedidos_data', ['data'], unique=False)
+        batch_op.create_index('ix_pedidos_usuario_id_data', ['usuario_id', 'data'], unique=False)
+        batch_op.create_index('ix_pedidos_servico_id_data', ['servico_id', 'data'], unique=False)
+        batch_op.create_index('ix_pedidos_status', ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('pedidos', schema=None) as batch_op:
+        batch_op.drop_index('ix_pedidos_status')
+        batch_op.drop_index('ix_pedidos_servico_id_data')
+        batch_op.drop_index('ix_pedidos_usuario_id_data')
+        batch_op.drop_index('ix_pedidos_data')
@@ -0,0 +1,40 @@
+"""apartamento unico por bloco e numero
+
+Revision ID: a7c3e95d1b60
+Revises: 5b9e03f7c2a8
+Create Date: 2026-10-18 14:40:52.907113
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e95d1b60'
+down_revision = '5b9e03f7c2a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Sem bloco passa a ser '' (NULL não conta como repetido no UNIQUE)
+    op.execute("UPDATE apartamentos SET bloco = '' WHERE bloco IS NULL")
+
+    # Junta apartamentos repetidos no de menor id antes de criar o UNIQUE
+    op.execute(
+        "UPDATE moradores SET apartamento_id = ("
+        "  SELECT MIN(a2.id) FROM apartamentos a1 JOIN apartamentos a2"
+        "  ON a1.bloco = a2.bloco AND a1.numero = a2.numero"
+        "  WHERE a1.id = moradores.apartamento_id)"
+    )
+    op.execute(
+        "DELETE FROM apartamentos WHERE id NOT IN ("
+        "  SELECT MIN(id) FROM apartamentos GROUP BY bloco, numero)"
+    )
+
+    with op.batch_alter_table('apartamentos', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_apartamentos_bloco_numero', ['bloco', 'numero'])
+
+
+def downgrade():
+    with op.batch_alter_table('apartamentos', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_apartamentos_bloco_numero', type_='unique')
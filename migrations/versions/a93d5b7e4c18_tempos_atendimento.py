@@ -0,0 +1,63 @@
+"""tempos de atendimento: resumo t-digest por desfecho, mes e servico
+
+Revision ID: a93d5b7e4c18
+Revises: f1a6c3e8b092
+Create Date: 2026-10-19 01:12:40.905217
+
+"""
+from collections import defaultdict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+from quantis import TDigest
+
+
+# revision identifiers, used by Alembic.
+revision = 'a93d5b7e4c18'
+down_revision = 'f1a6c3e8b092'
+branch_labels = None
+depends_on = None
+
+DESFECHOS = ('concluído', 'rejeitado')
+
+
+def upgrade():
+    tabela = op.create_table('tempos_atendimento',
+        sa.Column('desfecho', sa.String(length=50), nullable=False),
+        sa.Column('mes', sa.Date(), nullable=False),
+        sa.Column('servico_id', sa.Integer(), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.Column('resumo', sa.LargeBinary(), nullable=False),
+        sa.ForeignKeyConstraint(['servico_id'], ['servicos.id'], ),
+        sa.PrimaryKeyConstraint('desfecho', 'mes', 'servico_id')
+    )
+
+    # Preenche a partir de pedido_eventos, com as regras de atendimento.py:
+    # passagem de status aberto para desfecho, tempo desde a criação do
+    # pedido, mês da passagem em Brasília (a hora UTC decide o dia local)
+    utc, brasil = ZoneInfo('UTC'), ZoneInfo('America/Sao_Paulo')
+    amostras = defaultdict(list)
+    for servico_id, fim, hora, segundos in op.get_bind().exec_driver_sql("""
+        SELECT e.servico_id, lower(e.status), strftime('%Y-%m-%d %H', e.em),
+               (julianday(e.em) - julianday(c.em)) * 86400.0
+        FROM pedido_eventos e
+        JOIN pedido_eventos c ON c.pedido_id = e.pedido_id AND c.anterior IS NULL
+        WHERE e.anterior IS NOT NULL
+          AND lower(e.status) IN (?, ?) AND lower(e.anterior) NOT IN (?, ?)
+    """, DESFECHOS + DESFECHOS):
+        dia = datetime.strptime(hora, '%Y-%m-%d %H').replace(tzinfo=utc).astimezone(brasil).date()
+        amostras[fim, dia.replace(day=1), servico_id].append(segundos)
+    if amostras:
+        linhas = []
+        for (fim, mes, servico_id), valores in amostras.items():
+            resumo = TDigest.de_valores(valores)
+            linhas.append({'desfecho': fim, 'mes': mes, 'servico_id': servico_id,
+                           'quantidade': resumo.total, 'resumo': resumo.para_bytes()})
+        op.bulk_insert(tabela, linhas)
+
+
+def downgrade():
+    op.drop_table('tempos_atendimento')
@@ -0,0 +1,45 @@
+"""sequencia de alteracoes em pedidos e servicos (/api/changes)
+
+Revision ID: b72e5c1f4a90
+Revises: 3f8a6d2c9e14
+Create Date: 2026-10-18 19:03:11.842167
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b72e5c1f4a90'
+down_revision = '3f8a6d2c9e14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD COLUMN direto: o batch recriaria pedidos e perderia os gatilhos da busca
+    op.add_column('servicos', sa.Column('alteracao', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('pedidos', sa.Column('alteracao', sa.Integer(), server_default='0', nullable=False))
+
+    # Linhas existentes: serviços primeiro, depois os pedidos na ordem do id
+    op.execute("UPDATE servicos SET alteracao = id")
+    op.execute("UPDATE pedidos SET alteracao = id + (SELECT coalesce(max(id), 0) FROM servicos)")
+    op.execute("""
+        INSERT INTO versoes_cache (chave, versao)
+        VALUES ('alteracoes', (SELECT coalesce(max(id), 0) FROM servicos) + (SELECT coalesce(max(id), 0) FROM pedidos))
+        ON CONFLICT (chave) DO UPDATE SET versao = excluded.versao
+    """)
+
+    op.create_index('ix_servicos_alteracao', 'servicos', ['alteracao'], unique=False)
+    op.create_index('ix_pedidos_alteracao', 'pedidos', ['alteracao'], unique=False)
+    op.create_index('ix_pedidos_usuario_id_alteracao', 'pedidos', ['usuario_id', 'alteracao'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_pedidos_usuario_id_alteracao', table_name='pedidos')
+    op.drop_index('ix_pedidos_alteracao', table_name='pedidos')
+    op.drop_index('ix_servicos_alteracao', table_name='servicos')
+    op.execute("DELETE FROM versoes_cache WHERE chave = 'alteracoes'")
+    # DROP COLUMN direto (SQLite 3.35+), pelo mesmo motivo do upgrade
+    op.execute("ALTER TABLE pedidos DROP COLUMN alteracao")
+    op.execute("ALTER TABLE servicos DROP COLUMN alteracao")
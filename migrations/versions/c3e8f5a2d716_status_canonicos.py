@@ -0,0 +1,54 @@
+"""status dos pedidos gravados como em STATUS_PEDIDO (minusculas)
+
+Revision ID: c3e8f5a2d716
+Revises: a93d5b7e4c18
+Create Date: 2026-10-19 09:40:12.318204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8f5a2d716'
+down_revision = 'a93d5b7e4c18'
+branch_labels = None
+depends_on = None
+
+STATUS_PEDIDO = ('pendente', 'em andamento', 'concluído', 'rejeitado')
+
+# Contagens com status na chave: a variante é somada na linha canônica
+CONTAGENS = {
+    'contagem_pedidos': 'servico_id',
+    'contagem_periodos': 'periodo, inicio, servico_id',
+}
+
+
+def upgrade():
+    # Variantes gravadas até aqui ('Pendente' era o padrão do modelo); o
+    # lower() do Python, ao contrário do SQLite, também trata os acentos
+    conexao = op.get_bind()
+    variantes = {
+        status: status.lower()
+        for (status,) in conexao.exec_driver_sql(
+            "SELECT DISTINCT status FROM pedidos "
+            "UNION SELECT status FROM pedido_eventos "
+            "UNION SELECT status FROM contagem_pedidos "
+            "UNION SELECT status FROM contagem_periodos")
+        if status and status != status.lower() and status.lower() in STATUS_PEDIDO
+    }
+    for variante, canonico in variantes.items():
+        conexao.exec_driver_sql("UPDATE pedidos SET status = ? WHERE status = ?", (canonico, variante))
+        conexao.exec_driver_sql("UPDATE pedido_eventos SET status = ? WHERE status = ?", (canonico, variante))
+        conexao.exec_driver_sql("UPDATE pedido_eventos SET anterior = ? WHERE anterior = ?", (canonico, variante))
+        for tabela, chave in CONTAGENS.items():
+            conexao.exec_driver_sql(
+                f"INSERT INTO {tabela} ({chave}, status, quantidade) "
+                f"SELECT {chave}, ?, quantidade FROM {tabela} WHERE status = ? "
+                f"ON CONFLICT ({chave}, status) DO UPDATE SET quantidade = quantidade + excluded.quantidade",
+                (canonico, variante))
+            conexao.exec_driver_sql(f"DELETE FROM {tabela} WHERE status = ?", (variante,))
+
+
+def downgrade():
+    # Não há como saber quais linhas tinham a variante: os status ficam canônicos
+    pass
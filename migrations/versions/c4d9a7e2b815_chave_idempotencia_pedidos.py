@@ -0,0 +1,27 @@
+"""chave de idempotencia dos pedidos (fila offline do app)
+
+Revision ID: c4d9a7e2b815
+Revises: b72e5c1f4a90
+Create Date: 2026-10-18 20:41:37.519203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9a7e2b815'
+down_revision = 'b72e5c1f4a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD COLUMN direto: o batch recriaria pedidos e perderia os gatilhos da busca
+    op.add_column('pedidos', sa.Column('chave_idempotencia', sa.String(length=64), nullable=True))
+    op.create_index('uq_pedidos_usuario_id_chave', 'pedidos', ['usuario_id', 'chave_idempotencia'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_pedidos_usuario_id_chave', table_name='pedidos')
+    op.execute("ALTER TABLE pedidos DROP COLUMN chave_idempotencia")
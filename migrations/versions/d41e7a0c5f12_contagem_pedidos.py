@@ -0,0 +1,35 @@
+"""contagem de pedidos por servico e status
+
+Revision ID: d41e7a0c5f12
+Revises: 8c2f1d3a9b47
+Create Date: 2026-10-18 10:03:17.551904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41e7a0c5f12'
+down_revision = '8c2f1d3a9b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('contagem_pedidos',
+        sa.Column('servico_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['servico_id'], ['servicos.id'], ),
+        sa.PrimaryKeyConstraint('servico_id', 'status')
+    )
+    # Preenche com o que já existe em pedidos
+    op.execute(
+        "INSERT INTO contagem_pedidos (servico_id, status, quantidade) "
+        "SELECT servico_id, status, COUNT(*) FROM pedidos GROUP BY servico_id, status"
+    )
+
+
+def downgrade():
+    op.drop_table('contagem_pedidos')
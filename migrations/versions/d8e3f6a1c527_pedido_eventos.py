@@ -0,0 +1,55 @@
+"""pedido_eventos: historico de status (substitui notificacoes)
+
+Revision ID: d8e3f6a1c527
+Revises: c4d9a7e2b815
+Create Date: 2026-10-18 22:15:48.630914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8e3f6a1c527'
+down_revision = 'c4d9a7e2b815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('pedido_eventos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('pedido_id', sa.Integer(), nullable=False),
+        sa.Column('servico_id', sa.Integer(), nullable=False),
+        sa.Column('anterior', sa.String(length=50), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('em', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Pedidos já existentes: um evento de criação com o status atual, na data
+    # do pedido (as mudanças anteriores não foram registradas). Em ordem de
+    # data, antes dos índices, para a carga ser sequencial.
+    op.execute("""
+        INSERT INTO pedido_eventos (pedido_id, servico_id, anterior, status, em)
+        SELECT id, servico_id, NULL, status, data FROM pedidos ORDER BY data, id
+    """)
+    op.create_index('ix_pedido_eventos_em', 'pedido_eventos', ['em'], unique=False)
+    op.create_index('ix_pedido_eventos_pedido_id_em', 'pedido_eventos', ['pedido_id', 'em'], unique=False)
+
+    # Os avisos em tempo real passam a ler pedido_eventos
+    op.drop_table('notificacoes')
+
+
+def downgrade():
+    op.create_table('notificacoes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tipo', sa.String(length=20), nullable=False),
+        sa.Column('pedido_id', sa.Integer(), nullable=False),
+        sa.Column('usuario_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('criado_em', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.drop_index('ix_pedido_eventos_pedido_id_em', table_name='pedido_eventos')
+    op.drop_index('ix_pedido_eventos_em', table_name='pedido_eventos')
+    op.drop_table('pedido_eventos')
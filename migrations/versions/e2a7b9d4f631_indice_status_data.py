@@ -0,0 +1,28 @@
+"""indice (status, data) de pedidos para o filtro de status do historico
+
+Revision ID: e2a7b9d4f631
+Revises: c3e8f5a2d716
+Create Date: 2026-10-19 10:05:37.842116
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a7b9d4f631'
+down_revision = 'c3e8f5a2d716'
+branch_labels = None
+depends_on = None
+
+
+# Sem batch_alter_table: o batch recria a tabela pedidos e perderia os
+# triggers da busca (pedidos_busca_*). O (status, data) também atende quem
+# só filtra por status, então substitui o ix_pedidos_status.
+def upgrade():
+    op.create_index('ix_pedidos_status_data', 'pedidos', ['status', 'data'], unique=False)
+    op.drop_index('ix_pedidos_status', table_name='pedidos')
+
+
+def downgrade():
+    op.create_index('ix_pedidos_status', 'pedidos', ['status'], unique=False)
+    op.drop_index('ix_pedidos_status_data', table_name='pedidos')
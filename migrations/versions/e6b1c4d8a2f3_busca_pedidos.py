@@ -0,0 +1,55 @@
+"""busca textual (FTS5) em pedidos
+
+Revision ID: e6b1c4d8a2f3
+Revises: a7c3e95d1b60
+Create Date: 2026-10-18 16:05:31.442078
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b1c4d8a2f3'
+down_revision = 'a7c3e95d1b60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índice FTS5 de conteúdo externo: o texto continua só em pedidos
+    op.execute(
+        "CREATE VIRTUAL TABLE pedidos_busca USING fts5("
+        "  nome, descricao, observacao,"
+        "  content='pedidos', content_rowid='id',"
+        "  tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER pedidos_busca_insert AFTER INSERT ON pedidos BEGIN"
+        "  INSERT INTO pedidos_busca(rowid, nome, descricao, observacao)"
+        "  VALUES (new.id, new.nome, new.descricao, new.observacao);"
+        " END"
+    )
+    op.execute(
+        "CREATE TRIGGER pedidos_busca_delete AFTER DELETE ON pedidos BEGIN"
+        "  INSERT INTO pedidos_busca(pedidos_busca, rowid, nome, descricao, observacao)"
+        "  VALUES ('delete', old.id, old.nome, old.descricao, old.observacao);"
+        " END"
+    )
+    op.execute(
+        "CREATE TRIGGER pedidos_busca_update AFTER UPDATE OF nome, descricao, observacao ON pedidos BEGIN"
+        "  INSERT INTO pedidos_busca(pedidos_busca, rowid, nome, descricao, observacao)"
+        "  VALUES ('delete', old.id, old.nome, old.descricao, old.observacao);"
+        "  INSERT INTO pedidos_busca(rowid, nome, descricao, observacao)"
+        "  VALUES (new.id, new.nome, new.descricao, new.observacao);"
+        " END"
+    )
+
+    # Indexa os pedidos que já existem
+    op.execute("INSERT INTO pedidos_busca(pedidos_busca) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS pedidos_busca_update")
+    op.execute("DROP TRIGGER IF EXISTS pedidos_busca_delete")
+    op.execute("DROP TRIGGER IF EXISTS pedidos_busca_insert")
+    op.execute("DROP TABLE IF EXISTS pedidos_busca")
@@ -0,0 +1,59 @@
+"""contagem de pedidos por periodo (dia, semana, mes), servico e status
+
+Revision ID: f1a6c3e8b092
+Revises: d8e3f6a1c527
+Create Date: 2026-10-18 23:40:12.318406
+
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a6c3e8b092'
+down_revision = 'd8e3f6a1c527'
+branch_labels = None
+depends_on = None
+
+
+def _inicios(dia):
+    return (('dia', dia), ('semana', dia - timedelta(days=dia.weekday())), ('mes', dia.replace(day=1)))
+
+
+def upgrade():
+    tabela = op.create_table('contagem_periodos',
+        sa.Column('periodo', sa.String(length=10), nullable=False),
+        sa.Column('inicio', sa.Date(), nullable=False),
+        sa.Column('servico_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('quantidade', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['servico_id'], ['servicos.id'], ),
+        sa.PrimaryKeyConstraint('periodo', 'inicio', 'servico_id', 'status'),
+        sqlite_with_rowid=False
+    )
+
+    # Preenche com o que já existe em pedidos (mesma conta de periodos.contar_pedidos):
+    # o SQLite agrupa por hora UTC e cada hora vira o dia em Brasília
+    utc, brasil = ZoneInfo('UTC'), ZoneInfo('America/Sao_Paulo')
+    contagem = Counter()
+    for hora, servico_id, status, quantidade in op.get_bind().exec_driver_sql(
+        "SELECT strftime('%Y-%m-%d %H', data) AS hora, servico_id, status, COUNT(*) "
+        "FROM pedidos GROUP BY hora, servico_id, status"
+    ):
+        dia = datetime.strptime(hora, '%Y-%m-%d %H').replace(tzinfo=utc).astimezone(brasil).date()
+        for periodo, inicio in _inicios(dia):
+            contagem[periodo, inicio, servico_id, status] += quantidade
+    if contagem:
+        op.bulk_insert(tabela, [
+            {'periodo': periodo, 'inicio': inicio, 'servico_id': servico_id,
+             'status': status, 'quantidade': quantidade}
+            for (periodo, inicio, servico_id, status), quantidade in contagem.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('contagem_periodos')
@@ -36,6 +36,10 @@ class Morador(db.Model):
 # ================================
 class Apartamento(db.Model):
     __tablename__ = 'apartamentos'
+    # Sem bloco é gravado como '' (NULL não conta como repetido no UNIQUE do SQLite)
+    __table_args__ = (
+        db.UniqueConstraint('bloco', 'numero', name='uq_apartamentos_bloco_numero'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     bloco = db.Column(db.String(10))
     numero = db.Column(db.String(10), nullable=False)
@@ -47,19 +51,114 @@ class Apartamento(db.Model):
 # ================================
 class Servico(db.Model):
     __tablename__ = 'servicos'
+    __table_args__ = (
+        db.Index('ix_servicos_alteracao', 'alteracao'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False)
+    # Posição na sequência de alterações (ver alteracoes.py)
+    alteracao = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+# Status de um pedido: os únicos valores gravados, aceitos nos filtros e
+# mostrados nos selects. Todo pedido começa no primeiro.
+STATUS_PEDIDO = ('pendente', 'em andamento', 'concluído', 'rejeitado')
 
 class Pedido(db.Model):
     __tablename__ = 'pedidos'
+    # Índices das listas (filtro + ORDER BY data DESC) e do agrupamento por status.
+    # O id é o rowid no SQLite e já entra no fim de cada índice, desempatando a data.
+    __table_args__ = (
+        db.Index('ix_pedidos_data', 'data'),
+        db.Index('ix_pedidos_usuario_id_data', 'usuario_id', 'data'),
+        db.Index('ix_pedidos_servico_id_data', 'servico_id', 'data'),
+        # ?status= do histórico e da exportação: o status fixo e a ordem da data
+        # vêm do índice, sem ordenar todos os pedidos daquele status
+        db.Index('ix_pedidos_status_data', 'status', 'data'),
+        # /api/changes: alterações de todos (síndico) ou de um morador, em ordem
+        db.Index('ix_pedidos_alteracao', 'alteracao'),
+        db.Index('ix_pedidos_usuario_id_alteracao', 'usuario_id', 'alteracao'),
+        # Envio repetido (fila offline do app) não duplica o pedido (ver escritas.criar_pedido)
+        db.Index('uq_pedidos_usuario_id_chave', 'usuario_id', 'chave_idempotencia', unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
     servico_id = db.Column(db.Integer, db.ForeignKey('servicos.id'), nullable=False)
     nome = db.Column(db.String(150), nullable=False)
     descricao = db.Column(db.Text, nullable=True)
-    status = db.Column(db.String(50), nullable=False, default='Pendente')
+    status = db.Column(db.String(50), nullable=False, default=STATUS_PEDIDO[0])
     observacao = db.Column(db.Text, nullable=True)
     data = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Posição na sequência de alterações (ver alteracoes.py)
+    alteracao = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Chave gerada pelo navegador para cada pedido (NULL nos criados sem ela)
+    chave_idempotencia = db.Column(db.String(64), nullable=True)
 
     # relacionamento correto
     servico = db.relationship('Servico', backref='pedidos')
+
+# ================================
+# Contagem de pedidos (dashboard)
+# ================================
+class ContagemPedido(db.Model):
+    """Quantidade de pedidos por serviço e status, mantida a cada escrita."""
+    __tablename__ = 'contagem_pedidos'
+    servico_id = db.Column(db.Integer, db.ForeignKey('servicos.id'), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+
+# ================================
+# Contagem de pedidos por período (gráficos)
+# ================================
+class ContagemPeriodo(db.Model):
+    """Pedidos criados no período (dia, semana ou mês) por serviço e status atual (ver periodos.py)."""
+    __tablename__ = 'contagem_periodos'
+    # A tabela é a própria chave primária: os gráficos leem um trecho contínuo dela
+    __table_args__ = {'sqlite_with_rowid': False}
+    periodo = db.Column(db.String(10), primary_key=True)  # 'dia', 'semana' ou 'mes'
+    inicio = db.Column(db.Date, primary_key=True)  # primeiro dia do período, horário de Brasília
+    servico_id = db.Column(db.Integer, db.ForeignKey('servicos.id'), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+
+# ================================
+# Tempo de atendimento (percentis)
+# ================================
+class TempoAtendimento(db.Model):
+    """Resumo (t-digest) do tempo entre a abertura e o desfecho dos pedidos, por mês e serviço (ver atendimento.py)."""
+    __tablename__ = 'tempos_atendimento'
+    desfecho = db.Column(db.String(50), primary_key=True)  # 'concluído' ou 'rejeitado'
+    mes = db.Column(db.Date, primary_key=True)  # primeiro dia do mês do desfecho, horário de Brasília
+    servico_id = db.Column(db.Integer, db.ForeignKey('servicos.id'), primary_key=True)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+    resumo = db.Column(db.LargeBinary, nullable=False)  # quantis.TDigest.para_bytes(), em segundos
+
+# ================================
+# Versão dos caches em memória
+# ================================
+class VersaoCache(db.Model):
+    """Contador incrementado a cada escrita, para os workers saberem quando recarregar."""
+    __tablename__ = 'versoes_cache'
+    chave = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+
+# ================================
+# Histórico de status dos pedidos
+# ================================
+class PedidoEvento(db.Model):
+    """Criação ou mudança de status de um pedido; só recebe INSERT (ver eventos.py).
+
+    anterior é NULL no evento de criação. O id crescente é também o id dos
+    avisos em tempo real (/eventos).
+    """
+    __tablename__ = 'pedido_eventos'
+    __table_args__ = (
+        db.Index('ix_pedido_eventos_em', 'em'),
+        db.Index('ix_pedido_eventos_pedido_id_em', 'pedido_id', 'em'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_id = db.Column(db.Integer, nullable=False)
+    servico_id = db.Column(db.Integer, nullable=False)  # cópia do pedido, para os relatórios por serviço
+    anterior = db.Column(db.String(50), nullable=True)
+    status = db.Column(db.String(50), nullable=False)
+    em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
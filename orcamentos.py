@@ -0,0 +1,25 @@
+# orcamentos.py
+# Orçamento de cada rota: quantos comandos SQL e quantos milissegundos ela
+# pode gastar. É declarado junto da view, logo abaixo do @app.route:
+#
+#   @app.route('/historico')
+#   @orcamento(sql=2, ms=150)
+#   @tipo_requerido('sindico')
+#   def historico(): ...
+#
+# O app não faz nada com isso em produção; verificar_orcamentos.py visita as
+# rotas com um banco de teste e falha quando alguma passa do orçamento. Os
+# tempos valem para o conjunto de dados padrão daquele script.
+from collections import namedtuple
+
+Orcamento = namedtuple('Orcamento', ['sql', 'ms'])
+
+# endpoint (nome da view) -> Orcamento
+ORCAMENTOS = {}
+
+
+def orcamento(sql, ms):
+    def decorador(f):
+        ORCAMENTOS[f.__name__] = Orcamento(sql, ms)
+        return f
+    return decorador
@@ -0,0 +1,266 @@
+# periodos.py
+# Contagem de pedidos por período (dia, semana e mês) x serviço x status, na
+# tabela contagem_periodos, para os gráficos de tendência (/estatisticas).
+# Como contagem_pedidos (contadores.py), é mantida junto com cada escrita em
+# pedidos: o pedido conta nos períodos da sua data de criação, com o status
+# atual; quando o status muda, a contagem passa de um status para o outro
+# dentro dos mesmos períodos. "Pedidos de março por status" é, então, a
+# situação de hoje dos pedidos abertos em março.
+#
+# Os períodos seguem o horário de Brasília: o dia, a semana começando na
+# segunda-feira e o mês, cada um identificado pela data do seu primeiro dia.
+# A chave primária (periodo, inicio, servico_id, status) é a ordem da tabela
+# (WITHOUT ROWID), então um gráfico lê só o trecho do intervalo pedido — 12
+# meses são algumas centenas de linhas, sem passar pela tabela de pedidos.
+#
+# "flask recalcular-contadores" refaz a tabela a partir de pedidos.
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects.sqlite import insert
+from models import db, Pedido, ContagemPeriodo, STATUS_PEDIDO
+from consultas import utc, brasil
+from catalogo import catalogo
+
+PERIODOS = ('dia', 'semana', 'mes')
+# Quantos períodos o gráfico mostra quando o intervalo não é informado
+PADRAO = {'dia': 30, 'semana': 12, 'mes': 12}
+# Máximo de períodos por consulta
+MAXIMO = 400
+
+
+# -------------------------------
+# Calendário
+# -------------------------------
+def inicio_periodo(periodo, dia):
+    """Primeiro dia do período que contém o dia."""
+    if periodo == 'dia':
+        return dia
+    if periodo == 'semana':
+        return dia - timedelta(days=dia.weekday())
+    return dia.replace(day=1)
+
+
+def proximo(periodo, inicio):
+    """Início do período seguinte."""
+    if periodo == 'dia':
+        return inicio + timedelta(days=1)
+    if periodo == 'semana':
+        return inicio + timedelta(days=7)
+    return (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def anterior(periodo, inicio):
+    """Início do período anterior."""
+    if periodo == 'mes':
+        return (inicio - timedelta(days=1)).replace(day=1)
+    return inicio - timedelta(days=1 if periodo == 'dia' else 7)
+
+
+def dia_local(data):
+    """Dia no horário de Brasília de uma data gravada em UTC."""
+    return data.replace(tzinfo=utc).astimezone(brasil).date()
+
+
+def intervalo(periodo, inicio=None, fim=None, hoje=None):
+    """Inícios dos períodos de inicio a fim (datas locais), em ordem.
+
+    Sem fim, vai até o período de hoje; sem inicio, volta PADRAO[periodo]
+    períodos a partir do fim. ValueError se o pedido não fizer sentido.
+    """
+    if periodo not in PERIODOS:
+        raise ValueError('Período inválido (use dia, semana ou mes).')
+    fim = inicio_periodo(periodo, fim or hoje or dia_local(datetime.utcnow()))
+    if inicio is None:
+        inicio = fim
+        for _ in range(PADRAO[periodo] - 1):
+            inicio = anterior(periodo, inicio)
+    else:
+        inicio = inicio_periodo(periodo, inicio)
+    if inicio > fim:
+        raise ValueError('O início deve ser anterior ao fim.')
+
+    inicios = [inicio]
+    while inicios[-1] < fim:
+        if len(inicios) >= MAXIMO:
+            raise ValueError(f'No máximo {MAXIMO} períodos por consulta.')
+        inicios.append(proximo(periodo, inicios[-1]))
+    return inicios
+
+
+# -------------------------------
+# Escrita (junto com a de pedidos)
+# -------------------------------
+def _acumular(deltas, data, servico_id, status, delta):
+    dia = dia_local(data)
+    for periodo in PERIODOS:
+        deltas[periodo, inicio_periodo(periodo, dia), servico_id, status] += delta
+
+
+def somar_varios(deltas):
+    """Aplica {(periodo, inicio, servico_id, status): delta} num só executemany, sem commit."""
+    deltas = [{'periodo': periodo, 'inicio': inicio, 'servico_id': servico_id,
+               'status': status, 'quantidade': delta}
+              for (periodo, inicio, servico_id, status), delta in deltas.items() if delta]
+    if not deltas:
+        return
+    stmt = insert(ContagemPeriodo)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['periodo', 'inicio', 'servico_id', 'status'],
+        set_={'quantidade': ContagemPeriodo.quantidade + stmt.excluded.quantidade}
+    )
+    db.session.execute(stmt, deltas)
+
+
+def registrar_pedido(pedido):
+    """Conta um pedido novo (já com data). Chamar antes do commit que grava o pedido."""
+    deltas = Counter()
+    _acumular(deltas, pedido.data, pedido.servico_id, pedido.status or STATUS_PEDIDO[0], 1)
+    somar_varios(deltas)
+
+
+def registrar_mudanca_status(servico_id, data, status_antigo, status_novo):
+    """Move o pedido criado em data de um status para outro. Chamar antes do commit."""
+    registrar_varios([(servico_id, data, status_antigo)], status_novo)
+
+
+def registrar_varios(pedidos, status):
+    """Move vários (servico_id, data, status anterior) para status num só executemany."""
+    deltas = Counter()
+    for servico_id, data, status_antigo in pedidos:
+        if status_antigo != status:
+            _acumular(deltas, data, servico_id, status_antigo, -1)
+            _acumular(deltas, data, servico_id, status, 1)
+    somar_varios(deltas)
+
+
+# -------------------------------
+# Leitura (gráficos)
+# -------------------------------
+def consulta(periodo, inicio, fim, coluna):
+    """(início do período, valor de coluna, quantidade) com inicio <= início <= fim.
+
+    coluna é ContagemPeriodo.servico_id ou ContagemPeriodo.status; a soma
+    das outras combinações fica no SQLite, que lê só o trecho da chave.
+    """
+    return db.session.query(ContagemPeriodo.inicio, coluna, db.func.sum(ContagemPeriodo.quantidade))\
+        .filter(ContagemPeriodo.periodo == periodo,
+                ContagemPeriodo.inicio >= inicio, ContagemPeriodo.inicio <= fim)\
+        .group_by(ContagemPeriodo.inicio, coluna)
+
+
+def _series(periodo, inicios, coluna):
+    posicao = {inicio: i for i, inicio in enumerate(inicios)}
+    series = {}
+    for inicio, valor, quantidade in consulta(periodo, inicios[0], inicios[-1], coluna):
+        series.setdefault(valor, [0] * len(inicios))[posicao[inicio]] = quantidade
+    return {valor: quantidades for valor, quantidades in sorted(series.items()) if any(quantidades)}
+
+
+def series(periodo, inicios):
+    """Séries para os gráficos, uma posição por período de inicios (ver intervalo()).
+
+    {'periodo', 'inicios', 'total', 'por_servico': {nome: [...]}, 'por_status': {status: [...]}};
+    serviços e status sem nenhum pedido no intervalo ficam de fora.
+    """
+    por_servico = _series(periodo, inicios, ContagemPeriodo.servico_id)
+    por_status = _series(periodo, inicios, ContagemPeriodo.status)
+
+    def nome(servico_id):
+        servico = catalogo.obter(servico_id)
+        return servico.nome if servico else f'Serviço {servico_id}'
+
+    return {
+        'periodo': periodo,
+        'inicios': [inicio.isoformat() for inicio in inicios],
+        'total': [sum(quantidades) for quantidades in zip(*por_status.values())] or [0] * len(inicios),
+        'por_servico': {nome(servico_id): quantidades for servico_id, quantidades in por_servico.items()},
+        'por_status': por_status,
+    }
+
+
+# -------------------------------
+# Reconstrução
+# -------------------------------
+def contar_pedidos():
+    """{(periodo, inicio, servico_id, status): quantidade} calculado a partir de pedidos.
+
+    O agrupamento por hora UTC fica no SQLite (o fuso de Brasília muda em
+    horas cheias, então a hora decide o dia local); só as horas vêm para cá.
+    """
+    hora = db.func.strftime('%Y-%m-%d %H', Pedido.data)
+    contagem = Counter()
+    dias = {}
+    for texto, servico_id, status, quantidade in db.session.query(
+            hora, Pedido.servico_id, Pedido.status, db.func.count()
+    ).group_by(hora, Pedido.servico_id, Pedido.status):
+        if texto not in dias:
+            dias[texto] = dia_local(datetime.strptime(texto, '%Y-%m-%d %H'))
+        for periodo in PERIODOS:
+            contagem[periodo, inicio_periodo(periodo, dias[texto]), servico_id, status] += quantidade
+    return contagem
+
+
+# Carga em massa: contagem por hora UTC numa passada pelos pedidos e, de cada
+# hora, o início do dia, da semana e do mês locais (tabela temporária horas)
+PREENCHER = """
+    INSERT INTO contagem_periodos (periodo, inicio, servico_id, status, quantidade)
+    SELECT ?, h.{periodo}, c.servico_id, c.status, sum(c.quantidade)
+    FROM contagem_horas c JOIN horas h ON h.hora = c.hora
+    GROUP BY h.{periodo}, c.servico_id, c.status
+"""
+
+
+def preencher():
+    """Refaz contagem_periodos a partir de pedidos, tudo no SQLite, sem commit.
+
+    Para a carga em massa (dados_sinteticos): uma passada pelos pedidos
+    agrupando por hora UTC e um INSERT ... SELECT ... GROUP BY por período. Só
+    as horas entre o primeiro e o último pedido passam pelo Python, para
+    achar o dia local de cada uma.
+    """
+    conexao = db.session.connection()
+    conexao.exec_driver_sql('DELETE FROM contagem_periodos')
+    primeira, ultima = db.session.query(db.func.min(Pedido.data), db.func.max(Pedido.data)).one()
+    if primeira is None:
+        return
+    conexao.exec_driver_sql('CREATE TEMP TABLE horas (hora TEXT PRIMARY KEY, dia, semana, mes) WITHOUT ROWID')
+    hora, horas = primeira.replace(minute=0, second=0, microsecond=0), []
+    while hora <= ultima:
+        dia = dia_local(hora)
+        horas.append((hora.strftime('%Y-%m-%d %H'),
+                      *(inicio_periodo(periodo, dia).isoformat() for periodo in PERIODOS)))
+        hora += timedelta(hours=1)
+    conexao.exec_driver_sql('INSERT INTO horas VALUES (?, ?, ?, ?)', horas)
+    conexao.exec_driver_sql(
+        "CREATE TEMP TABLE contagem_horas AS "
+        "SELECT strftime('%Y-%m-%d %H', data) AS hora, servico_id, status, count(*) AS quantidade "
+        "FROM pedidos GROUP BY 1, 2, 3")
+    for periodo in PERIODOS:
+        conexao.exec_driver_sql(PREENCHER.format(periodo=periodo), (periodo,))
+    conexao.exec_driver_sql('DROP TABLE contagem_horas')
+    conexao.exec_driver_sql('DROP TABLE horas')
+
+
+def recalcular():
+    """Refaz contagem_periodos a partir de pedidos e grava (com commit).
+
+    Devolve quantas linhas gravadas divergiam da contagem real.
+    """
+    reais = contar_pedidos()
+    gravados = {
+        (c.periodo, c.inicio, c.servico_id, c.status): c.quantidade
+        for c in ContagemPeriodo.query.filter(ContagemPeriodo.quantidade != 0)
+    }
+    divergencias = sum(1 for chave in set(reais) | set(gravados)
+                       if reais.get(chave, 0) != gravados.get(chave, 0))
+
+    ContagemPeriodo.query.delete()
+    if reais:
+        db.session.execute(insert(ContagemPeriodo), [
+            {'periodo': periodo, 'inicio': inicio, 'servico_id': servico_id,
+             'status': status, 'quantidade': quantidade}
+            for (periodo, inicio, servico_id, status), quantidade in reais.items()
+        ])
+    db.session.commit()
+    return divergencias
@@ -0,0 +1,172 @@
+# quantis.py
+# Resumo de distribuição para percentis aproximados (t-digest, na variante
+# "merging" de Dunning): os valores viram centroides (média, peso), pequenos
+# perto das pontas e grandes no meio, de modo que p50/p90/p99 saem com erro
+# pequeno guardando só algumas dezenas de centroides, qualquer que seja a
+# quantidade de valores. Dois resumos se somam (mesclar) sem perder precisão
+# além da do próprio resumo — é o que permite guardar um por mês e juntar
+# vários meses na consulta.
+#
+# Sem dependências além da biblioteca padrão. O resumo gravado (para_bytes)
+# é um array de float64: mínimo, máximo e os pares (média, peso).
+import math
+from array import array
+
+# Quanto maior, mais centroides (no máximo ~COMPRESSAO) e menor o erro
+COMPRESSAO = 100
+# Valores novos ficam soltos até juntar este múltiplo de COMPRESSAO centroides
+FOLGA = 4
+
+
+def _k(q, compressao):
+    return compressao / (2 * math.pi) * math.asin(2 * q - 1)
+
+
+def _q(k, compressao):
+    return (math.sin(min(k * 2 * math.pi / compressao, math.pi / 2)) + 1) / 2
+
+
+class TDigest:
+    def __init__(self, compressao=COMPRESSAO):
+        self.compressao = compressao
+        self._centroides = []  # (média, peso), em ordem de média depois de comprimir
+        self._comprimido = True
+        self.total = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    # -------------------------------
+    # Montagem
+    # -------------------------------
+    def adicionar(self, valor, peso=1):
+        self._centroides.append((valor, peso))
+        self._comprimido = False
+        self.total += peso
+        self.minimo = min(self.minimo, valor)
+        self.maximo = max(self.maximo, valor)
+        if len(self._centroides) > FOLGA * self.compressao:
+            self.comprimir()
+
+    @classmethod
+    def de_valores(cls, valores, compressao=COMPRESSAO):
+        """Resumo de uma lista de valores, com uma só ordenação (reconstrução)."""
+        resumo = cls(compressao)
+        if valores:
+            resumo._centroides = [(valor, 1) for valor in valores]
+            resumo.total = len(valores)
+            resumo.minimo, resumo.maximo = min(valores), max(valores)
+            resumo._comprimido = False
+            resumo.comprimir()
+        return resumo
+
+    def mesclar(self, outro):
+        """Soma outro resumo a este (o outro não muda)."""
+        if not outro.total:
+            return self
+        self._centroides.extend(outro._centroides)
+        self._comprimido = False
+        self.total += outro.total
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self.comprimir()
+        return self
+
+    def comprimir(self):
+        """Junta centroides vizinhos enquanto cabem no limite de peso do seu quantil."""
+        if self._comprimido:
+            return
+        centroides = sorted(self._centroides)
+        total = self.total
+        resultado = []
+        media, peso = centroides[0]
+        anterior = 0  # peso dos centroides já fechados
+        limite = total * _q(_k(0, self.compressao) + 1, self.compressao)
+        for m, w in centroides[1:]:
+            if anterior + peso + w <= limite:
+                peso += w
+                media += (m - media) * w / peso
+            else:
+                resultado.append((media, peso))
+                anterior += peso
+                limite = total * _q(_k(anterior / total, self.compressao) + 1, self.compressao)
+                media, peso = m, w
+        resultado.append((media, peso))
+        self._centroides = resultado
+        self._comprimido = True
+
+    # -------------------------------
+    # Consulta
+    # -------------------------------
+    def quantil(self, q):
+        """Valor aproximado no quantil q (0 a 1); None se o resumo estiver vazio.
+
+        Interpola entre os centros dos centroides; nas pontas, entre o
+        mínimo/máximo exatos e o primeiro/último centroide. Centroides de
+        peso 1 são valores exatos.
+        """
+        if not self.total:
+            return None
+        self.comprimir()
+        c = self._centroides
+        n = self.total
+        if len(c) == 1:
+            return c[0][0]
+        indice = q * n
+        if indice < 1:
+            return self.minimo
+        if indice > n - 1:
+            return self.maximo
+
+        m0, w0 = c[0]
+        if w0 > 2 and indice < w0 / 2:
+            return self.minimo + (indice - 1) / (w0 / 2 - 1) * (m0 - self.minimo)
+        mn, wn = c[-1]
+        if wn > 2 and n - indice <= wn / 2:
+            return self.maximo - (n - indice - 1) / (wn / 2 - 1) * (self.maximo - mn)
+
+        acumulado = w0 / 2
+        for (m1, w1), (m2, w2) in zip(c, c[1:]):
+            passo = (w1 + w2) / 2
+            if acumulado + passo > indice:
+                esquerda = direita = 0
+                if w1 == 1:
+                    if indice - acumulado < 0.5:
+                        return m1
+                    esquerda = 0.5
+                if w2 == 1:
+                    if acumulado + passo - indice <= 0.5:
+                        return m2
+                    direita = 0.5
+                z1 = indice - acumulado - esquerda
+                z2 = acumulado + passo - indice - direita
+                return (m1 * z2 + m2 * z1) / (z1 + z2)
+            acumulado += passo
+        return mn
+
+    def media(self):
+        """Média exata dos valores (a soma não se perde ao juntar centroides)."""
+        if not self.total:
+            return None
+        return sum(m * w for m, w in self._centroides) / self.total
+
+    # -------------------------------
+    # Gravação
+    # -------------------------------
+    def para_bytes(self):
+        self.comprimir()
+        valores = array('d', [self.minimo, self.maximo])
+        for media, peso in self._centroides:
+            valores.append(media)
+            valores.append(peso)
+        return valores.tobytes()
+
+    @classmethod
+    def de_bytes(cls, dados, compressao=COMPRESSAO):
+        resumo = cls(compressao)
+        valores = array('d')
+        valores.frombytes(dados)
+        if len(valores) > 2:
+            resumo.minimo, resumo.maximo = valores[0], valores[1]
+            resumo._centroides = [(valores[i], int(valores[i + 1])) for i in range(2, len(valores), 2)]
+            resumo.total = sum(peso for _, peso in resumo._centroides)
+        return resumo
@@ -0,0 +1,228 @@
+# relatorios.py
+# Relatórios do síndico calculados com NumPy. Em vez de percorrer os pedidos
+# no ORM (um objeto por linha e um laço Python por relatório), as colunas que
+# os relatórios usam — dia, serviço, status e apartamento do morador — são
+# carregadas uma vez em arrays de inteiros. Cada relatório vira uma contagem
+# vetorizada (np.bincount) sobre esses códigos:
+#
+#   mapa_blocos_servicos   pedidos por bloco x serviço (mapa de calor)
+#   crescimento_mensal     pedidos por mês e variação sobre o mês anterior
+#   ranking_apartamentos   apartamentos com mais pedidos (e quantos em aberto)
+#
+# A carga usa o cursor do driver direto, em lotes. A data já vem do SQLite como
+# segundos UTC, convertidos para o dia em Brasília com o deslocamento de cada
+# hora do intervalo. O apartamento não vem de um JOIN: uma tabela pequena
+# usuario -> apartamento é aplicada por índice no array de usuários.
+#
+# Usado por "flask relatorio" e benchmark_relatorios.py. O app web não importa
+# este módulo, então só eles precisam do NumPy.
+import gc
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from models import db
+from consultas import utc, brasil
+from atendimento import desfecho
+
+# Pedidos lidos do SQLite por vez
+LOTE = 100_000
+
+
+def _dias_locais(segundos):
+    """Segundos UTC -> dias (datetime64[D]) no horário de Brasília."""
+    if not len(segundos):
+        return segundos.astype('datetime64[D]')
+    horas = segundos // 3600
+    primeira = int(horas.min())
+    deslocamentos = np.array([
+        datetime.fromtimestamp(hora * 3600, utc).astimezone(brasil).utcoffset().total_seconds()
+        for hora in range(primeira, int(horas.max()) + 1)
+    ], dtype=np.int64)
+    return ((segundos + deslocamentos[horas - primeira]) // 86400).astype('datetime64[D]')
+
+
+class Colunas:
+    """Os pedidos em colunas, uma posição por pedido, mais as tabelas que dão nome aos códigos.
+
+    dia            datetime64[D], no horário de Brasília
+    servico        índice em servicos [(id, nome)]; -1 se o serviço não existe mais
+    status         índice em lista_status
+    apartamento    índice em apartamentos [(bloco, numero)]; -1 se o usuário não
+                   tem apartamento (ex.: o síndico)
+    bloco          índice em blocos, por apartamento
+    """
+
+    def __init__(self, dia, servico, status, apartamento, servicos, lista_status, apartamentos, blocos, bloco):
+        self.dia = dia
+        self.servico = servico
+        self.status = status
+        self.apartamento = apartamento
+        self.servicos = servicos
+        self.lista_status = lista_status
+        self.apartamentos = apartamentos
+        self.blocos = blocos
+        self.bloco = bloco
+
+    def __len__(self):
+        return len(self.dia)
+
+    def filtrar(self, inicio=None, fim=None):
+        """Só os pedidos com inicio <= dia <= fim (datas locais; None = sem limite)."""
+        mascara = np.ones(len(self), dtype=bool)
+        if inicio is not None:
+            mascara &= self.dia >= np.datetime64(inicio, 'D')
+        if fim is not None:
+            mascara &= self.dia <= np.datetime64(fim, 'D')
+        return Colunas(self.dia[mascara], self.servico[mascara], self.status[mascara],
+                       self.apartamento[mascara], self.servicos, self.lista_status,
+                       self.apartamentos, self.blocos, self.bloco)
+
+
+def carregar():
+    """Lê todos os pedidos do banco do app em Colunas."""
+    conexao = db.session.connection()
+    servicos = [tuple(linha) for linha in conexao.exec_driver_sql('SELECT id, nome FROM servicos ORDER BY nome')]
+    apartamentos = [tuple(linha) for linha in conexao.exec_driver_sql(
+        "SELECT id, coalesce(bloco, ''), numero FROM apartamentos ORDER BY 2, 3, 1")]
+    blocos = sorted({bloco for _, bloco, _ in apartamentos})
+
+    indice_apartamento = {id: i for i, (id, _, _) in enumerate(apartamentos)}
+    moradores = list(conexao.exec_driver_sql('SELECT usuario_id, apartamento_id FROM moradores'))
+    posicao_bloco = {bloco: i for i, bloco in enumerate(blocos)}
+    bloco = np.array([posicao_bloco[b] for _, b, _ in apartamentos], dtype=np.int32)
+
+    total = conexao.exec_driver_sql('SELECT count(*) FROM pedidos').scalar()
+    segundos = np.empty(total, dtype=np.int64)
+    servico_ids = np.empty(total, dtype=np.int64)
+    usuario_ids = np.empty(total, dtype=np.int64)
+    status = np.empty(total, dtype=np.int16)
+    codigos = {}
+
+    # Cursor do sqlite3, sem o Row do SQLAlchemy: as tuplas vão direto para os
+    # arrays. O coletor de ciclos fica parado durante a leitura: as tuplas não
+    # formam ciclos, e varrê-las a cada lote custava mais de 1 s por milhão.
+    cursor = conexao.connection.cursor()
+    coletor_ligado = gc.isenabled()
+    gc.disable()
+    try:
+        cursor.execute("SELECT CAST(strftime('%s', data) AS INTEGER), servico_id, status, usuario_id FROM pedidos")
+        lidos = 0
+        while lidos < total:
+            lote = cursor.fetchmany(LOTE)
+            if not lote:
+                break
+            fim = lidos + len(lote)
+            colunas = list(zip(*lote))
+            segundos[lidos:fim] = colunas[0]
+            servico_ids[lidos:fim] = colunas[1]
+            usuario_ids[lidos:fim] = colunas[3]
+            for valor in set(colunas[2]):
+                codigos.setdefault(valor, len(codigos))
+            status[lidos:fim] = [codigos[valor] for valor in colunas[2]]
+            lidos = fim
+    finally:
+        cursor.close()
+        if coletor_ligado:
+            gc.enable()
+
+    servico_ids, usuario_ids = servico_ids[:lidos], usuario_ids[:lidos]
+
+    # Tabelas de tradução id -> índice, aplicadas por indexação nos arrays. O
+    # tamanho cobre também os ids dos pedidos: um serviço ou usuário apagado (o
+    # SQLite não confere a chave estrangeira) vira -1, e não IndexError
+    maior = max((id for id, _ in servicos), default=0)
+    indice_servico = np.full(max(maior, int(servico_ids.max(initial=0))) + 1, -1, dtype=np.int32)
+    indice_servico[[id for id, _ in servicos]] = np.arange(len(servicos))
+    maior = max((usuario_id for usuario_id, _ in moradores), default=0)
+    apartamento_do_usuario = np.full(max(maior, int(usuario_ids.max(initial=0))) + 1, -1, dtype=np.int32)
+    for usuario_id, apartamento_id in moradores:
+        apartamento_do_usuario[usuario_id] = indice_apartamento.get(apartamento_id, -1)
+
+    return Colunas(
+        dia=_dias_locais(segundos[:lidos]),
+        servico=indice_servico[servico_ids],
+        status=status[:lidos],
+        apartamento=apartamento_do_usuario[usuario_ids],
+        servicos=servicos,
+        lista_status=sorted(codigos, key=codigos.get),
+        apartamentos=[(b, numero) for _, b, numero in apartamentos],
+        blocos=blocos,
+        bloco=bloco,
+    )
+
+
+# -------------------------------
+# Relatórios
+# -------------------------------
+class MapaCalor(namedtuple('MapaCalor', ['blocos', 'servicos', 'quantidades'])):
+    """quantidades[i, j]: pedidos de moradores do bloco i para o serviço j."""
+
+    def tabela(self):
+        yield ['bloco', *self.servicos]
+        for bloco, linha in zip(self.blocos, self.quantidades.tolist()):
+            yield [bloco or 'sem bloco', *linha]
+
+
+class Crescimento(namedtuple('Crescimento', ['meses', 'quantidades', 'variacao'])):
+    """quantidades[k]: pedidos no mês meses[k]; variacao[k]: em relação ao mês anterior
+    (NaN no primeiro mês e depois de um mês sem pedidos)."""
+
+    def tabela(self):
+        yield ['mes', 'pedidos', 'variacao_%']
+        for mes, quantidade, variacao in zip(self.meses, self.quantidades.tolist(), self.variacao.tolist()):
+            yield [str(mes), quantidade, '' if np.isnan(variacao) else round(variacao * 100, 1)]
+
+
+class Ranking(namedtuple('Ranking', ['apartamentos', 'total', 'abertos'])):
+    """Os apartamentos com mais pedidos, em ordem; abertos = ainda sem desfecho."""
+
+    def tabela(self):
+        yield ['bloco', 'numero', 'pedidos', 'em_aberto']
+        for (bloco, numero), total, abertos in zip(self.apartamentos, self.total.tolist(), self.abertos.tolist()):
+            yield [bloco, numero, total, abertos]
+
+
+def mapa_blocos_servicos(colunas):
+    """Pedidos por bloco x serviço (só os de moradores com apartamento e de serviços existentes)."""
+    com_apartamento = (colunas.apartamento >= 0) & (colunas.servico >= 0)
+    blocos = colunas.bloco[colunas.apartamento[com_apartamento]]
+    servicos = colunas.servico[com_apartamento]
+    linhas, colunas_mapa = len(colunas.blocos), len(colunas.servicos)
+    quantidades = np.bincount(blocos * colunas_mapa + servicos, minlength=linhas * colunas_mapa)
+    return MapaCalor(colunas.blocos, [nome for _, nome in colunas.servicos],
+                     quantidades.reshape(linhas, colunas_mapa))
+
+
+def crescimento_mensal(colunas):
+    """Pedidos por mês (horário de Brasília), do primeiro ao último mês com pedidos."""
+    if not len(colunas):
+        return Crescimento(np.array([], dtype='datetime64[M]'), np.array([], dtype=np.int64), np.array([]))
+    meses = colunas.dia.astype('datetime64[M]')
+    primeiro = meses.min()
+    indices = (meses - primeiro).astype(np.int64)
+    quantidades = np.bincount(indices)
+    variacao = np.full(len(quantidades), np.nan)
+    anterior = quantidades[:-1]
+    np.divide(quantidades[1:] - anterior, anterior, out=variacao[1:], where=anterior > 0)
+    return Crescimento(primeiro + np.arange(len(quantidades)), quantidades, variacao)
+
+
+def ranking_apartamentos(colunas, limite=20):
+    """Os limite apartamentos com mais pedidos; empate fica na ordem de bloco e número."""
+    com_apartamento = colunas.apartamento >= 0
+    apartamentos = colunas.apartamento[com_apartamento]
+    total = np.bincount(apartamentos, minlength=len(colunas.apartamentos))
+    aberto = np.array([desfecho(status) is None for status in colunas.lista_status], dtype=bool)
+    abertos = np.bincount(apartamentos[aberto[colunas.status[com_apartamento]]],
+                          minlength=len(colunas.apartamentos))
+    ordem = np.argsort(-total, kind='stable')[:limite]
+    return Ranking([colunas.apartamentos[i] for i in ordem.tolist()], total[ordem], abertos[ordem])
+
+
+RELATORIOS = {
+    'mapa': mapa_blocos_servicos,
+    'crescimento': crescimento_mensal,
+    'ranking': ranking_apartamentos,
+}
@@ -0,0 +1,95 @@
+# senhas.py
+# Hash de senhas com bcrypt fora da thread da requisição.
+#
+# - O hash roda em um pool de threads limitado (o bcrypt libera o GIL), então
+#   uma rajada de logins ocupa no máximo SENHAS_THREADS núcleos por worker.
+# - A fila também é limitada: se não houver vaga em SENHAS_ESPERA segundos,
+#   levanta SobrecargaSenhas e a rota responde 503 na hora, em vez de empilhar
+#   requisições até travar o worker.
+# - O custo vem de BCRYPT_LOG_ROUNDS. No gunicorn, o processo mestre mede um
+#   hash uma única vez ao subir (gunicorn.conf.py) e passa o custo aos workers
+#   pelo ambiente: todos usam o mesmo e o precisa_rehash não alterna hashes
+#   entre custos. Fora dele (flask run, comandos, scripts) vale CUSTO_PADRAO,
+#   sem medir nada; "flask calibrar-senhas" mostra o custo medido na máquina.
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt as _bcrypt
+
+CUSTO_MINIMO = 10
+CUSTO_MAXIMO = 16
+CUSTO_PADRAO = 12
+
+_bcrypt_ext = None
+_custo = None
+_executor = None
+_vagas = None
+_espera = None
+
+
+class SobrecargaSenhas(Exception):
+    """Fila de hash cheia: a requisição deve ser recusada e tentada de novo."""
+
+
+def calibrar(alvo_ms):
+    """Maior custo (log rounds) cujo hash leva até alvo_ms nesta máquina.
+
+    Mede um hash no custo mínimo e extrapola: cada round a mais dobra o tempo.
+    """
+    inicio = time.perf_counter()
+    _bcrypt.hashpw(b'calibracao', _bcrypt.gensalt(CUSTO_MINIMO))
+    ms = (time.perf_counter() - inicio) * 1000
+    extra = math.floor(math.log2(alvo_ms / ms)) if ms < alvo_ms else 0
+    return max(CUSTO_MINIMO, min(CUSTO_MAXIMO, CUSTO_MINIMO + extra))
+
+
+def init_app(app, bcrypt):
+    """Define o custo (configurado ou CUSTO_PADRAO) e cria o pool de hash."""
+    global _bcrypt_ext, _custo, _executor, _vagas, _espera
+
+    if not app.config.get('BCRYPT_LOG_ROUNDS'):
+        app.config['BCRYPT_LOG_ROUNDS'] = CUSTO_PADRAO
+    bcrypt.init_app(app)  # relê BCRYPT_LOG_ROUNDS
+    _bcrypt_ext = bcrypt
+    _custo = app.config['BCRYPT_LOG_ROUNDS']
+
+    threads = app.config.get('SENHAS_THREADS') or os.cpu_count() or 1
+    fila = app.config.get('SENHAS_FILA', threads * 2)
+    _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='senhas')
+    _vagas = threading.BoundedSemaphore(threads + fila)
+    _espera = app.config.get('SENHAS_ESPERA', 2.0)
+
+
+def _executar(func, *args):
+    if not _vagas.acquire(timeout=_espera):
+        raise SobrecargaSenhas()
+    try:
+        return _executor.submit(func, *args).result()
+    finally:
+        _vagas.release()
+
+
+def gerar_hash(senha):
+    """Hash da senha no custo atual, como string."""
+    return _executar(_bcrypt_ext.generate_password_hash, senha).decode('utf-8')
+
+
+def conferir(senha_hash, senha):
+    """True se a senha confere com o hash gravado."""
+    return _executar(_bcrypt_ext.check_password_hash, senha_hash, senha)
+
+
+def custo(senha_hash):
+    """Custo (log rounds) de um hash '$2b$12$...'."""
+    try:
+        return int(senha_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def precisa_rehash(senha_hash):
+    """True se o hash foi gerado com custo menor que o atual."""
+    return custo(senha_hash) < _custo
@@ -0,0 +1,99 @@
+// estatisticas.js
+// Gráficos do /estatisticas: pedidos por período, empilhados por serviço, e
+// a evolução de cada status. Os dados vêm de /api/estatisticas/pedidos, que
+// lê só a contagem por período (sem passar pelos pedidos); trocar o período
+// ou o intervalo busca de novo e redesenha os gráficos. A tabela de tempo de
+// atendimento (p50/p90 por serviço) vem de /api/estatisticas/atendimento.
+(function () {
+  var form = document.getElementById('filtro-estatisticas');
+  if (!form || !window.Chart) return;
+
+  var erro = document.getElementById('erro-estatisticas');
+  var CORES = [
+    'rgba(54, 162, 235, 0.7)', 'rgba(255, 99, 132, 0.7)', 'rgba(255, 206, 86, 0.7)',
+    'rgba(75, 192, 192, 0.7)', 'rgba(153, 102, 255, 0.7)', 'rgba(255, 159, 64, 0.7)',
+    'rgba(201, 203, 207, 0.7)', 'rgba(40, 167, 69, 0.7)'
+  ];
+  var graficos = {};
+
+  function rotulo(inicio, periodo) {
+    var partes = inicio.split('-');
+    if (periodo === 'mes') return partes[1] + '/' + partes[0];
+    return partes[2] + '/' + partes[1] + (periodo === 'semana' ? ' (sem.)' : '');
+  }
+
+  function conjuntos(series) {
+    return Object.keys(series).map(function (nome, i) {
+      var cor = CORES[i % CORES.length];
+      return { label: nome, data: series[nome], backgroundColor: cor, borderColor: cor, fill: false };
+    });
+  }
+
+  function desenhar(id, tipo, titulo, rotulos, series, empilhado) {
+    if (graficos[id]) graficos[id].destroy();
+    graficos[id] = new Chart(document.getElementById(id).getContext('2d'), {
+      type: tipo,
+      data: { labels: rotulos, datasets: conjuntos(series) },
+      options: {
+        plugins: { title: { display: true, text: titulo } },
+        scales: { x: { stacked: empilhado }, y: { stacked: empilhado, beginAtZero: true } }
+      }
+    });
+  }
+
+  function buscar(url) {
+    var parametros = new URLSearchParams(new FormData(form));
+    return fetch(url + '?' + parametros.toString(), {
+      credentials: 'same-origin',
+      headers: { 'Accept': 'application/json' }
+    }).then(function (resposta) {
+      return resposta.json().then(function (dados) {
+        if (!resposta.ok) throw new Error(dados.erro || 'Falha ao carregar as estatísticas.');
+        return dados;
+      });
+    });
+  }
+
+  function linhaAtendimento(nome, valores, negrito) {
+    var linha = document.createElement('tr');
+    if (negrito) linha.className = 'fw-bold';
+    [nome, valores.quantidade, valores.p50, valores.p90].forEach(function (valor, i) {
+      var celula = document.createElement('td');
+      if (i) celula.className = 'text-end';
+      celula.textContent = valor === null ? '—' : valor;
+      linha.appendChild(celula);
+    });
+    return linha;
+  }
+
+  function mostrarAtendimento(dados) {
+    var corpo = document.querySelector('#tabela-atendimento tbody');
+    corpo.innerHTML = '';
+    dados.servicos.forEach(function (servico) {
+      corpo.appendChild(linhaAtendimento(servico.servico, servico));
+    });
+    corpo.appendChild(linhaAtendimento('Todos', dados.geral, true));
+  }
+
+  function carregar() {
+    Promise.all([buscar(form.dataset.url), buscar(form.dataset.urlAtendimento)]).then(function (respostas) {
+      var dados = respostas[0];
+      erro.hidden = true;
+      var rotulos = dados.inicios.map(function (inicio) { return rotulo(inicio, dados.periodo); });
+      desenhar('graficoServicos', 'bar', 'Solicitações por serviço', rotulos, dados.por_servico, true);
+      desenhar('graficoStatus', 'line', 'Solicitações por status atual', rotulos, dados.por_status, false);
+      mostrarAtendimento(respostas[1]);
+    }).catch(function (e) {
+      erro.textContent = e.message;
+      erro.hidden = false;
+    });
+  }
+
+  form.addEventListener('submit', function (e) {
+    e.preventDefault();
+    carregar();
+  });
+  document.getElementById('periodo').addEventListener('change', carregar);
+  document.getElementById('desfecho').addEventListener('change', carregar);
+  carregar();
+})();
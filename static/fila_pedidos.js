@@ -0,0 +1,45 @@
+// fila_pedidos.js
+// Fila (IndexedDB) dos pedidos feitos sem conexão. Usada pelo service worker,
+// que guarda o envio que falhou e o reenvia depois para /api/pedidos, e pelas
+// páginas, que mostram quantos pedidos ainda esperam conexão.
+//
+// Cada pedido tem a chave gerada no navegador (crypto.randomUUID): o servidor
+// devolve o mesmo pedido se a chave se repetir, então reenviar nunca duplica.
+var FilaPedidos = (function () {
+  var BANCO = 'estacao-do-sol';
+  var LOJA = 'pedidos_pendentes';
+
+  function abrir() {
+    return new Promise(function (resolver, rejeitar) {
+      var pedido = indexedDB.open(BANCO, 1);
+      pedido.onupgradeneeded = function () {
+        pedido.result.createObjectStore(LOJA, { keyPath: 'chave' });
+      };
+      pedido.onsuccess = function () { resolver(pedido.result); };
+      pedido.onerror = function () { rejeitar(pedido.error); };
+    });
+  }
+
+  function transacao(modo, operacao) {
+    return abrir().then(function (banco) {
+      return new Promise(function (resolver, rejeitar) {
+        var tx = banco.transaction(LOJA, modo);
+        var resultado = operacao(tx.objectStore(LOJA));
+        tx.oncomplete = function () { resolver(resultado && resultado.result); };
+        tx.onerror = function () { rejeitar(tx.error); };
+      });
+    });
+  }
+
+  return {
+    guardar: function (pedido) {
+      return transacao('readwrite', function (loja) { return loja.put(pedido); });
+    },
+    listar: function () {
+      return transacao('readonly', function (loja) { return loja.getAll(); });
+    },
+    remover: function (chave) {
+      return transacao('readwrite', function (loja) { return loja.delete(chave); });
+    }
+  };
+})();
@@ -0,0 +1,86 @@
+// historico_lote.js
+// Alteração em lote no /historico: o síndico marca vários pedidos, escolhe o
+// status (e uma observação, se quiser) e envia tudo num só POST para
+// /api/pedidos/status. A resposta (ids atualizados) é aplicada nos cartões
+// da página, sem recarregar.
+(function () {
+  var barra = document.getElementById('lote');
+  var lista = document.querySelector('[data-lista-pedidos]');
+  if (!barra || !lista) return;
+
+  var todos = document.getElementById('lote-todos');
+  var botao = document.getElementById('lote-aplicar');
+  var quantidade = document.getElementById('lote-quantidade');
+  var resultado = document.getElementById('lote-resultado');
+
+  function marcados() {
+    return Array.prototype.slice.call(lista.querySelectorAll('[data-selecionar]:checked'));
+  }
+
+  function atualizarBarra() {
+    var n = marcados().length;
+    quantidade.textContent = n;
+    botao.disabled = n === 0;
+  }
+
+  function mostrar(texto, classe) {
+    resultado.className = 'alert py-2 ' + classe;
+    resultado.textContent = texto;
+    resultado.hidden = false;
+  }
+
+  function aplicarNoCartao(cartao, status, observacao) {
+    var select = cartao.querySelector('select[name="status"]');
+    if (select) select.value = status;
+    if (observacao) {
+      var paragrafo = cartao.querySelector('[data-observacao]');
+      paragrafo.querySelector('[data-observacao-texto]').textContent = observacao;
+      paragrafo.hidden = false;
+    }
+    cartao.querySelector('[data-selecionar]').checked = false;
+  }
+
+  lista.addEventListener('change', function (e) {
+    if (e.target.matches('[data-selecionar]')) atualizarBarra();
+  });
+
+  todos.addEventListener('change', function () {
+    lista.querySelectorAll('[data-selecionar]').forEach(function (caixa) {
+      caixa.checked = todos.checked;
+    });
+    atualizarBarra();
+  });
+
+  botao.addEventListener('click', function () {
+    var ids = marcados().map(function (caixa) { return parseInt(caixa.value, 10); });
+    if (!ids.length) return;
+    botao.disabled = true;
+
+    fetch(barra.dataset.url, {
+      method: 'POST',
+      credentials: 'same-origin',
+      headers: { 'Content-Type': 'application/json', 'Accept': 'application/json' },
+      body: JSON.stringify({
+        ids: ids,
+        status: document.getElementById('lote-status').value,
+        observacao: document.getElementById('lote-observacao').value
+      })
+    }).then(function (resposta) {
+      return resposta.json().then(function (dados) {
+        if (!resposta.ok) throw new Error(dados.erro || 'Falha ao alterar os pedidos.');
+        return dados;
+      });
+    }).then(function (dados) {
+      dados.atualizados.forEach(function (id) {
+        var cartao = lista.querySelector('[data-pedido-id="' + id + '"]');
+        if (cartao) aplicarNoCartao(cartao, dados.status, dados.observacao);
+      });
+      var texto = dados.atualizados.length + ' pedido(s) alterado(s) para "' + dados.status + '".';
+      if (dados.nao_encontrados.length) texto += ' Não encontrados: ' + dados.nao_encontrados.join(', ') + '.';
+      mostrar(texto, dados.nao_encontrados.length ? 'alert-warning' : 'alert-success');
+      todos.checked = false;
+    }).catch(function (erro) {
+      mostrar(erro.message, 'alert-danger');
+    }).then(atualizarBarra);
+  });
+})();
@@ -0,0 +1,53 @@
+// pwa.js
+// Lado da página do app instalado: registra o service worker, gera a chave
+// de cada novo pedido e mostra quantos pedidos feitos sem conexão ainda
+// esperam envio (a fila fica no service-worker.js / fila_pedidos.js).
+(function () {
+  if (!('serviceWorker' in navigator)) return;
+
+  function novaChave() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    var bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.prototype.map.call(bytes, function (b) { return ('0' + b.toString(16)).slice(-2); }).join('');
+  }
+
+  // Uma chave por formulário aberto: a página pode ter vindo do cache
+  document.querySelectorAll('input[name="chave"]').forEach(function (campo) {
+    campo.value = novaChave();
+  });
+
+  function mostrarPendentes(quantidade) {
+    var aviso = document.getElementById('aviso-pendentes');
+    if (!aviso) return;
+    aviso.hidden = !quantidade;
+    aviso.textContent = quantidade === 1
+      ? '1 pedido aguardando conexão; ele será enviado automaticamente.'
+      : quantidade + ' pedidos aguardando conexão; eles serão enviados automaticamente.';
+  }
+
+  function pedirEnvio() {
+    if (navigator.serviceWorker.controller) {
+      navigator.serviceWorker.controller.postMessage({ tipo: 'enviar-pedidos' });
+    }
+  }
+
+  navigator.serviceWorker.register('/service-worker.js');
+
+  navigator.serviceWorker.addEventListener('message', function (e) {
+    if (e.data && e.data.tipo === 'pedidos-pendentes') {
+      var antes = document.getElementById('aviso-pendentes');
+      var havia = antes && !antes.hidden;
+      mostrarPendentes(e.data.pendentes);
+      // Pedidos enviados: a lista do morador mostra os novos
+      if (havia && !e.data.pendentes && location.pathname === '/meus_pedidos') location.reload();
+    }
+  });
+
+  if (window.indexedDB && window.FilaPedidos) {
+    FilaPedidos.listar().then(function (pendentes) {
+      mostrarPendentes(pendentes.length);
+      if (pendentes.length && navigator.onLine) pedirEnvio();
+    });
+  }
+  window.addEventListener('online', pedirEnvio);
+})();
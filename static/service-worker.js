@@ -1,41 +1,182 @@
-const CACHE_NAME = 'condominio-app-v1';
-const urlsToCache = [
-  '/',
+// service-worker.js
+// Servido em /service-worker.js (rota service_worker no app.py) para valer
+// no site inteiro. Estratégias:
+//   - arquivos da base (ícones, scripts, Bootstrap): guardados na instalação,
+//     num cache com a VERSAO no nome — mudou algum deles, suba a VERSAO;
+//   - páginas das listas: primeiro a rede, guardando a cópia; a cópia só é
+//     usada sem conexão, então abrem sem sinal. Na rede, a página vem sempre
+//     atual, com as mensagens (flash) do POST que redirecionou para ela;
+//   - POST /novo_pedido sem conexão: o pedido vai para a fila do IndexedDB
+//     (fila_pedidos.js) e é reenviado para /api/pedidos quando a conexão
+//     volta (Background Sync, ou aviso da página onde ele não existe). A
+//     chave de cada pedido faz o servidor ignorar reenvios repetidos.
+// Páginas guardadas são de quem está logado: login e logout apagam a cópia.
+importScripts('/static/fila_pedidos.js');
+
+const VERSAO = 'v4';
+const CACHE_BASE = `estacao-base-${VERSAO}`;
+const CACHE_PAGINAS = `estacao-paginas-${VERSAO}`;
+
+const ARQUIVOS_BASE = [
+  '/static/manifest.json',
   '/static/icons/logo-condominio-192.png',
   '/static/icons/logo-condominio-512.png',
-  '/static/css/style.css', // se você tiver um CSS
-  '/static/js/main.js',    // se você tiver um JS
+  '/static/fila_pedidos.js',
+  '/static/pwa.js',
+  '/static/tempo_real.js',
+  '/static/historico_lote.js',
+];
+// De outro domínio: se a CDN falhar, a instalação continua sem eles
+const ARQUIVOS_CDN = [
+  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+  'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+];
+const PAGINAS = [
+  '/dashboard_morador', '/meus_pedidos', '/novo_pedido',
+  '/dashboard_sindico', '/pedidos', '/historico',
 ];
+// Aberta sem conexão quando a página pedida não tem cópia
+const PAGINA_RESERVA = '/meus_pedidos';
+const SINCRONIZACAO = 'enviar-pedidos';
 
-// Instala o service worker e faz cache dos arquivos
 self.addEventListener('install', event => {
   event.waitUntil(
-    caches.open(CACHE_NAME).then(cache => {
-      return cache.addAll(urlsToCache);
-    })
+    caches.open(CACHE_BASE).then(cache => Promise.all([
+      cache.addAll(ARQUIVOS_BASE),
+      Promise.allSettled(ARQUIVOS_CDN.map(url => cache.add(url))),
+    ])).then(() => self.skipWaiting())
   );
 });
 
-// Ativa o service worker e limpa caches antigos
+// Apaga os caches de versões anteriores
 self.addEventListener('activate', event => {
   event.waitUntil(
-    caches.keys().then(cacheNames => {
-      return Promise.all(
-        cacheNames.map(name => {
-          if (name !== CACHE_NAME) {
-            return caches.delete(name);
-          }
-        })
-      );
-    })
+    caches.keys()
+      .then(nomes => Promise.all(
+        nomes.filter(nome => nome !== CACHE_BASE && nome !== CACHE_PAGINAS).map(nome => caches.delete(nome))
+      ))
+      .then(() => self.clients.claim())
   );
 });
 
-// Intercepta requisições e serve do cache quando possível
 self.addEventListener('fetch', event => {
-  event.respondWith(
-    caches.match(event.request).then(response => {
-      return response || fetch(event.request);
-    })
-  );
+  const req = event.request;
+  const url = new URL(req.url);
+
+  if (url.origin !== self.location.origin) {
+    if (ARQUIVOS_CDN.includes(req.url)) {
+      event.respondWith(caches.match(req).then(guardada => guardada || fetch(req)));
+    }
+    return;
+  }
+  if ((url.pathname === '/login' && req.method === 'POST') || url.pathname === '/logout') {
+    event.waitUntil(caches.delete(CACHE_PAGINAS));
+    return;
+  }
+  if (url.pathname === '/novo_pedido' && req.method === 'POST') {
+    event.respondWith(enviarOuGuardar(req));
+    return;
+  }
+  if (req.method !== 'GET') {
+    return;
+  }
+  if (url.pathname.startsWith('/static/')) {
+    event.respondWith(caches.match(req).then(guardada => guardada || fetch(req)));
+    return;
+  }
+  if (PAGINAS.includes(url.pathname)) {
+    event.respondWith(redeComCopia(event, req));
+    return;
+  }
+  if (req.mode === 'navigate') {
+    event.respondWith(fetch(req).catch(() => paginaSemConexao(req)));
+  }
+});
+
+function redeComCopia(event, req) {
+  return fetch(req).then(resposta => {
+    // Só guarda a página de verdade (não o redirecionamento para o login)
+    if (resposta.ok && !resposta.redirected) {
+      const copia = resposta.clone();
+      event.waitUntil(caches.open(CACHE_PAGINAS).then(cache => cache.put(req, copia)));
+    }
+    return resposta;
+  }).catch(() => paginaSemConexao(req));
+}
+
+function paginaSemConexao(req) {
+  return caches.open(CACHE_PAGINAS)
+    .then(cache => cache.match(req, { ignoreSearch: true }).then(r => r || cache.match(PAGINA_RESERVA)))
+    .then(guardada => guardada || new Response(
+      '<!DOCTYPE html><meta charset="utf-8"><meta name="viewport" content="width=device-width">' +
+      '<p style="font-family:sans-serif;padding:1em">Sem conexão. Abra o app com internet uma vez ' +
+      'para usá-lo offline.</p>',
+      { status: 503, headers: { 'Content-Type': 'text/html; charset=utf-8' } }
+    ));
+}
+
+// -------------------------------
+// Fila de pedidos feitos sem conexão
+// -------------------------------
+async function enviarOuGuardar(req) {
+  const dados = await req.clone().formData();
+  try {
+    return await fetch(req);
+  } catch (erro) {
+    await FilaPedidos.guardar({
+      chave: dados.get('chave') || self.crypto.randomUUID(),
+      servico_id: dados.get('servico_id'),
+      nome: dados.get('nome'),
+      descricao: dados.get('descricao'),
+      criado_em: Date.now(),
+    });
+    if (self.registration.sync) {
+      await self.registration.sync.register(SINCRONIZACAO).catch(() => null);
+    }
+    await avisarPaginas();
+    return Response.redirect(PAGINA_RESERVA, 303);
+  }
+}
+
+async function enviarPendentes() {
+  const pendentes = await FilaPedidos.listar();
+  let enviados = 0;
+  for (const pedido of pendentes) {
+    // Sem conexão o fetch falha e o sync tenta de novo depois
+    const resposta = await fetch('/api/pedidos', {
+      method: 'POST',
+      credentials: 'same-origin',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(pedido),
+    });
+    // 201: gravado (ou já estava). 400: nunca vai ser aceito. Redirecionado
+    // (sessão expirou) ou 409 (envio igual em andamento): fica para a próxima.
+    if (!resposta.redirected && (resposta.status === 201 || resposta.status === 400)) {
+      await FilaPedidos.remover(pedido.chave);
+      enviados += 1;
+    }
+  }
+  if (enviados) {
+    await caches.open(CACHE_PAGINAS).then(cache => cache.delete(PAGINA_RESERVA, { ignoreSearch: true }));
+  }
+  await avisarPaginas();
+}
+
+async function avisarPaginas() {
+  const pendentes = (await FilaPedidos.listar()).length;
+  const paginas = await self.clients.matchAll({ type: 'window' });
+  paginas.forEach(pagina => pagina.postMessage({ tipo: 'pedidos-pendentes', pendentes }));
+}
+
+self.addEventListener('sync', event => {
+  if (event.tag === SINCRONIZACAO) {
+    event.waitUntil(enviarPendentes());
+  }
+});
+
+// Navegadores sem Background Sync: a página avisa quando a conexão volta
+self.addEventListener('message', event => {
+  if (event.data && event.data.tipo === SINCRONIZACAO) {
+    event.waitUntil(enviarPendentes().catch(() => avisarPaginas()));
+  }
 });
@@ -0,0 +1,100 @@
+// tempo_real.js
+// Recebe os avisos do /eventos (Server-Sent Events) e atualiza a lista de
+// pedidos na própria página, sem recarregar:
+//   - "status": troca o status do cartão do pedido (select ou badge), se ele
+//     estiver na página;
+//   - "novo" (só o síndico recebe): na primeira página sem filtros, insere o
+//     cartão no topo a partir do <template id="modelo-pedido">; nas outras,
+//     mostra um aviso com link para recarregar;
+//   - "recarregar": a página perdeu avisos demais para recuperar um a um
+//     (ex.: alteração em lote): mostra o aviso com link para atualizar.
+// A reconexão é do próprio EventSource, que manda o Last-Event-ID.
+(function () {
+  var lista = document.querySelector('[data-lista-pedidos]');
+  if (!lista || !window.EventSource) return;
+
+  var BADGES = {
+    'pendente': 'bg-warning text-dark',
+    'em andamento': 'bg-primary',
+    'concluído': 'bg-success',
+    'rejeitado': 'bg-danger'
+  };
+  var novosNaoExibidos = 0;
+
+  function cartao(id) {
+    return lista.querySelector('[data-pedido-id="' + id + '"]');
+  }
+
+  function aplicarStatus(elemento, status) {
+    var select = elemento.querySelector('select[name="status"]');
+    if (select) {
+      select.value = status.toLowerCase();
+      return;
+    }
+    var badge = elemento.querySelector('[data-status]');
+    if (badge) {
+      badge.className = 'badge ' + (BADGES[status.toLowerCase()] || 'bg-secondary');
+      badge.textContent = status;
+    }
+  }
+
+  function inserirNovo(pedido) {
+    var modelo = document.getElementById('modelo-pedido');
+    if (!modelo || lista.dataset.inserirNovos === undefined) {
+      avisarNovos();
+      return;
+    }
+    var elemento = modelo.content.firstElementChild.cloneNode(true);
+    elemento.dataset.pedidoId = pedido.id;
+    var marcar = elemento.querySelector('[data-selecionar]');
+    if (marcar) marcar.value = pedido.id;
+    elemento.querySelectorAll('[data-campo]').forEach(function (campo) {
+      campo.textContent = pedido[campo.dataset.campo] || '';
+    });
+    var form = elemento.querySelector('form');
+    if (form) form.action = form.action.replace(/\/0$/, '/' + pedido.id);
+    aplicarStatus(elemento, pedido.status);
+    var vazio = lista.querySelector('[data-lista-vazia]');
+    if (vazio) vazio.remove();
+    lista.prepend(elemento);
+  }
+
+  function avisar(texto, href) {
+    var aviso = document.getElementById('aviso-novos');
+    if (!aviso) {
+      aviso = document.createElement('div');
+      aviso.id = 'aviso-novos';
+      aviso.className = 'alert alert-info py-2';
+      lista.before(aviso);
+    }
+    aviso.innerHTML = '';
+    var link = document.createElement('a');
+    link.href = href;
+    link.textContent = texto;
+    aviso.appendChild(link);
+  }
+
+  function avisarNovos() {
+    novosNaoExibidos += 1;
+    avisar(novosNaoExibidos === 1 ? '1 pedido novo — atualizar' : novosNaoExibidos + ' pedidos novos — atualizar',
+           window.location.pathname);
+  }
+
+  var fonte = new EventSource(lista.dataset.eventos);
+
+  fonte.addEventListener('status', function (e) {
+    var pedido = JSON.parse(e.data);
+    var elemento = cartao(pedido.id);
+    if (elemento) aplicarStatus(elemento, pedido.status);
+  });
+
+  fonte.addEventListener('novo', function (e) {
+    var pedido = JSON.parse(e.data);
+    if (!cartao(pedido.id)) inserirNovo(pedido);
+  });
+
+  fonte.addEventListener('recarregar', function () {
+    // Mesma página e filtros: os status exibidos podem estar desatualizados
+    avisar('Vários pedidos foram alterados — atualizar', window.location.href);
+  });
+})();
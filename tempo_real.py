@@ -0,0 +1,211 @@
+# tempo_real.py
+# Avisos em tempo real por Server-Sent Events (rota /eventos):
+#   - o síndico recebe os pedidos novos e as mudanças de status;
+#   - cada morador recebe as mudanças de status dos próprios pedidos.
+#
+# Como funciona entre vários workers do gunicorn:
+#   1. criar_pedido e mudar_status (escritas.py) gravam um evento em
+#      pedido_eventos (eventos.py) na mesma transação do pedido — o aviso só
+#      existe se a escrita foi feita, venha ela do worker ou do processo escritor;
+#   2. em cada worker, uma thread lê os eventos novos a cada INTERVALO
+#      segundos (uma consulta para todas as conexões do worker) e entrega
+#      cada um às filas das conexões daquele canal;
+#   3. cada conexão /eventos só espera na sua fila, sem tocar no banco.
+#
+# O id do evento no banco é o id do evento SSE: ao reconectar, o navegador
+# manda o Last-Event-ID e recebe o que perdeu, até o último evento que a
+# thread já distribuiu (daí em diante a fila da conexão recebe). Se perdeu
+# mais de LOTE_LEITURA eventos (ex.: alteração em lote), recebe um só
+# "recarregar", com o id do último: a página avisa para atualizar. Conexão
+# lenta demais para esvaziar a fila é encerrada; o navegador reconecta e recupera.
+#
+# Cada conexão aberta ocupa uma thread do worker: rode o gunicorn com
+# "-k gthread --threads N" (ver Procfile). Com o worker sync, cada /eventos
+# prenderia um worker inteiro. Para as abas abertas não tomarem todas as
+# threads, cada worker aceita no máximo EVENTOS_CONEXOES conexões (deixe
+# threads sobrando para as outras rotas); as demais recebem só um "retry"
+# maior e são encerradas, e o navegador tenta de novo depois.
+import json
+import queue
+import threading
+import time
+
+from models import db, PedidoEvento, Pedido, Servico, Usuario
+from consultas import formatar_data
+
+INTERVALO = 1.0
+BATIMENTO = 15.0       # comentário enviado em conexão parada (proxies e detecção de saída)
+FILA_MAXIMA = 200
+LOTE_LEITURA = 500
+CONEXOES_PADRAO = 48   # por worker; o Procfile roda 64 threads
+RETRY_LOTADO = 30000   # ms até o navegador tentar de novo com o worker cheio
+
+CANAL_SINDICO = 'sindico'
+
+
+def canal_morador(usuario_id):
+    return f'morador:{usuario_id}'
+
+
+def _consulta(depois_de, limite=LOTE_LEITURA, ate=None):
+    """Eventos depois do id informado (e até ate), com os dados que a página mostra."""
+    query = db.session.query(
+        PedidoEvento.id, PedidoEvento.anterior, PedidoEvento.status,
+        Pedido.id.label('pedido_id'), Pedido.usuario_id, Pedido.data,
+        Servico.nome.label('servico_nome'), Usuario.email.label('usuario_email'),
+    ).join(Pedido, Pedido.id == PedidoEvento.pedido_id)\
+     .join(Servico, Servico.id == Pedido.servico_id)\
+     .join(Usuario, Usuario.id == Pedido.usuario_id)\
+     .filter(PedidoEvento.id > depois_de)
+    if ate is not None:
+        query = query.filter(PedidoEvento.id <= ate)
+    return query.order_by(PedidoEvento.id).limit(limite).all()
+
+
+def _tipo(linha):
+    return 'novo' if linha.anterior is None else 'status'
+
+
+def _canais(linha):
+    if _tipo(linha) == 'novo':
+        return (CANAL_SINDICO,)
+    return (CANAL_SINDICO, canal_morador(linha.usuario_id))
+
+
+def _mensagem(linha):
+    """Texto SSE do evento."""
+    dados = {'id': linha.pedido_id, 'status': linha.status}
+    if _tipo(linha) == 'novo':
+        dados.update(servico_nome=linha.servico_nome, usuario_email=linha.usuario_email,
+                     data_solicitacao=formatar_data(linha.data))
+    return f"id: {linha.id}\nevent: {_tipo(linha)}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+def _recarregar(ultimo):
+    """Texto SSE para quando a recuperação não cabe em um lote."""
+    return f"id: {ultimo}\nevent: recarregar\ndata: {{}}\n\n"
+
+
+_ENCERRAR = object()  # na fila: fecha a conexão
+
+
+class CentralEventos:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assinantes = {}      # canal -> set de filas
+        self._conexoes = 0
+        self._ultimo = None        # id do último evento distribuído
+        self._thread = None
+        self.app = None
+        self.maximo = CONEXOES_PADRAO
+
+    def init_app(self, app):
+        self.app = app
+        self.maximo = app.config.get('EVENTOS_CONEXOES') or CONEXOES_PADRAO
+
+    # -------------------------------
+    # Conexões
+    # -------------------------------
+    def _assinar(self, canal):
+        """Fila da conexão e o id do último evento que não vai passar por ela.
+
+        Devolve (None, None) se o worker já tem o máximo de conexões.
+        """
+        fila = queue.Queue(FILA_MAXIMA)
+        with self._lock:
+            if self._conexoes >= self.maximo:
+                return None, None
+            # Sem conexões a thread não lê os eventos e _ultimo para: a primeira
+            # conexão depois disso recomeça do último evento gravado, senão
+            # receberia como novos os eventos do período sem ninguém
+            if not self._assinantes:
+                self._ultimo = db.session.query(db.func.max(PedidoEvento.id)).scalar() or 0
+            self._conexoes += 1
+            self._assinantes.setdefault(canal, set()).add(fila)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._rodar, name='central-eventos', daemon=True)
+                self._thread.start()
+            return fila, self._ultimo
+
+    def _cancelar(self, canal, fila):
+        with self._lock:
+            filas = self._assinantes.get(canal)
+            if filas is not None and fila in filas:
+                filas.discard(fila)
+                self._conexoes -= 1
+                if not filas:
+                    del self._assinantes[canal]
+
+    def fluxo(self, canal, desde=None):
+        """Abre a conexão do canal e devolve o gerador do corpo SSE.
+
+        Chamar dentro da requisição: a assinatura e a recuperação a partir de
+        desde (Last-Event-ID) usam o banco agora; o gerador não usa.
+        """
+        fila, ultimo = self._assinar(canal)
+        if fila is None:
+            return iter([f"retry: {RETRY_LOTADO}\n\n"])
+        perdidas = []
+        if desde is not None and desde < ultimo:
+            linhas = _consulta(desde, limite=LOTE_LEITURA + 1, ate=ultimo)
+            if len(linhas) > LOTE_LEITURA:
+                perdidas = [_recarregar(ultimo)]
+            else:
+                perdidas = [_mensagem(linha) for linha in linhas if canal in _canais(linha)]
+
+        def gerar():
+            try:
+                yield "retry: 3000\n\n"
+                yield from perdidas
+                while True:
+                    try:
+                        mensagem = fila.get(timeout=BATIMENTO)
+                    except queue.Empty:
+                        yield ": ok\n\n"
+                        continue
+                    if mensagem is _ENCERRAR:
+                        return
+                    yield mensagem
+            finally:
+                self._cancelar(canal, fila)
+
+        return gerar()
+
+    # -------------------------------
+    # Distribuição (uma thread por worker)
+    # -------------------------------
+    def _distribuir(self, linha):
+        mensagem = _mensagem(linha)
+        # Filas e _ultimo juntos, sob o lock: quem assina antes recebe o evento
+        # pela fila, quem assina depois recupera pelo banco (ver fluxo)
+        with self._lock:
+            if linha.id <= self._ultimo:
+                return  # lido antes de uma conexão recomeçar _ultimo (ver _assinar)
+            filas = [(canal, fila) for canal in _canais(linha) for fila in self._assinantes.get(canal, ())]
+            self._ultimo = linha.id
+        for canal, fila in filas:
+            try:
+                fila.put_nowait(mensagem)
+            except queue.Full:
+                # Conexão parada: encerra; o navegador reconecta com o Last-Event-ID
+                self._cancelar(canal, fila)
+                with fila.mutex:
+                    fila.queue.clear()
+                fila.put_nowait(_ENCERRAR)
+
+    def _rodar(self):
+        while True:
+            time.sleep(INTERVALO)
+            if not self._assinantes:
+                continue
+            try:
+                with self.app.app_context():
+                    linhas = _consulta(self._ultimo)
+            except Exception:
+                self.app.logger.exception('Falha ao ler os eventos')
+                continue
+            for linha in linhas:
+                self._distribuir(linha)
+
+
+central = CentralEventos()
@@ -0,0 +1,76 @@
+# verificar_catalogo.py
+# Confere, ponta a ponta, o cadastro de serviço pelo síndico e a invalidação
+# do catálogo em cache (catalogo.py) entre workers, num banco temporário:
+#
+#   1. POST /cadastrar_servico logado como síndico grava o serviço e volta
+#      para /gerenciar_sindico (não para /login)
+#   2. o catálogo deste worker já lista o serviço novo
+#   3. um segundo catálogo (outro worker, carregado antes) continua com a cópia
+#      dele até a próxima verificação e então recarrega sozinho
+#   4. /api/changes devolve o serviço depois do cursor anterior ao cadastro
+#
+# Uso: python verificar_catalogo.py
+import os
+import sys
+import tempfile
+
+NOME = 'Vidraçaria'
+
+
+def verificar(app):
+    import catalogo as modulo
+    from catalogo import catalogo, CatalogoServicos
+    from versoes import versao_atual
+    from dados_sinteticos import EMAIL_SINDICO
+    from verificar_orcamentos import entrar
+
+    sindico = entrar(app, EMAIL_SINDICO)
+    outro = CatalogoServicos()
+    with app.app_context():
+        outro.listar()
+        catalogo.listar()
+        desde = versao_atual('alteracoes')
+
+    falhas = []
+    resposta = sindico.post('/cadastrar_servico', data={'nome_servico': NOME.lower()})
+    if resposta.status_code != 302 or not resposta.location.endswith('/gerenciar_sindico'):
+        falhas.append(f'cadastro: {resposta.status_code} -> {resposta.location}')
+
+    with app.app_context():
+        if NOME not in [s.nome for s in catalogo.listar()]:
+            falhas.append('o catálogo deste worker não tem o serviço novo')
+        if NOME in [s.nome for s in outro.listar()]:
+            falhas.append('o outro worker recarregou antes da verificação')
+        intervalo, modulo.INTERVALO_VERIFICACAO = modulo.INTERVALO_VERIFICACAO, 0
+        try:
+            if NOME not in [s.nome for s in outro.listar()]:
+                falhas.append('o outro worker não recarregou depois da verificação')
+        finally:
+            modulo.INTERVALO_VERIFICACAO = intervalo
+
+    alteradas = sindico.get(f'/api/changes?since={desde}').get_json()
+    if NOME not in [s['nome'] for s in alteradas['servicos']]:
+        falhas.append('/api/changes não devolveu o serviço novo')
+    return falhas
+
+
+if __name__ == '__main__':
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'catalogo.db')}"
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    os.environ.pop('ESCRITOR_ENDERECO', None)
+    from app import app
+    from models import db
+    import dados_sinteticos
+
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        dados_sinteticos.gerar(apartamentos=10, moradores=10, pedidos=100)
+
+    falhas = verificar(app)
+    for falha in falhas:
+        print(f"❌ {falha}")
+    if falhas:
+        sys.exit(1)
+    print("✅ Serviço cadastrado, catálogo invalidado nos dois workers e publicado em /api/changes.")
@@ -0,0 +1,93 @@
+# verificar_consultas.py
+# Confere que as listas de pedidos custam o mesmo número de comandos SQL com
+# qualquer quantidade de pedidos (sem N+1): mede /pedidos, /historico e
+# /meus_pedidos num banco temporário com N pedidos (dados_sinteticos.py),
+# copia os pedidos até o banco ter 10N e mede de novo. Falha se alguma rota
+# mudar de contagem.
+#
+# Uso: python verificar_consultas.py [--pedidos 2000]
+import argparse
+import os
+import sys
+import tempfile
+
+ROTAS = [
+    ('sindico', '/pedidos'),
+    ('sindico', '/historico'),
+    ('morador', '/meus_pedidos'),
+]
+
+# Cópia dos N primeiros pedidos, k anos antes (mesmo morador, serviço e status)
+COPIAR_PEDIDOS = """
+    INSERT INTO pedidos (usuario_id, servico_id, nome, descricao, status, observacao, data, alteracao)
+    SELECT usuario_id, servico_id, nome, descricao, status, observacao,
+           datetime(data, '-{anos} years'), alteracao
+    FROM pedidos WHERE id <= ?
+"""
+
+
+def contar_comandos(app, clientes):
+    """{rota: comandos SQL} de uma visita a cada rota de ROTAS."""
+    from sqlalchemy import event
+    from models import db
+
+    with app.app_context():
+        engine = db.engine
+    contagem = [0]
+
+    def contar(*args):
+        contagem[0] += 1
+
+    resultado = {}
+    event.listen(engine, 'before_cursor_execute', contar)
+    try:
+        for papel, url in ROTAS:
+            contagem[0] = 0
+            resposta = clientes[papel].get(url)
+            assert resposta.status_code == 200, f'{url}: {resposta.status_code}'
+            resultado[url] = contagem[0]
+    finally:
+        event.remove(engine, 'before_cursor_execute', contar)
+    return resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Confere que as listas não fazem N+1')
+    parser.add_argument('--pedidos', type=int, default=2000)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'consultas.db')}"
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    os.environ.pop('ESCRITOR_ENDERECO', None)
+    from app import app
+    from models import db, Pedido
+    from dados_sinteticos import EMAIL_SINDICO
+    from verificar_orcamentos import entrar
+    import dados_sinteticos
+
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        dados_sinteticos.gerar(apartamentos=40, moradores=80, pedidos=args.pedidos)
+    clientes = {'morador': entrar(app, 'morador0@exemplo.com'), 'sindico': entrar(app, EMAIL_SINDICO)}
+    contar_comandos(app, clientes)  # caches (catálogo, identidade) cheios antes de medir
+
+    antes = contar_comandos(app, clientes)
+    with app.app_context():
+        for anos in range(1, 10):
+            db.session.connection().exec_driver_sql(COPIAR_PEDIDOS.format(anos=anos), (args.pedidos,))
+        db.session.commit()
+        total = Pedido.query.count()
+    depois = contar_comandos(app, clientes)
+
+    falhas = 0
+    for _, url in ROTAS:
+        ok = antes[url] == depois[url]
+        print(f"{'✅' if ok else '❌'} {url:<14} {args.pedidos:>8} pedidos: {antes[url]} sql   "
+              f"{total:>8} pedidos: {depois[url]} sql")
+        falhas += not ok
+    if falhas:
+        print(f"\n{falhas} rota(s) com comandos SQL crescendo com os pedidos.")
+        sys.exit(1)
+    print("\nNúmero de comandos SQL constante nas listas.")
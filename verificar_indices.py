@@ -0,0 +1,79 @@
+# verificar_indices.py
+# Roda EXPLAIN QUERY PLAN nas consultas de cada rota e falha se alguma delas
+# varrer a tabela de pedidos inteira ou precisar ordenar em uma B-tree temporária.
+# O dashboard não entra aqui: ele lê só a tabela contagem_pedidos (contadores.py).
+# Os gráficos do /estatisticas entram, para conferir que leem só o trecho da
+# chave primária de contagem_periodos (periodos.py).
+# Rode depois de "flask db upgrade" (usa o banco configurado no app).
+import re
+import sys
+from datetime import date, datetime
+
+from app import app, db
+from models import ContagemPeriodo
+from consultas import consulta_pedidos
+from exportacao import consulta_exportacao
+from periodos import consulta as consulta_periodos
+
+# Um cursor qualquer, só para o plano incluir a condição de paginação
+CURSOR = (datetime(2025, 1, 1), 1)
+# Intervalo de datas dos filtros do histórico (data_inicial, data_final)
+DATAS = {'data_inicial': datetime(2025, 3, 1), 'data_final': datetime(2025, 4, 1)}
+
+CONSULTAS = [
+    ('/historico', lambda: consulta_pedidos()),
+    ('/historico (página 2)', lambda: consulta_pedidos(cursor=CURSOR)),
+    ('/pedidos?servico=', lambda: consulta_pedidos(servico_id=1)),
+    ('/pedidos?servico= (página 2)', lambda: consulta_pedidos(servico_id=1, cursor=CURSOR)),
+    ('/meus_pedidos', lambda: consulta_pedidos(usuario_id=1)),
+    ('/meus_pedidos (página 2)', lambda: consulta_pedidos(usuario_id=1, cursor=CURSOR)),
+    ('/meus_pedidos?servico=', lambda: consulta_pedidos(usuario_id=1, servico_id=1)),
+    ('/historico?status=', lambda: consulta_pedidos(status='pendente')),
+    ('/historico?status= (página 2)', lambda: consulta_pedidos(status='pendente', cursor=CURSOR)),
+    ('/historico?data_inicial=&data_final=', lambda: consulta_pedidos(**DATAS)),
+    ('/historico?data_inicial=&data_final= (página 2)', lambda: consulta_pedidos(cursor=CURSOR, **DATAS)),
+    ('/historico?status=&data_inicial=&data_final=', lambda: consulta_pedidos(status='pendente', **DATAS)),
+    ('/historico?servico=&status=', lambda: consulta_pedidos(servico_id=1, status='pendente')),
+    ('/historico?servico=&data_inicial=&data_final=', lambda: consulta_pedidos(servico_id=1, **DATAS)),
+    ('/exportar?status=', lambda: consulta_exportacao(status='pendente')),
+    ('/api/estatisticas/pedidos', lambda: consulta_periodos('mes', date(2024, 1, 1), date(2024, 12, 1), ContagemPeriodo.servico_id)),
+    ('/api/estatisticas/pedidos (status)',
+     lambda: consulta_periodos('mes', date(2024, 1, 1), date(2024, 12, 1), ContagemPeriodo.status)),
+]
+
+# "SCAN pedidos" sem "USING ... INDEX" é leitura da tabela inteira
+SCAN_COMPLETO = re.compile(r'^SCAN (pedidos|contagem_periodos)$')
+
+# Agrupamentos que podem usar B-tree temporária: ela guarda só os grupos
+# (períodos x status, algumas centenas), não as linhas lidas
+AGRUPAMENTO_PEQUENO = {'/api/estatisticas/pedidos (status)'}
+
+
+def plano(query):
+    compilado = query.statement.compile(dialect=db.engine.dialect)
+    params = tuple(compilado.params[nome] for nome in compilado.positiontup)
+    with db.engine.connect() as conn:
+        linhas = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compilado), params).fetchall()
+    return [linha[3] for linha in linhas]
+
+
+def verificar():
+    falhas = 0
+    for rota, montar in CONSULTAS:
+        detalhes = plano(montar().limit(51))
+        problemas = [d for d in detalhes if SCAN_COMPLETO.match(d) or 'USE TEMP B-TREE' in d
+                     and not (rota in AGRUPAMENTO_PEQUENO and d == 'USE TEMP B-TREE FOR GROUP BY')]
+        print(f"{'❌' if problemas else '✅'} {rota}")
+        for d in detalhes:
+            print(f"     {d}")
+        falhas += bool(problemas)
+    return falhas
+
+
+if __name__ == '__main__':
+    with app.app_context():
+        falhas = verificar()
+    if falhas:
+        print(f"\n{falhas} consulta(s) sem índice adequado.")
+        sys.exit(1)
+    print("\nTodas as consultas usam índice.")
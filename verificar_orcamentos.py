@@ -0,0 +1,221 @@
+# verificar_orcamentos.py
+# Visita todas as rotas do app, como visitante, morador e síndico, em um banco
+# temporário com dados sintéticos (dados_sinteticos.py), e falha se alguma
+# passar do orçamento declarado junto da view (@orcamento, ver orcamentos.py):
+# número máximo de comandos SQL e tempo máximo. Pega N+1 em meus_pedidos, pedidos, historico,
+# gerenciar_sindico etc. sem depender de olhar os logs.
+#
+# Também falha se uma rota do app não tiver orçamento ou não for visitada, ou
+# se a resposta não for a esperada (código ou destino do redirecionamento),
+# em especial um redirecionamento para o /login.
+# O bcrypt roda com custo 4, então os tempos de login/cadastro medem o app e
+# o banco, não o custo de hash de produção.
+#
+# Uso: python verificar_orcamentos.py [--apartamentos 100] [--moradores 300]
+#                                     [--pedidos 20000] [--fator-tempo 1.0]
+# --fator-tempo multiplica os limites de tempo (máquina mais lenta, CI etc.).
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+
+def visitas():
+    """(papel, método, url, dados, esperado) cobrindo todas as rotas. None = sem login.
+
+    esperado é o código da resposta ou, para um redirecionamento (302), o
+    caminho de destino.
+    """
+    from consultas import gerar_cursor
+    from models import Pedido
+    from dados_sinteticos import SENHA
+
+    # Pedido do morador0 para alterar; um pedido no meio da lista para a página 2;
+    # um pendente para a mudança de status passar pelo caminho completo (desfecho)
+    pedido = Pedido.query.filter_by(usuario_id=2).first()
+    pendente = Pedido.query.filter_by(status='pendente').first()
+    meio = Pedido.query.order_by(Pedido.data.desc()).offset(500).first()
+    perfil = {'nome': 'Morador 0', 'bloco': 'A', 'numero': '101', 'telefone': '1199999',
+              'email': 'morador0@exemplo.com', 'senha': ''}
+
+    return [
+        (None, 'GET', '/', None, '/login'),
+        (None, 'GET', '/login', None, 200),
+        (None, 'POST', '/login', {'email': 'morador1@exemplo.com', 'senha': SENHA}, '/dashboard_morador'),
+        (None, 'GET', '/cadastro', None, 200),
+        (None, 'POST', '/cadastro', {'nome': 'Novo', 'bloco': 'Z', 'numero': '1', 'telefone': '',
+                                     'email': 'novo@exemplo.com', 'senha': SENHA}, '/login'),
+        ('morador', 'GET', '/dashboard_morador', None, 200),
+        ('morador', 'GET', '/meus_pedidos', None, 200),
+        ('morador', 'GET', '/meus_pedidos?servico=1', None, 200),
+        ('morador', 'GET', '/novo_pedido', None, 200),
+        ('morador', 'POST', '/novo_pedido', {'servico_id': '1', 'nome': 'Torneira', 'descricao': 'pingando',
+                                            'chave': 'verificar-1'}, '/meus_pedidos'),
+        ('morador', 'POST', '/api/pedidos',
+         json.dumps({'servico_id': 1, 'nome': 'Torneira', 'chave': 'verificar-2'}), 201),
+        ('morador', 'POST', '/api/pedidos',
+         json.dumps({'servico_id': 1, 'nome': 'Torneira', 'chave': 'verificar-2'}), 201),
+        ('morador', 'POST', '/novo_pedido', {'servico_id': '9999', 'nome': 'Torneira',
+                                            'chave': 'verificar-3'}, '/novo_pedido'),
+        ('morador', 'POST', '/api/pedidos',
+         json.dumps({'servico_id': 9999, 'nome': 'Torneira', 'chave': 'verificar-4'}), 400),
+        ('morador', 'GET', '/editar_perfil', None, 200),
+        ('morador', 'POST', '/editar_perfil', perfil, '/editar_perfil'),
+        ('sindico', 'GET', '/dashboard_sindico', None, 200),
+        ('sindico', 'GET', '/estatisticas', None, 200),
+        ('sindico', 'GET', '/api/estatisticas/pedidos', None, 200),
+        ('sindico', 'GET', '/api/estatisticas/pedidos?periodo=dia&inicio=2025-01-01&fim=2025-12-31', None, 200),
+        ('sindico', 'GET', '/api/estatisticas/pedidos?periodo=semana', None, 200),
+        ('sindico', 'GET', '/api/estatisticas/atendimento?inicio=2025-01-01&fim=2025-12-31', None, 200),
+        ('sindico', 'GET', '/api/estatisticas/atendimento?desfecho=rejeitado', None, 200),
+        ('sindico', 'GET', '/pedidos', None, 200),
+        ('sindico', 'GET', '/pedidos?servico=2', None, 200),
+        ('sindico', 'GET', '/historico', None, 200),
+        ('sindico', 'GET', f'/historico?cursor={gerar_cursor(meio.data, meio.id)}', None, 200),
+        ('sindico', 'GET', '/historico?status=pendente&nome=vazamento&servico=3', None, 200),
+        ('sindico', 'GET', '/historico?busca=vazamento+cozinha', None, 200),
+        ('sindico', 'GET', '/exportar?formato=csv', None, 200),
+        ('sindico', 'GET', '/exportar?formato=ndjson', None, 200),
+        ('sindico', 'POST', f'/alterar_status/{pendente.id}', {'status': 'concluído'}, '/historico'),
+        ('sindico', 'POST', '/api/pedidos/status', json.dumps({'ids': list(range(1, 201)), 'status': 'concluído',
+                                                                'observacao': 'Visita do encanador'}), 200),
+        # Status ausente ou fora de STATUS_PEDIDO: mensagem de erro, não 500
+        ('sindico', 'POST', f'/alterar_status/{pendente.id}', {}, '/historico'),
+        ('sindico', 'POST', '/api/pedidos/status', json.dumps({'ids': [1], 'status': 'arquivado'}), 400),
+        ('sindico', 'GET', '/gerenciar_sindico', None, 200),
+        ('sindico', 'POST', '/cadastrar_servico', {'nome_servico': 'marcenaria'}, '/gerenciar_sindico'),
+        ('sindico', 'POST', '/dispromover_sindico/3', None, '/gerenciar_sindico'),
+        ('sindico', 'GET', '/metrics', None, 200),
+        ('sindico', 'GET', f'/api/pedidos/{pedido.id}/eventos', None, 200),
+        ('morador', 'GET', f'/api/pedidos/{pedido.id}/eventos', None, 200),
+        (None, 'GET', '/service-worker.js', None, 200),
+        ('sindico', 'GET', '/eventos?desde=0', None, 200),
+        ('morador', 'GET', '/eventos', None, 200),
+        ('morador', 'GET', '/api/changes?since=0', None, 200),
+        ('sindico', 'GET', '/api/changes?since=0', None, 200),
+        ('sindico', 'GET', f'/api/changes?since={meio.alteracao}&limite=100', None, 200),
+        # Por último: troca o síndico e encerra as sessões
+        ('sindico', 'POST', '/promover_sindico/3', None, '/gerenciar_sindico'),
+        ('morador', 'GET', '/logout', None, '/login'),
+    ]
+
+
+def entrar(app, email):
+    from dados_sinteticos import SENHA
+    cliente = app.test_client()
+    resposta = cliente.post('/login', data={'email': email, 'senha': SENHA})
+    assert resposta.status_code == 302, f'login de {email} falhou ({resposta.status_code})'
+    cliente.get('/')  # carrega a identidade no cache, fora da medição
+    return cliente
+
+
+def resposta_errada(resposta, esperado):
+    """Descrição do problema, ou None se a resposta é a esperada."""
+    destino = urlsplit(resposta.location).path if resposta.location else None
+    if destino == '/login' and esperado != '/login':
+        return f'redirecionou para o /login (esperado {esperado})'
+    if isinstance(esperado, str):
+        if resposta.status_code != 302 or destino != esperado:
+            return f'esperado 302 para {esperado}, veio {resposta.status_code} para {destino}'
+    elif resposta.status_code != esperado:
+        return f'esperado {esperado}, veio {resposta.status_code}'
+    return None
+
+
+def verificar(app, fator_tempo):
+    from sqlalchemy import event
+    from models import db
+    from orcamentos import ORCAMENTOS
+    from dados_sinteticos import EMAIL_SINDICO
+
+    with app.app_context():
+        engine = db.engine
+        roteiro = visitas()
+
+    contagem = [0]
+
+    def contar(*args):
+        contagem[0] += 1
+
+    clientes = {
+        None: app.test_client(),
+        'morador': entrar(app, 'morador0@exemplo.com'),
+        'sindico': entrar(app, EMAIL_SINDICO),
+    }
+    event.listen(engine, 'before_cursor_execute', contar)
+
+    falhas = 0
+    visitados = set()
+    for papel, metodo, url, dados, esperado in roteiro:
+        endpoint = app.url_map.bind('').match(url.split('?')[0], method=metodo)[0]
+        visitados.add(endpoint)
+        limite = ORCAMENTOS.get(endpoint)
+
+        contagem[0] = 0
+        inicio = time.perf_counter()
+        tipo = 'application/json' if isinstance(dados, str) else None  # str = corpo JSON
+        resposta = clientes[papel].open(url, method=metodo, data=dados, content_type=tipo, buffered=False)
+        if resposta.mimetype == 'text/event-stream':
+            next(resposta.response)  # conexão que não termina: só o primeiro pedaço
+        else:
+            resposta.get_data()  # consome respostas em streaming dentro da medição
+        resposta.close()
+        ms = (time.perf_counter() - inicio) * 1000
+        sql = contagem[0]
+
+        if limite is None:
+            ok, texto_limite = False, 'sem orçamento'
+        else:
+            ok = sql <= limite.sql and ms <= limite.ms * fator_tempo
+            texto_limite = f'{limite.sql:>3} sql / {limite.ms * fator_tempo:>6.0f} ms'
+        # Uma resposta de erro ou a volta para o /login (sessão perdida, papel
+        # errado) também sai barata: o orçamento só vale no caminho esperado
+        problema = resposta_errada(resposta, esperado)
+        print(f"{'✅' if ok and not problema else '❌'} {papel or '-':<8} {metodo:<4} {url[:48]:<48} "
+              f"{resposta.status_code}  {sql:>3} sql / {ms:>6.1f} ms   (limite {texto_limite})")
+        if problema:
+            print(f"     {problema}")
+        falhas += not ok or bool(problema)
+
+    event.remove(engine, 'before_cursor_execute', contar)
+
+    for regra in app.url_map.iter_rules():
+        if regra.endpoint != 'static' and regra.endpoint not in visitados:
+            print(f"❌ rota não visitada: {regra.rule} ({regra.endpoint})")
+            falhas += 1
+    return falhas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Confere o orçamento de SQL e tempo de cada rota')
+    parser.add_argument('--apartamentos', type=int, default=100)
+    parser.add_argument('--moradores', type=int, default=300)
+    parser.add_argument('--pedidos', type=int, default=20000)
+    parser.add_argument('--fator-tempo', type=float, default=1.0)
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'orcamento.db')}"
+    os.environ['METRICAS_DIR'] = os.path.join(pasta, 'metricas')
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    os.environ.pop('ESCRITOR_ENDERECO', None)
+    from app import app
+    from models import db
+    import dados_sinteticos
+
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        dados_sinteticos.gerar(apartamentos=args.apartamentos, moradores=args.moradores,
+                               pedidos=args.pedidos)
+    print(f"{args.apartamentos} apartamentos, {args.moradores} moradores, {args.pedidos} pedidos\n")
+    # Cada requisição com o seu próprio contexto e sessão, como em produção
+    falhas = verificar(app, args.fator_tempo)
+
+    if falhas:
+        print(f"\n{falhas} rota(s) fora do orçamento.")
+        sys.exit(1)
+    print("\nTodas as rotas dentro do orçamento.")
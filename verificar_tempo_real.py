@@ -0,0 +1,93 @@
+# verificar_tempo_real.py
+# Confere os avisos em tempo real (tempo_real.py, rota /eventos) depois de um
+# período sem nenhuma conexão aberta, num banco temporário:
+#
+#   1. o síndico abre e fecha o /eventos (a thread de distribuição começa);
+#   2. sem ninguém conectado, um morador cria pedidos;
+#   3. uma conexão nova, sem Last-Event-ID, não recebe esses pedidos antigos;
+#   4. um pedido criado com ela aberta chega como "novo".
+#
+# Uso: python verificar_tempo_real.py
+import os
+import sys
+import tempfile
+import time
+
+PEDIDOS_SEM_CONEXAO = 3
+
+
+def abrir(cliente):
+    resposta = cliente.get('/eventos', buffered=False)
+    corpo = iter(resposta.response)
+    next(corpo)  # "retry: ..."
+    return resposta, corpo
+
+
+def mensagens(corpo, segundos):
+    """Eventos recebidos (sem os batimentos) até passar o tempo informado."""
+    recebidas = []
+    fim = time.monotonic() + segundos
+    while time.monotonic() < fim:
+        pedaco = next(corpo)
+        pedaco = pedaco.decode('utf-8') if isinstance(pedaco, bytes) else pedaco
+        if not pedaco.startswith(':'):
+            recebidas.append(pedaco)
+    return recebidas
+
+
+def criar_pedido(morador, chave):
+    resposta = morador.post('/novo_pedido', data={'servico_id': '1', 'nome': 'Torneira',
+                                                  'descricao': 'pingando', 'chave': chave})
+    assert resposta.status_code == 302, f'novo pedido falhou ({resposta.status_code})'
+
+
+def verificar(app):
+    import tempo_real
+    from dados_sinteticos import EMAIL_SINDICO
+    from verificar_orcamentos import entrar
+
+    # Ciclos curtos: leitura dos eventos e batimento a cada décimo de segundo
+    tempo_real.INTERVALO = tempo_real.BATIMENTO = 0.1
+    sindico = entrar(app, EMAIL_SINDICO)
+    morador = entrar(app, 'morador0@exemplo.com')
+    falhas = []
+
+    resposta, _ = abrir(sindico)
+    resposta.close()
+    for i in range(PEDIDOS_SEM_CONEXAO):
+        criar_pedido(morador, f'sem-conexao-{i}')
+    time.sleep(3 * tempo_real.INTERVALO)  # a thread roda sem assinantes
+
+    resposta, corpo = abrir(sindico)
+    antigas = mensagens(corpo, 5 * tempo_real.INTERVALO)
+    if antigas:
+        falhas.append(f'conexão nova recebeu {len(antigas)} evento(s) de antes dela: {antigas[0]!r}')
+
+    criar_pedido(morador, 'com-conexao')
+    novas = mensagens(corpo, 5 * tempo_real.INTERVALO)
+    resposta.close()
+    if len(novas) != 1 or 'event: novo' not in novas[0]:
+        falhas.append(f'esperado um evento "novo" com a conexão aberta, vieram {novas!r}')
+    return falhas
+
+
+if __name__ == '__main__':
+    pasta = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(pasta, 'tempo_real.db')}"
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    os.environ.pop('ESCRITOR_ENDERECO', None)
+    from app import app
+    from models import db
+    import dados_sinteticos
+
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        dados_sinteticos.gerar(apartamentos=10, moradores=10, pedidos=100)
+
+    falhas = verificar(app)
+    for falha in falhas:
+        print(f"❌ {falha}")
+    if falhas:
+        sys.exit(1)
+    print("✅ Conexão aberta depois de um período sem ninguém não recebe eventos antigos.")
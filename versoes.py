@@ -0,0 +1,21 @@
+# versoes.py
+# Versões dos caches em memória (tabela versoes_cache). Cada worker do gunicorn
+# tem seus próprios caches; quem altera os dados incrementa a versão na mesma
+# transação e os outros workers recarregam quando percebem a mudança.
+from sqlalchemy.dialects.sqlite import insert
+from models import db, VersaoCache
+
+
+def versao_atual(chave):
+    versao = db.session.query(VersaoCache.versao).filter_by(chave=chave).scalar()
+    return versao or 0
+
+
+def incrementar_versao(chave, quantidade=1):
+    """Soma quantidade à versão na transação atual, sem commit, e devolve a nova versão."""
+    stmt = insert(VersaoCache).values(chave=chave, versao=quantidade)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['chave'],
+        set_={'versao': VersaoCache.versao + quantidade}
+    ).returning(VersaoCache.versao)
+    return db.session.execute(stmt).scalar_one()